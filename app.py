@@ -1,9 +1,20 @@
 from flask import Flask, send_from_directory, jsonify, request
 from flask_session import Session
 from flask_cors import CORS
+from flask_migrate import Migrate
 from dotenv import load_dotenv
 from routes.chat_routes import chat_bp
+from routes.admin_routes import admin_bp
+from routes.analytics_routes import analytics_bp
+from routes.catalog_routes import catalog_bp
+from routes.job_routes import job_bp
 from db import db, init_db
+from config import BATCH_AUDIT_WORKERS, CATALOG_BACKEND, CATALOG_SNAPSHOT_PATH
+from models.catalog_cache import get_catalog_table_names
+from models.catalog_snapshot import export_catalog_snapshot
+from services.batch_audit_service import run_batch_audit
+from services.job_service import job_runner
+import click
 import os
 import logging
 
@@ -32,7 +43,7 @@ db_host = os.environ.get('DB_HOST', 'DESKTOP-I58CVTK')
 logger.info(f"Database connection details: HOST={db_host}, NAME={db_name}")
 
 
-app.config['SQLALCHEMY_DATABASE_URI'] = (
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or (
     "mssql+pyodbc://@DESKTOP-I58CVTK/Unicourses"
     "?driver=ODBC+Driver+18+for+SQL+Server"
     "&trusted_connection=yes"
@@ -43,6 +54,8 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 
 init_db(app)
+migrate = Migrate(app, db)
+job_runner.init_app(app)
 
 secret_key = os.environ.get('SECRET_KEY')
 if not secret_key:
@@ -75,6 +88,10 @@ def sanitize_file_paths(file_paths):
 
 
 app.register_blueprint(chat_bp, url_prefix='/api/chat')
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+app.register_blueprint(catalog_bp, url_prefix='/api/catalog')
+app.register_blueprint(job_bp, url_prefix='/api/jobs')
 
 
 @app.route('/')
@@ -95,13 +112,42 @@ def health():
     return jsonify({"status": "healthy"}), 200
 
 
-with app.app_context():
-    try:
-        db.create_all()
-        logger.info("Database setup completed successfully.")
-    except Exception as e:
-        logger.critical(f"Failed to set up the database: {e}", exc_info=True)
-        raise
+@app.cli.command('export-catalog-snapshot')
+@click.argument('path', default=CATALOG_SNAPSHOT_PATH)
+def export_catalog_snapshot_command(path):
+    """Export every catalog table in MAJOR_TABLE_MAPPING to a local SQLite snapshot."""
+    metadata = export_catalog_snapshot(get_catalog_table_names(), path, source=db_host)
+    click.echo(f"Catalog snapshot written to {path}: {metadata['table_count']} tables, "
+               f"{metadata['row_count']} rows, hash {metadata['content_hash'][:12]}")
+
+
+@app.cli.command('batch-audit')
+@click.argument('source')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help="Results file (default: stdout).")
+@click.option('--format', 'output_format', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True)
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=BATCH_AUDIT_WORKERS, show_default=True)
+@click.option('--major', default=None, help="Major for transcripts that do not name one.")
+@click.option('--chunksize', type=click.IntRange(min=1), default=16, show_default=True)
+def batch_audit_command(source, output, output_format, workers, major, chunksize):
+    """Run local degree audits for a directory of parsed transcript JSON files or a JSONL file."""
+    logging.getLogger().setLevel(logging.WARNING)
+    summary = run_batch_audit(source, output, output_format=output_format, workers=workers,
+                              default_major=major, chunksize=chunksize)
+    click.echo(f"Audited {summary['records']} transcript(s) ({summary['succeeded']} succeeded, "
+               f"{summary['failed']} failed) with {summary['workers']} worker(s) in {summary['seconds']}s: "
+               f"{summary['audits_per_second']} audits/s (catalog load {summary['catalog_load_seconds']}s).", err=True)
+
+
+if CATALOG_BACKEND == 'snapshot':
+    logger.info(f"Catalog backend is the local snapshot at {CATALOG_SNAPSHOT_PATH}; skipping database setup.")
+else:
+    with app.app_context():
+        try:
+            db.create_all()
+            logger.info("Database setup completed successfully.")
+        except Exception as e:
+            logger.critical(f"Failed to set up the database: {e}", exc_info=True)
+            raise
 
 
 if __name__ == '__main__':
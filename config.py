@@ -13,6 +13,114 @@ class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
 
+# Catalog cache: how long (seconds) catalog tables are served from memory before a refresh
+CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 3600))
+
+# Where catalog tables are read from: "database" (the SQL server) or "snapshot" (a local SQLite export)
+CATALOG_BACKEND = os.getenv('CATALOG_BACKEND', 'database').lower()
+CATALOG_SNAPSHOT_PATH = os.path.abspath(os.getenv('CATALOG_SNAPSHOT_PATH', 'catalog_snapshot.sqlite3'))
+
+# Token expected in the X-Admin-Token header by the admin endpoints (disabled when unset)
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN')
+
+# How degree audits are computed: "gpt" (OpenAI prompt) or "local" (deterministic engine).
+# Can be overridden per request with the "audit_mode" field.
+AUDIT_MODES = ("gpt", "local")
+AUDIT_MODE = os.getenv('AUDIT_MODE', 'gpt').lower()
+
+# GPA analytics: credit hours assumed for transcript rows without a credits column,
+# and the most grade scenarios a single what-if request may evaluate
+DEFAULT_COURSE_CREDITS = float(os.getenv('DEFAULT_COURSE_CREDITS', 3))
+WHAT_IF_MAX_SCENARIOS = int(os.getenv('WHAT_IF_MAX_SCENARIOS', 100000))
+
+# Worker processes used by the batch-audit CLI command (defaults to the CPU count)
+BATCH_AUDIT_WORKERS = int(os.getenv('BATCH_AUDIT_WORKERS', os.cpu_count() or 1))
+
+# SQLite file holding each student's last extracted transcript pages and audit, for incremental re-audits,
+# and the seconds a student's state (and the audit token that reaches it) is kept after its last use
+AUDIT_STATE_PATH = os.path.abspath(os.getenv('AUDIT_STATE_PATH', 'audit_state.sqlite3'))
+AUDIT_STATE_RETENTION = int(os.getenv('AUDIT_STATE_RETENTION', 400 * 24 * 60 * 60))
+
+# Resolution (DPI) of the grayscale rendering hashed for PDF pages without a usable text layer,
+# to recognise unchanged pages without rendering them for extraction
+PAGE_HASH_DPI = int(os.getenv('PAGE_HASH_DPI', 36))
+
+# Content-addressed disk cache of parsed transcript extractions: directory, size bound
+# (0 disables the cache) and how long (seconds) an entry is served
+EXTRACTION_CACHE_DIR = os.path.abspath(os.getenv('EXTRACTION_CACHE_DIR', 'extraction_cache'))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv('EXTRACTION_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', 30 * 24 * 3600))
+
+# Transcript PDFs with a text layer are parsed without the vision model when at least this
+# share of their course rows parse cleanly (set above 1 to always use the vision model)
+TEXT_LAYER_MIN_CONFIDENCE = float(os.getenv('TEXT_LAYER_MIN_CONFIDENCE', 0.95))
+PDFTOTEXT_TIMEOUT = int(os.getenv('PDFTOTEXT_TIMEOUT', 30))
+
+# Sizing of transcript page images sent to the vision model: the lowest resolution at which
+# transcript text stays legible, the highest worth rendering at, and the most sections per page
+VISION_MIN_DPI = int(os.getenv('VISION_MIN_DPI', 150))
+VISION_MAX_DPI = int(os.getenv('VISION_MAX_DPI', 300))
+VISION_MAX_SECTIONS = int(os.getenv('VISION_MAX_SECTIONS', 6))
+
+# Transcript PDF pages rendered ahead in parallel, bounded by the memory their bitmaps may take
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', 2))
+RENDER_MEMORY_CAP_MB = int(os.getenv('RENDER_MEMORY_CAP_MB', 128))
+
+# Directory where processed transcript sections are dumped for debugging (unset: kept in memory only)
+VISION_DEBUG_DIR = os.getenv('VISION_DEBUG_DIR') or None
+
+# Vision extraction: pages sent per request (0 sends the whole transcript in one request)
+# and how many requests of one extraction run concurrently
+VISION_PAGES_PER_REQUEST = int(os.getenv('VISION_PAGES_PER_REQUEST', 1))
+VISION_CONCURRENCY = int(os.getenv('VISION_CONCURRENCY', 4))
+
+# Process-wide limit on concurrent OpenAI calls, per call type quotas ("type=limit,..."; types
+# not listed are only bound by the total) and the seconds a call waits in the queue before failing
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 8))
+OPENAI_CALL_QUOTAS = {
+    call_type.strip(): int(limit)
+    for call_type, limit in (
+        item.split('=', 1)
+        for item in os.getenv('OPENAI_CALL_QUOTAS', 'vision=4,audit=2,advising=2,chat=4').split(',')
+        if '=' in item
+    )
+}
+OPENAI_QUEUE_TIMEOUT = float(os.getenv('OPENAI_QUEUE_TIMEOUT', 60))
+
+# Shared OpenAI client: API base URL (e.g. a local fake server for testing), HTTP timeouts
+# and pooled connections, retries with jittered exponential backoff (seconds), and the
+# requests/tokens per minute the account may use (0 disables that budget)
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', 10))
+OPENAI_READ_TIMEOUT = float(os.getenv('OPENAI_READ_TIMEOUT', 120))
+OPENAI_POOL_CONNECTIONS = int(os.getenv('OPENAI_POOL_CONNECTIONS', 20))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 4))
+OPENAI_BACKOFF_BASE = float(os.getenv('OPENAI_BACKOFF_BASE', 1.0))
+OPENAI_BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', 30))
+OPENAI_RPM_LIMIT = int(os.getenv('OPENAI_RPM_LIMIT', 500))
+OPENAI_TPM_LIMIT = int(os.getenv('OPENAI_TPM_LIMIT', 30000))
+
+# Background jobs for chat actions: SQLite file shared by every instance, worker threads and most jobs
+# queued or running per instance, seconds finished jobs are kept, whether actions run as jobs unless
+# the request says otherwise, and the seconds clients are told to wait between polls of a job
+JOB_STORE_PATH = os.path.abspath(os.getenv('JOB_STORE_PATH', 'jobs.sqlite3'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+JOB_QUEUE_LIMIT = int(os.getenv('JOB_QUEUE_LIMIT', 32))
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', 24 * 60 * 60))
+ASYNC_ACTIONS = os.getenv('ASYNC_ACTIONS', 'false').lower() in ('1', 'true', 'yes')
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2.0))
+
+# Seconds between heartbeats of a process running jobs, and without one after which its
+# unfinished jobs are reported as failed
+JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', 15))
+JOB_WORKER_TIMEOUT = float(os.getenv('JOB_WORKER_TIMEOUT', 60))
+
+# Graduation planner: default course load per semester, and the seconds spent searching
+# for a minimum-semester plan before the best plan found so far is returned
+GRADUATION_PLAN_MAX_COURSES = int(os.getenv('GRADUATION_PLAN_MAX_COURSES', 5))
+GRADUATION_PLAN_TIME_BUDGET = float(os.getenv('GRADUATION_PLAN_TIME_BUDGET', 2.0))
+
+
 # Dictionary to store table mappings for each major, aligned by the given numbering scheme
 MAJOR_TABLE_MAPPING = {
     1: {  # Computer Science
@@ -244,6 +352,12 @@ MAJOR_TABLE_MAPPING = {
     },
 }
 
+# Declared course code / name columns for catalog tables. Tables not listed here are
+# resolved once by reflection: the first column containing "code" and the first containing "name".
+CATALOG_COLUMN_OVERRIDES = {
+    "bio_general_education": {"code": "course_code"},
+}
+
 # config.py
 
 GENERAL_ED_REQUIREMENTS = {
@@ -0,0 +1,333 @@
+"""unified course catalog schema
+
+Consolidates the per-major core/elective/supporting/courses/prerequisite tables
+into indexed course, course_category and prerequisite tables. The original
+tables are kept as legacy_<name>, and a view with the old name selects every
+legacy column and row from them, so existing readers see exactly what they did.
+
+The tables to migrate, their column overrides and the course code and
+prerequisite parsing are frozen below as they stood in the config, catalog
+loader and prerequisite graph when this revision was written, so later changes
+to the app do not alter what it does.
+
+Revision ID: 3f9c2a7d41b6
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+LEGACY_PREFIX = "legacy_"
+
+# (table, major_id, sub_category, category, prerequisite column) of every mapped catalog table
+CATALOG_TABLES = (
+    ('prerequisites', 1, None, 'prerequisites', 'prerequisite_code'),
+    ('corecourses', 1, None, 'core', None),
+    ('electives', 1, None, 'elective', None),
+    ('supporting_courses', 1, None, 'supporting', None),
+    ('Courses', 1, None, 'courses', None),
+    ('bioll_prereqs', 2, None, 'prerequisites', 'prereq_code'),
+    ('biology_corecourses', 2, None, 'core', None),
+    ('bio_electives', 2, None, 'elective', None),
+    ('biology_supportingcourses', 2, None, 'supporting', None),
+    ('biology_courses', 2, None, 'courses', None),
+    ('biot_prereqs', 3, None, 'prerequisites', 'prerequisite_code'),
+    ('biotechcore_courses', 3, None, 'core', None),
+    ('biotechelectives', 3, None, 'elective', None),
+    ('biotcourses', 3, None, 'courses', None),
+    ('buisn_prereqss', 4, None, 'prerequisites', 'prereq_code'),
+    ('business_core', 4, None, 'core', None),
+    ('busnelectives', 4, None, 'elective', None),
+    ('buisncourses', 4, None, 'courses', None),
+    ('chem_prerequisitesss', 5, None, 'prerequisites', 'prerequisite_code'),
+    ('chemcore', 5, None, 'core', None),
+    ('chemelective', 5, None, 'elective', None),
+    ('chemcourses', 5, None, 'courses', None),
+    ('ecopre_reqs', 6, None, 'prerequisites', 'prerequisite_code'),
+    ('ecocore', 6, None, 'core', None),
+    ('ecoelective', 6, None, 'elective', None),
+    ('ecocourses', 6, None, 'courses', None),
+    ('edu_prereqss', 7, None, 'prerequisites', 'prerequisite_code'),
+    ('educ_core', 7, None, 'core', None),
+    ('educ_elec', 7, None, 'elective', None),
+    ('educourses', 7, None, 'courses', None),
+    ('eng_prereqss', 8, None, 'prerequisites', 'prerequisite_code'),
+    ('engcore', 8, None, 'core', None),
+    ('engelectives', 8, None, 'elective', None),
+    ('engcourses', 8, None, 'courses', None),
+    ('envprereqss', 9, None, 'prerequisites', 'prereq_code'),
+    ('envcore', 9, None, 'core', None),
+    ('envelective', 9, None, 'elective', None),
+    ('envcourses', 9, None, 'courses', None),
+    ('geopre_reqss', 10, None, 'prerequisites', 'prereq_course_code'),
+    ('physical_geography_cores', 10, None, 'core', None),
+    ('physical_geography_electives', 10, None, 'elective', None),
+    ('geocourses', 10, None, 'courses', None),
+    ('histprereqs', 11, None, 'prerequisites', 'prereq_code'),
+    ('histcore', 11, None, 'core', None),
+    ('histelective', 11, None, 'elective', None),
+    ('histcourses', 11, None, 'courses', None),
+    ('mcompreqss', 12, None, 'prerequisites', 'prerequisite_code'),
+    ('mcomcore', 12, None, 'core', None),
+    ('mcomelective', 12, None, 'elective', None),
+    ('mcomcourses', 12, None, 'courses', None),
+    ('mathprereqs', 13, None, 'prerequisites', 'prerequisite_code'),
+    ('mathcore', 13, None, 'core', None),
+    ('mathelective', 13, None, 'elective', None),
+    ('mathcourses', 13, None, 'courses', None),
+    ('philpre_reqss', 14, None, 'prerequisites', 'prerequisite_code'),
+    ('philcore', 14, None, 'core', None),
+    ('philelective', 14, None, 'elective', None),
+    ('philcourses', 14, None, 'courses', None),
+    ('physcpre_reqs', 15, None, 'prerequisites', 'prereq_code'),
+    ('core_courses', 15, None, 'core', None),
+    ('phys_electives', 15, None, 'elective', None),
+    ('physcourses', 15, None, 'courses', None),
+    ('polscispre_reqs', 16, None, 'prerequisites', 'prerequisite_code'),
+    ('polsci_core', 16, None, 'core', None),
+    ('polsci_electives', 16, None, 'elective', None),
+    ('polscicourses', 16, None, 'courses', None),
+    ('psych_prereqs', 17, None, 'prerequisites', 'prerequisite_code'),
+    ('psychology_core_courses', 17, 'Normal', 'core', None),
+    ('psychology_elective_courses', 17, 'Normal', 'elective', None),
+    ('psychcourses', 17, 'Normal', 'courses', None),
+    ('applied_psychology_core_courses', 17, 'Applied Psychology', 'core', None),
+    ('applied_psychology_elective_courses', 17, 'Applied Psychology', 'elective', None),
+    ('applied_psych_courses', 17, 'Applied Psychology', 'courses', None),
+    ('isllprerequisites', 18, None, 'prerequisites', 'prerequisite_code'),
+    ('islamic_studies_core_courses', 18, None, 'core', None),
+    ('islamic_studies_major_electives', 18, None, 'elective', None),
+    ('isl_courses', 18, None, 'courses', None),
+    ('socio_prerequisites', 19, None, 'prerequisites', 'prerequisite_code'),
+    ('socio_core_courses', 19, 'Normal', 'core', None),
+    ('socioelective', 19, 'Normal', 'elective', None),
+    ('sociocourses', 19, 'Normal', 'courses', None),
+    ('socioandcult_core_courses', 19, 'Sociology and Culture', 'core', None),
+    ('socioandcult_elective_courses', 19, 'Sociology and Culture', 'elective', None),
+    ('socioandcult_courses', 19, 'Sociology and Culture', 'courses', None),
+    ('stats_prerequisites', 20, None, 'prerequisites', 'prereq_code'),
+    ('statscore_courses', 20, None, 'core', None),
+    ('statselective_courses', 20, None, 'elective', None),
+    ('stats_courses', 20, None, 'courses', None),
+    ('urdu_course_prerequisites', 21, None, 'prerequisites', 'prerequisite_code'),
+    ('urducore_courses', 21, None, 'core', None),
+    ('urdu_electives', 21, None, 'elective', None),
+    ('urdu_courses', 21, None, 'courses', None),
+    ('pharmcore', 22, None, 'core', None),
+    ('pharmelective', 22, None, 'elective', None),
+    ('pharm_courses', 22, None, 'courses', None),
+    ('ling_prereqs', 23, None, 'prerequisites', 'prerequisite_code'),
+    ('lingcore', 23, None, 'core', None),
+    ('lingelectives', 23, None, 'elective', None),
+    ('lingcourses', 23, None, 'courses', None),
+    ('CRSTT_prerequisites', 24, None, 'prerequisites', 'prereq_code'),
+    ('chris_studies_core_courses', 24, None, 'core', None),
+    ('chris_studies_major_electives', 24, None, 'elective', None),
+    ('ChrisCourses', 24, None, 'courses', None),
+    ('bio_general_education', None, None, 'general_education', None),
+    ('criminology_courses', None, None, 'courses', None),
+)
+
+COLUMN_OVERRIDES = {
+    "bio_general_education": {"code": "course_code"},
+}
+
+
+COURSE_CODE_PATTERN = re.compile(r'\b([A-Za-z]{4})\s*-?\s*(\d{3}[A-Za-z]?)\b')
+GROUP_SEPARATOR = re.compile(r'[,;&]|\band\b', re.IGNORECASE)
+
+
+def _normalize_code(code):
+    return str(code).replace(" ", "").upper()
+
+
+def _pick_column(columns, keyword, exclude=None):
+    for column in columns:
+        if keyword in column.lower() and column != exclude:
+            return column
+    return None
+
+
+def _table_columns(columns, prerequisites, prerequisite_column, override):
+    """Return the (code, name, prerequisite) columns of a catalog table."""
+    prerequisite = None
+    if prerequisites:
+        prerequisite = prerequisite_column if prerequisite_column in columns else _pick_column(columns, "prereq")
+    code = override.get("code") or _pick_column(columns, "code", exclude=prerequisite)
+    name = override.get("name") or _pick_column(columns, "name")
+    return code, name, prerequisite
+
+
+def _prerequisite_groups(value):
+    """Split a prerequisite cell into groups that must all be met, each a list of alternative codes."""
+    groups = []
+    for part in GROUP_SEPARATOR.split(value or ""):
+        codes = [f"{prefix}{number}".upper() for prefix, number in COURSE_CODE_PATTERN.findall(part)]
+        if codes:
+            groups.append(codes)
+    return groups
+
+
+def _split_code(code):
+    match = COURSE_CODE_PATTERN.fullmatch(code)
+    if match:
+        return match.group(1).upper(), match.group(2).upper()
+    return code[:4], code[4:]
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    existing_tables = {name.lower(): name for name in inspector.get_table_names()}
+
+    course = op.create_table(
+        'course',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('course_code', sa.String(length=16), nullable=False),
+        sa.Column('prefix', sa.String(length=8), nullable=False),
+        sa.Column('number', sa.String(length=8), nullable=False),
+        sa.Column('course_name', sa.Unicode(length=255), nullable=True),
+    )
+    op.create_index('ux_course_course_code', 'course', ['course_code'], unique=True)
+    op.create_index('ix_course_prefix', 'course', ['prefix'])
+
+    course_category = op.create_table(
+        'course_category',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('course.id'), nullable=False),
+        sa.Column('major_id', sa.Integer(), nullable=True),
+        sa.Column('sub_category', sa.String(length=64), nullable=True),
+        sa.Column('category', sa.String(length=32), nullable=False),
+        sa.Column('source_table', sa.String(length=128), nullable=False),
+        sa.UniqueConstraint('course_id', 'source_table', name='uq_course_category_course_source'),
+    )
+    op.create_index('ix_course_category_major_category', 'course_category', ['major_id', 'category'])
+    op.create_index('ix_course_category_course_id', 'course_category', ['course_id'])
+
+    prerequisite = op.create_table(
+        'prerequisite',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('course_id', sa.Integer(), sa.ForeignKey('course.id'), nullable=False),
+        sa.Column('prerequisite_course_id', sa.Integer(), sa.ForeignKey('course.id'), nullable=False),
+        sa.Column('requirement_group', sa.Integer(), nullable=False),
+        sa.Column('major_id', sa.Integer(), nullable=True),
+        sa.Column('source_table', sa.String(length=128), nullable=False),
+    )
+    op.create_index('ix_prerequisite_course_id', 'prerequisite', ['course_id'])
+    op.create_index('ix_prerequisite_prerequisite_course_id', 'prerequisite', ['prerequisite_course_id'])
+
+    # Read every legacy table once, keeping its columns for the compatibility view.
+    course_names = {}
+    category_rows = []
+    prerequisite_rows = []
+    migrated = []
+    for table_name, major_id, sub_category, category, prereq_column in CATALOG_TABLES:
+        actual_name = existing_tables.get(table_name.lower())
+        if not actual_name or any(actual_name == entry[0] for entry in migrated):
+            continue
+        columns = [column["name"] for column in inspector.get_columns(actual_name)]
+        code_column, name_column, prerequisite_column = _table_columns(
+            columns, category == "prerequisites", prereq_column, COLUMN_OVERRIDES.get(table_name, {})
+        )
+        if not code_column or (category == "prerequisites" and not prerequisite_column):
+            continue
+
+        if category == "prerequisites":
+            rows = bind.execute(sa.text(
+                f"SELECT {quote(code_column)}, {quote(prerequisite_column)} FROM {quote(actual_name)}"
+            )).fetchall()
+            for code, value in rows:
+                if not code or not value:
+                    continue
+                code = _normalize_code(code)
+                course_names.setdefault(code, None)
+                for group in _prerequisite_groups(str(value)):
+                    for prerequisite_code in group:
+                        course_names.setdefault(prerequisite_code, None)
+                    prerequisite_rows.append((code, group, major_id, table_name))
+        else:
+            selected = [quote(code_column)] + ([quote(name_column)] if name_column else [])
+            rows = bind.execute(sa.text(f"SELECT {', '.join(selected)} FROM {quote(actual_name)}")).fetchall()
+            for row in rows:
+                if not row[0]:
+                    continue
+                code = _normalize_code(row[0])
+                name = row[1].strip() if name_column and isinstance(row[1], str) else None
+                if course_names.get(code) is None:
+                    course_names[code] = name
+                category_rows.append((code, major_id, sub_category, category, table_name))
+        migrated.append((actual_name, columns))
+
+    op.bulk_insert(course, [
+        {"course_code": code, "prefix": _split_code(code)[0], "number": _split_code(code)[1], "course_name": name}
+        for code, name in sorted(course_names.items())
+    ])
+    course_ids = dict(bind.execute(sa.text("SELECT course_code, id FROM course")).fetchall())
+
+    seen = set()
+    category_records = []
+    for code, major_id, sub_category, category, table_name in category_rows:
+        key = (code, table_name)
+        if key in seen:
+            continue
+        seen.add(key)
+        category_records.append({
+            "course_id": course_ids[code], "major_id": major_id, "sub_category": sub_category,
+            "category": category, "source_table": table_name,
+        })
+    op.bulk_insert(course_category, category_records)
+
+    prerequisite_records = []
+    for group_number, (code, group, major_id, table_name) in enumerate(prerequisite_rows, start=1):
+        for prerequisite_code in dict.fromkeys(group):
+            prerequisite_records.append({
+                "course_id": course_ids[code], "prerequisite_course_id": course_ids[prerequisite_code],
+                "requirement_group": group_number, "major_id": major_id, "source_table": table_name,
+            })
+    op.bulk_insert(prerequisite, prerequisite_records)
+
+    # Keep the original data and expose it unchanged under the old table names.
+    for actual_name, columns in migrated:
+        op.rename_table(actual_name, LEGACY_PREFIX + actual_name)
+        op.execute(
+            f"CREATE VIEW {quote(actual_name)} AS "
+            f"SELECT {', '.join(quote(column) for column in columns)} FROM {quote(LEGACY_PREFIX + actual_name)}"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    views = {name.lower(): name for name in inspector.get_view_names()}
+    tables = {name.lower(): name for name in inspector.get_table_names()}
+
+    for table_name, *_ in CATALOG_TABLES:
+        legacy_name = tables.get((LEGACY_PREFIX + table_name).lower())
+        if not legacy_name:
+            continue
+        view_name = views.pop(table_name.lower(), None)
+        if view_name:
+            op.execute(f"DROP VIEW {quote(view_name)}")
+        op.rename_table(legacy_name, legacy_name[len(LEGACY_PREFIX):])
+        tables.pop(legacy_name.lower())
+
+    op.drop_index('ix_prerequisite_prerequisite_course_id', table_name='prerequisite')
+    op.drop_index('ix_prerequisite_course_id', table_name='prerequisite')
+    op.drop_table('prerequisite')
+    op.drop_index('ix_course_category_course_id', table_name='course_category')
+    op.drop_index('ix_course_category_major_category', table_name='course_category')
+    op.drop_table('course_category')
+    op.drop_index('ix_course_prefix', table_name='course')
+    op.drop_index('ux_course_course_code', table_name='course')
+    op.drop_table('course')
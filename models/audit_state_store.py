@@ -0,0 +1,123 @@
+import logging
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from config import AUDIT_STATE_PATH, AUDIT_STATE_RETENTION
+
+
+logger = logging.getLogger(__name__)
+
+StudentAuditState = namedtuple(
+    "StudentAuditState",
+    ["student_id", "major_name", "audit_mode", "transcript_data", "pages", "audit_info", "updated_at"],
+)
+
+
+class AuditStateStore:
+    """
+    SQLite store of each student's last audit: the per-page extractions (keyed by
+    page hash), the merged transcript and the computed audit. States not saved for
+    the retention period are purged.
+    """
+
+    def __init__(self, path, retention_seconds=AUDIT_STATE_RETENTION):
+        """
+        Args:
+            path (str): Path to the SQLite database file. Created on first use.
+            retention_seconds (int): States not saved for this long are purged when another is saved.
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    directory = os.path.dirname(os.path.abspath(self.path))
+                    os.makedirs(directory, exist_ok=True)
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS student_audit_state ("
+                        "student_id TEXT PRIMARY KEY, major_name TEXT, audit_mode TEXT, "
+                        "transcript_json TEXT NOT NULL, pages_json TEXT NOT NULL, audit_json TEXT, "
+                        "updated_at TEXT NOT NULL)"
+                    )
+                    connection.commit()
+                    self._initialized = True
+        return connection
+
+    def get(self, student_id):
+        """
+        Load the stored state of a student.
+
+        Returns:
+            StudentAuditState or None: The state, or None if the student has none.
+            pages is a list of (page hash, parsed page data) in page order.
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT student_id, major_name, audit_mode, transcript_json, pages_json, audit_json, updated_at "
+                "FROM student_audit_state WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return StudentAuditState(
+            student_id=row[0],
+            major_name=row[1],
+            audit_mode=row[2],
+            transcript_data=json.loads(row[3]),
+            pages=[tuple(page) for page in json.loads(row[4])],
+            audit_info=json.loads(row[5]) if row[5] else None,
+            updated_at=row[6],
+        )
+
+    def save(self, state):
+        """
+        Insert or replace the state of a student and purge states past the retention period.
+        updated_at is set to the current time.
+        """
+        updated_at = datetime.now(timezone.utc).isoformat()
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)).isoformat()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO student_audit_state VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        state.student_id, state.major_name, state.audit_mode,
+                        json.dumps(state.transcript_data), json.dumps(state.pages),
+                        json.dumps(state.audit_info) if state.audit_info is not None else None,
+                        updated_at,
+                    ),
+                )
+                purged = connection.execute(
+                    "DELETE FROM student_audit_state WHERE updated_at < ?", (cutoff,)
+                ).rowcount
+        finally:
+            connection.close()
+        logger.info(f"Saved audit state for student {state.student_id} ({len(state.pages)} page(s)).")
+        if purged:
+            logger.info(f"Purged {purged} audit state(s) older than {self.retention_seconds}s.")
+        return state._replace(updated_at=updated_at)
+
+    def delete(self, student_id):
+        """Remove the stored state of a student. Returns True if there was one."""
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.execute("DELETE FROM student_audit_state WHERE student_id = ?", (student_id,))
+        finally:
+            connection.close()
+        return cursor.rowcount > 0
+
+
+audit_state_store = AuditStateStore(AUDIT_STATE_PATH)
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from models.catalog_loader import fetch_tables_batched, clear_column_cache
+from models.catalog_snapshot import SnapshotCatalogBackend
+from config import MAJOR_TABLE_MAPPING, CATALOG_CACHE_TTL, CATALOG_BACKEND, CATALOG_SNAPSHOT_PATH
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLE_KEYS = ("core", "elective", "supporting", "courses", "prerequisites")
+
+
+def get_catalog_table_names():
+    """
+    Collect every catalog table referenced by MAJOR_TABLE_MAPPING, including
+    sub-category tables and the general education table.
+
+    Returns:
+        list: Unique table names in mapping order.
+    """
+    table_names = []
+    for mapping in MAJOR_TABLE_MAPPING.values():
+        scopes = [mapping, *mapping.get("sub_categories", {}).values()]
+        for scope in scopes:
+            for key in CATALOG_TABLE_KEYS:
+                table_name = scope.get(key)
+                if table_name and table_name not in table_names:
+                    table_names.append(table_name)
+
+        general_table = mapping.get("table")
+        if general_table and general_table not in table_names:
+            table_names.append(general_table)
+    return table_names
+
+
+def get_default_loader():
+    """Return the catalog loader selected by CATALOG_BACKEND."""
+    if CATALOG_BACKEND == "snapshot":
+        logger.info(f"Reading the catalog from snapshot: {CATALOG_SNAPSHOT_PATH}")
+        return SnapshotCatalogBackend(CATALOG_SNAPSHOT_PATH).fetch_tables
+    if CATALOG_BACKEND != "database":
+        raise ValueError(f"Unknown CATALOG_BACKEND: {CATALOG_BACKEND}. Use 'database' or 'snapshot'.")
+    return fetch_tables_batched
+
+
+class CatalogCache:
+    """Process-wide, TTL-refreshed cache of the course catalog tables."""
+
+    def __init__(self, ttl_seconds=CATALOG_CACHE_TTL, loader=None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl_seconds (int): Seconds a catalog load is served before it is refreshed.
+                A value of 0 or less disables caching; every lookup is fetched directly.
+            loader (callable, optional): Function taking a list of table names and
+                returning a dict of table name to rows. Defaults to the loader selected by CATALOG_BACKEND.
+        """
+        self.ttl_seconds = ttl_seconds
+        self._loader = loader or get_default_loader()
+        self._lock = threading.RLock()
+        self._tables = {}
+        self._derived = {}
+        self._loaded_at = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _is_fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _refresh(self):
+        """Reload every catalog table. Keeps the stale copy if the load fails."""
+        try:
+            tables = self._loader(get_catalog_table_names())
+        except Exception as e:
+            logger.error(f"Catalog refresh failed, serving stale data: {e}")
+            return
+
+        self._tables = tables
+        self._loaded_at = time.monotonic()
+        self.generation += 1
+        self.refreshes += 1
+        logger.info(f"Catalog cache refreshed (generation {self.generation}).")
+
+    def get_table(self, table_name):
+        """
+        Return the cached rows of a catalog table, loading the catalog on a miss.
+
+        Args:
+            table_name (str): Name of the catalog table.
+
+        Returns:
+            list: The table rows, or an empty list if the table could not be loaded.
+        """
+        return self.get_tables([table_name]).get(table_name, [])
+
+    def get_tables(self, table_names):
+        """
+        Return the cached rows of several catalog tables.
+
+        A stale or empty cache is refreshed in one batched load; tables that are
+        still missing afterwards are fetched together in a single extra batch.
+
+        Args:
+            table_names (list): Names of the catalog tables.
+
+        Returns:
+            dict: Mapping of table name to rows. Tables that could not be loaded map to an empty list.
+        """
+        table_names = [name for name in table_names if name]
+        with self._lock:
+            if self.ttl_seconds <= 0:
+                self.misses += len(table_names)
+                return self._load_uncached(table_names)
+
+            refreshed = not self._is_fresh()
+            if refreshed:
+                self._refresh()
+
+            missing = [name for name in table_names if name not in self._tables]
+            if refreshed:
+                self.misses += len(table_names)
+            else:
+                self.hits += len(table_names) - len(missing)
+                self.misses += len(missing)
+            if missing:
+                self._tables.update(self._load_uncached(missing))
+
+            return {name: self._tables.get(name, []) for name in table_names}
+
+    def get_derived(self, key, builder):
+        """
+        Return a structure derived from the catalog (an index, a graph, ...), built once per catalog load.
+
+        Args:
+            key (str): Name of the derived structure.
+            builder (callable): Called with this cache to build the structure when it is missing or stale.
+
+        Returns:
+            The structure built for the current catalog generation.
+        """
+        with self._lock:
+            if self.ttl_seconds <= 0:
+                return builder(self)
+
+            if not self._is_fresh():
+                self._refresh()
+
+            entry = self._derived.get(key)
+            if entry is None or entry[0] != self.generation:
+                entry = (self.generation, builder(self))
+                self._derived[key] = entry
+                logger.info(f"Built derived catalog structure '{key}' for generation {self.generation}.")
+            return entry[1]
+
+    def preload(self, tables):
+        """
+        Serve a catalog that was loaded elsewhere, e.g. by the parent of a worker process.
+
+        The given tables replace the cache contents and also become the loader, so
+        TTL refreshes never reach the database.
+
+        Args:
+            tables (dict): Mapping of table name to rows, as returned by get_tables.
+        """
+        with self._lock:
+            self._loader = lambda names: {name: tables[name] for name in names if name in tables}
+            self._tables = dict(tables)
+            self._derived = {}
+            self._loaded_at = time.monotonic()
+            self.generation += 1
+            logger.info(f"Catalog cache preloaded with {len(tables)} table(s) (generation {self.generation}).")
+
+    def _load_uncached(self, table_names):
+        try:
+            return self._loader(table_names)
+        except Exception as e:
+            logger.error(f"Error loading catalog tables {table_names}: {e}")
+            return {}
+
+    def invalidate(self, table_name=None):
+        """
+        Drop cached data so that it is reloaded on the next lookup.
+
+        Args:
+            table_name (str, optional): Only drop this table. Drops the whole catalog when omitted.
+        """
+        with self._lock:
+            self._derived = {}
+            if table_name:
+                self._tables.pop(table_name, None)
+                logger.info(f"Invalidated catalog cache entry: {table_name}")
+            else:
+                self._tables = {}
+                self._loaded_at = None
+                clear_column_cache()
+                logger.info("Invalidated the whole catalog cache.")
+
+    def stats(self):
+        """Return hit/miss counters and the state of the current catalog load."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "generation": self.generation,
+                "tables_cached": len(self._tables),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+                "ttl_seconds": self.ttl_seconds,
+                "backend": CATALOG_BACKEND,
+            }
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,215 @@
+import logging
+import threading
+from collections import namedtuple
+from sqlalchemy import text, inspect, bindparam
+from sqlalchemy.exc import NoSuchTableError
+from db import db
+from config import MAJOR_TABLE_MAPPING, CATALOG_COLUMN_OVERRIDES
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+# Dialects whose DBAPI driver can return several result sets from one batch (pyodbc nextset)
+MULTI_RESULT_DIALECTS = {"mssql"}
+
+# Compact row types handed out by the loaders instead of full SELECT * rows
+CourseRow = namedtuple("CourseRow", ["code", "name"])
+PrerequisiteRow = namedtuple("PrerequisiteRow", ["course_code", "prerequisite_code"])
+TableColumns = namedtuple("TableColumns", ["code", "name", "prerequisite"])
+
+PREREQUISITE_COLUMNS = {
+    mapping["prerequisites"]: mapping.get("prereq_column")
+    for mapping in MAJOR_TABLE_MAPPING.values()
+    if mapping.get("prerequisites")
+}
+
+_column_cache = {}
+_column_lock = threading.Lock()
+
+
+def _reflect_columns(table_names):
+    """Return the column names of each existing table, in ordinal order."""
+    if db.engine.dialect.name in MULTI_RESULT_DIALECTS:
+        query = text(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_NAME IN :names ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        ).bindparams(bindparam("names", expanding=True))
+        requested = {name.lower(): name for name in table_names}
+        columns = {}
+        with db.session() as session:
+            for table_name, column_name in session.execute(query, {"names": list(table_names)}):
+                requested_name = requested.get(table_name.lower())
+                if requested_name:
+                    columns.setdefault(requested_name, []).append(column_name)
+        return columns
+
+    inspector = inspect(db.engine)
+    columns = {}
+    for table_name in table_names:
+        try:
+            columns[table_name] = [column["name"] for column in inspector.get_columns(table_name)]
+        except NoSuchTableError:
+            continue
+    return columns
+
+
+def _pick_column(columns, keyword, exclude=None):
+    for column in columns:
+        if keyword in column.lower() and column != exclude:
+            return column
+    return None
+
+
+def _build_table_columns(table_name, columns):
+    override = CATALOG_COLUMN_OVERRIDES.get(table_name, {})
+
+    prerequisite = None
+    if table_name in PREREQUISITE_COLUMNS:
+        prerequisite = PREREQUISITE_COLUMNS[table_name]
+        if prerequisite not in columns:
+            prerequisite = _pick_column(columns, "prereq")
+
+    code = override.get("code") or _pick_column(columns, "code", exclude=prerequisite)
+    name = override.get("name") or _pick_column(columns, "name")
+    return TableColumns(code=code, name=name, prerequisite=prerequisite)
+
+
+def resolve_table_columns(table_names):
+    """
+    Resolve the code/name (and prerequisite) columns of catalog tables.
+
+    Columns are reflected once per table, in a single query where the dialect
+    allows it, and memoized for the lifetime of the process.
+
+    Args:
+        table_names (list): Names of the catalog tables.
+
+    Returns:
+        dict: Mapping of table name to TableColumns for every table that exists
+        and has a course code column.
+    """
+    with _column_lock:
+        unresolved = [name for name in table_names if name not in _column_cache]
+        if unresolved:
+            reflected = _reflect_columns(unresolved)
+            for table_name in unresolved:
+                if table_name not in reflected:
+                    logger.error(f"Catalog table not found: {table_name}")
+                    continue
+                table_columns = _build_table_columns(table_name, reflected[table_name])
+                if not table_columns.code:
+                    logger.error(f"No course code column found in table: {table_name}")
+                    continue
+                _column_cache[table_name] = table_columns
+                logger.debug(f"Resolved columns for {table_name}: {table_columns}")
+
+        return {name: _column_cache[name] for name in table_names if name in _column_cache}
+
+
+def clear_column_cache():
+    """Forget resolved columns so the next load reflects the tables again."""
+    with _column_lock:
+        _column_cache.clear()
+
+
+def _projection_query(table_name, table_columns):
+    quote = db.engine.dialect.identifier_preparer.quote
+    second_column = table_columns.prerequisite or table_columns.name
+    columns = [table_columns.code] + ([second_column] if second_column else [])
+    return f"SELECT {', '.join(quote(column) for column in columns)} FROM {table_name}"
+
+
+def _build_rows(table_columns, raw_rows):
+    if table_columns.prerequisite:
+        return [
+            PrerequisiteRow(normalize_course_code(str(code)), str(prerequisite).strip())
+            for code, prerequisite in raw_rows
+            if code and prerequisite
+        ]
+
+    rows = []
+    for raw_row in raw_rows:
+        code = raw_row[0]
+        if not code:
+            continue
+        name = raw_row[1] if table_columns.name else None
+        rows.append(CourseRow(normalize_course_code(str(code)), name.strip() if isinstance(name, str) else name))
+    return rows
+
+
+def fetch_tables_sequential(table_names, table_columns=None):
+    """
+    Fetch catalog tables one statement at a time over a single session.
+
+    Tables that fail to load are logged and left out of the result.
+
+    Args:
+        table_names (list): Names of the tables to load.
+        table_columns (dict, optional): Pre-resolved columns from resolve_table_columns.
+
+    Returns:
+        dict: Mapping of table name to a list of CourseRow or PrerequisiteRow tuples.
+    """
+    if table_columns is None:
+        table_columns = resolve_table_columns(table_names)
+
+    tables = {}
+    with db.session() as session:
+        for table_name in table_names:
+            if table_name not in table_columns:
+                continue
+            try:
+                raw_rows = session.execute(text(_projection_query(table_name, table_columns[table_name]))).fetchall()
+                tables[table_name] = _build_rows(table_columns[table_name], raw_rows)
+            except Exception as e:
+                logger.error(f"Error loading catalog table {table_name}: {e}")
+                session.rollback()
+    return tables
+
+
+def fetch_tables_batched(table_names):
+    """
+    Fetch several catalog tables in a single round trip.
+
+    Only the resolved code/name (or prerequisite) columns are selected. On SQL
+    Server all statements are sent as one batch and the result sets are read
+    back in order with nextset(). Other dialects, or a batch that fails, fall
+    back to sequential queries so a single bad table does not hide the others.
+
+    Args:
+        table_names (list): Names of the tables to load.
+
+    Returns:
+        dict: Mapping of table name to a list of CourseRow or PrerequisiteRow tuples.
+    """
+    table_names = list(dict.fromkeys(name for name in table_names if name))
+    if not table_names:
+        return {}
+
+    table_columns = resolve_table_columns(table_names)
+    table_names = [name for name in table_names if name in table_columns]
+
+    if db.engine.dialect.name not in MULTI_RESULT_DIALECTS:
+        return fetch_tables_sequential(table_names, table_columns)
+
+    batch = "SET NOCOUNT ON;\n" + ";\n".join(
+        _projection_query(table_name, table_columns[table_name]) for table_name in table_names
+    )
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(batch)
+        tables = {}
+        for index, table_name in enumerate(table_names):
+            tables[table_name] = _build_rows(table_columns[table_name], cursor.fetchall())
+            if index < len(table_names) - 1 and not cursor.nextset():
+                raise RuntimeError(f"Batch returned no result set for table {table_names[index + 1]}")
+        cursor.close()
+        logger.info(f"Fetched {len(tables)} catalog table(s) in one round trip.")
+        return tables
+    except Exception as e:
+        logger.warning(f"Batched catalog fetch failed, falling back to per-table queries: {e}")
+        return fetch_tables_sequential(table_names, table_columns)
+    finally:
+        connection.close()
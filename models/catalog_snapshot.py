@@ -0,0 +1,148 @@
+import logging
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from models.catalog_loader import CourseRow, PrerequisiteRow, PREREQUISITE_COLUMNS, fetch_tables_batched
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MMAP_SIZE = 256 * 1024 * 1024
+
+COURSE_KIND = "course"
+PREREQUISITE_KIND = "prerequisite"
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def export_catalog_snapshot(table_names, path, source="database"):
+    """
+    Export catalog tables into a versioned SQLite snapshot file.
+
+    Rows are fetched with the projected catalog loader, so the snapshot holds exactly
+    what the application reads. The file is written next to the target and moved into
+    place atomically, so running instances never see a half-written snapshot.
+
+    Args:
+        table_names (list): Catalog tables to export.
+        path (str): Destination file path.
+        source (str): Description of where the data came from, stored in the metadata.
+
+    Returns:
+        dict: Snapshot metadata (format version, content hash, table and row counts).
+    """
+    tables = fetch_tables_batched(table_names)
+    missing = [name for name in table_names if name not in tables]
+    if missing:
+        logger.warning(f"Tables not exported (missing or unreadable): {missing}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix=".sqlite3", dir=directory)
+    os.close(fd)
+
+    content_hash = hashlib.sha256()
+    row_count = 0
+    try:
+        connection = sqlite3.connect(temp_path)
+        with connection:
+            connection.execute("CREATE TABLE _snapshot_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE _snapshot_tables (table_name TEXT PRIMARY KEY, kind TEXT NOT NULL, row_count INTEGER NOT NULL)"
+            )
+            for table_name in sorted(tables):
+                rows = tables[table_name]
+                kind = PREREQUISITE_KIND if table_name in PREREQUISITE_COLUMNS else COURSE_KIND
+                columns = PrerequisiteRow._fields if kind == PREREQUISITE_KIND else CourseRow._fields
+                connection.execute(f"CREATE TABLE {_quote(table_name)} ({', '.join(f'{c} TEXT' for c in columns)})")
+                connection.executemany(f"INSERT INTO {_quote(table_name)} VALUES (?, ?)", rows)
+                connection.execute("INSERT INTO _snapshot_tables VALUES (?, ?, ?)", (table_name, kind, len(rows)))
+                content_hash.update(json.dumps([table_name, kind, rows]).encode("utf-8"))
+                row_count += len(rows)
+
+            metadata = {
+                "format_version": str(SNAPSHOT_FORMAT_VERSION),
+                "content_hash": content_hash.hexdigest(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "source": source,
+                "table_count": str(len(tables)),
+                "row_count": str(row_count),
+            }
+            connection.executemany("INSERT INTO _snapshot_meta VALUES (?, ?)", metadata.items())
+        connection.close()
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logger.info(f"Exported catalog snapshot to {path}: {metadata}")
+    return metadata
+
+
+class SnapshotCatalogBackend:
+    """Reads catalog tables from a local SQLite snapshot produced by export_catalog_snapshot."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the snapshot file.
+        """
+        self.path = path
+
+    def _connect(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Catalog snapshot not found: {self.path}")
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True)
+        connection.execute(f"PRAGMA mmap_size={SNAPSHOT_MMAP_SIZE}")
+        return connection
+
+    def info(self):
+        """Return the snapshot metadata."""
+        connection = self._connect()
+        try:
+            return dict(connection.execute("SELECT key, value FROM _snapshot_meta").fetchall())
+        finally:
+            connection.close()
+
+    def fetch_tables(self, table_names):
+        """
+        Read catalog tables from the snapshot.
+
+        Args:
+            table_names (list): Names of the tables to load.
+
+        Returns:
+            dict: Mapping of table name to a list of CourseRow or PrerequisiteRow tuples.
+            Tables that are not part of the snapshot are logged and left out.
+        """
+        connection = self._connect()
+        try:
+            metadata = dict(connection.execute("SELECT key, value FROM _snapshot_meta").fetchall())
+            if metadata.get("format_version") != str(SNAPSHOT_FORMAT_VERSION):
+                raise ValueError(
+                    f"Unsupported catalog snapshot format {metadata.get('format_version')} "
+                    f"(expected {SNAPSHOT_FORMAT_VERSION}). Re-export the snapshot."
+                )
+
+            kinds = dict(connection.execute("SELECT table_name, kind FROM _snapshot_tables").fetchall())
+            tables = {}
+            for table_name in table_names:
+                kind = kinds.get(table_name)
+                if kind is None:
+                    logger.error(f"Catalog table not found in snapshot: {table_name}")
+                    continue
+                row_type = PrerequisiteRow if kind == PREREQUISITE_KIND else CourseRow
+                rows = connection.execute(f"SELECT * FROM {_quote(table_name)}").fetchall()
+                tables[table_name] = [row_type(*row) for row in rows]
+
+            logger.info(f"Read {len(tables)} catalog table(s) from snapshot {metadata.get('content_hash', '')[:12]}.")
+            return tables
+        finally:
+            connection.close()
@@ -1,7 +1,7 @@
 import logging
-from sqlalchemy import text
-from db import db
-from config import MAJOR_TABLE_MAPPING, PREFIX_MAJOR_MAPPING, MAJOR_REQUIREMENTS
+from models.catalog_cache import catalog_cache
+from models.requirement_model import requirement_model
+from config import MAJOR_TABLE_MAPPING
 
 
 
@@ -28,43 +28,18 @@ class CourseHandler:
         Retrieve the major ID and sub-category based on the major name or prefix.
         If the major name matches a sub-category, treat it as the main major with the appropriate sub-category.
         """
-        if major_name:
-            for major_id, mapping in MAJOR_TABLE_MAPPING.items():
-                if mapping.get("main_category") == major_name:
-                    return major_id, None
-                if "sub_categories" in mapping:
-                    for sub_category in mapping["sub_categories"]:
-                        if sub_category == major_name:
-                            return major_id, sub_category
-
-            for major_id, requirements in MAJOR_REQUIREMENTS.items():
-                if "sub_categories" in requirements:
-                    for sub_category in requirements["sub_categories"]:
-                        if sub_category == major_name:
-                            return major_id, sub_category
-
-        if course_code_prefix:
-            return PREFIX_MAJOR_MAPPING.get(course_code_prefix), None
-
-        logger.error(f"No mapping found for major name: {major_name} or course code prefix: {course_code_prefix}")
-        return None, None
+        major_id, sub_category = requirement_model.resolve(major_name, course_code_prefix)
+        if major_id is None:
+            logger.error(f"No mapping found for major name: {major_name} or course code prefix: {course_code_prefix}")
+        return major_id, sub_category
 
     def _get_major_table_mapping(self):
-        """Retrieve the mapping for the major or sub-category."""
-        major_mapping = MAJOR_TABLE_MAPPING.get(self.major_id)
-        if not major_mapping:
-            logger.error(f"No mapping found for major ID: {self.major_id}")
+        """Retrieve the compiled table mapping for the major or sub-category."""
+        self.program = requirement_model.program(self.major_id, self.sub_category)
+        if not self.program:
+            logger.error(f"No mapping found for major ID: {self.major_id} with sub-category: {self.sub_category}")
             raise ValueError(f"No mapping found for major ID: {self.major_id}")
-
-        
-        if self.sub_category:
-            sub_mapping = major_mapping.get("sub_categories", {}).get(self.sub_category)
-            if not sub_mapping:
-                logger.error(f"No mapping found for sub-category: {self.sub_category}")
-                raise ValueError(f"No mapping found for sub-category: {self.sub_category}")
-            return sub_mapping
-
-        return major_mapping
+        return self.program.tables
 
     def query_core_courses(self):
         """Query core courses for the major or sub-category."""
@@ -85,24 +60,42 @@ class CourseHandler:
 
         return self._execute_query(supporting_table)
 
-    
+    def query_required_courses(self):
+        """
+        Fetch every course category needed for an audit in a single catalog lookup.
+
+        Returns:
+            dict: Rows tagged by category: core, elective, supporting and general_education.
+        """
+        category_tables = {
+            "core": self.mapping.get("core"),
+            "elective": self.mapping.get("elective"),
+            "supporting": self.mapping.get("supporting"),
+            "general_education": MAJOR_TABLE_MAPPING["general"]["table"],
+        }
+        tables = catalog_cache.get_tables(list(category_tables.values()))
+
+        required_rows = {}
+        for category, table_name in category_tables.items():
+            required_rows[category] = tables.get(table_name, []) if table_name else []
+            if table_name and not required_rows[category]:
+                logger.warning(f"No data found in table: {table_name}")
+        logger.info(f"Retrieved required course rows for major ID {self.major_id}: "
+                    f"{ {category: len(rows) for category, rows in required_rows.items()} }")
+        return required_rows
 
     def _execute_query(self, table_name):
-        """Helper method to execute a query on the specified table."""
+        """Helper method to read the rows of the specified table from the catalog cache."""
         if not table_name:
             logger.error("No table name provided for query execution.")
             return []
 
         try:
-            logger.info(f"Executing query on table: {table_name}")
-            query = text(f"SELECT * FROM {table_name}")
-
-            with db.session() as session:
-                result = session.execute(query).fetchall()
-                if not result:
-                    logger.warning(f"No data found in table: {table_name}")
-                else:
-                    logger.info(f"Retrieved data from {table_name}: {result}")
+            result = catalog_cache.get_table(table_name)
+            if not result:
+                logger.warning(f"No data found in table: {table_name}")
+            else:
+                logger.info(f"Retrieved {len(result)} row(s) from {table_name}")
 
             return result
         except Exception as e:
@@ -110,25 +103,7 @@ class CourseHandler:
             return []
 
     def get_major_requirements(self):
-        """Retrieve the requirements for the major based on the major ID."""
-        major_requirements = MAJOR_REQUIREMENTS.get(self.major_id)
-
-        if not major_requirements:
-            logger.error(f"No requirements found for major ID: {self.major_id}")
-            raise ValueError(f"No requirements found for major ID: {self.major_id}")
-
-        if "sub_categories" in major_requirements and self.sub_category:
-            sub_requirements = major_requirements["sub_categories"].get(self.sub_category, {})
-            major_requirements = {**major_requirements, **sub_requirements} 
-        defaults = {
-            "core_courses_needed": 0,
-            "elective_courses_needed": 0,
-            "supporting_courses_needed": 0,
-            "supporting_prefixes": [],
-        }
-        for key, default in defaults.items():
-            if key not in major_requirements:
-                major_requirements[key] = default
-
-        logger.info(f"Retrieved requirements for major ID {self.major_id}: {major_requirements}")
+        """Retrieve the validated, defaults-applied requirements for the major or sub-category."""
+        major_requirements = self.program.requirements
+        logger.info(f"Retrieved requirements for major ID {self.major_id}: {dict(major_requirements)}")
         return major_requirements
@@ -0,0 +1,215 @@
+import logging
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from models.catalog_cache import catalog_cache, get_catalog_table_names
+from models.catalog_loader import CourseRow
+from models.requirement_model import EXACT_CODE_CATEGORIES, GENERAL_ED_COUNTS, requirement_model
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+IndexEntry = namedtuple("IndexEntry", ["major_id", "sub_category", "category"])
+
+MAJOR_LIST_CATEGORIES = ("core", "supporting", "elective")
+
+# A general education option that looks like a code or department prefix ('PHIL', 'PHIL 221');
+# anything else ('Foreign Language') is matched against course names.
+CODE_OPTION_PATTERN = re.compile(r'^[A-Z]{2,5}\d{0,3}[A-Z]?$')
+
+# Most (code, name) classifications memoized per catalog load.
+CLASSIFY_CACHE_SIZE = 50000
+
+
+def normalize_name_key(name):
+    """Lower-case a course name and collapse punctuation, e.g. 'Foreign-Language I' -> 'foreign language i'."""
+    return " ".join(re.findall(r'[a-z0-9]+', (name or "").lower()))
+
+
+class PrefixTrie:
+    """Character trie returning every value stored at a prefix of a key."""
+
+    __slots__ = ("root",)
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, prefix, value):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(None, []).append(value)
+
+    def matches(self, key):
+        """Values stored at any prefix of key (including key itself), shortest prefix first."""
+        values = []
+        node = self.root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            values.extend(node.get(None, ()))
+        return values
+
+
+class CourseIndex:
+    """
+    Catalog-wide inverted index answering which categories of which majors a course counts for.
+
+    Major course lists and compulsory/religious options are indexed by exact code,
+    prefix-based general education options live in a prefix trie, and the few options
+    that name a subject ('Foreign Language') are matched against course names.
+    General education entries carry no sub-category since the rules are per major.
+    """
+
+    def __init__(self, by_code, prefix_trie, name_rules, names):
+        """
+        Args:
+            by_code (dict): Normalized code -> tuple of IndexEntry.
+            prefix_trie (PrefixTrie): Department prefixes -> IndexEntry values.
+            name_rules (list): (normalized phrase, IndexEntry) pairs.
+            names (dict): Normalized code -> course name for every catalog course.
+        """
+        self.by_code = by_code
+        self.prefix_trie = prefix_trie
+        self.name_rules = name_rules
+        self.names = names
+        self.sorted_codes = sorted(names)
+        self.name_tokens = {}
+        for code, name in names.items():
+            for token in set(normalize_name_key(name).split()):
+                self.name_tokens.setdefault(token, set()).add(code)
+        self._classified = {}
+
+    def classify(self, code, name=None):
+        """
+        Return every (major_id, sub_category, category) a course counts for.
+
+        Args:
+            code (str): Course code, normalized or not.
+            name (str, optional): Course name from the transcript; falls back to the catalog name.
+
+        Returns:
+            tuple: IndexEntry values; major lists first, then general education categories.
+        """
+        code = normalize_course_code(code or "")
+        name_key = normalize_name_key(name or self.names.get(code)) if self.name_rules else ""
+        key = (code, name_key)
+        entries = self._classified.get(key)
+        if entries is None:
+            entries = list(self.by_code.get(code, ()))
+            entries.extend(self.prefix_trie.matches(code))
+            if name_key:
+                padded = f" {name_key} "
+                entries.extend(entry for phrase, entry in self.name_rules if f" {phrase} " in padded)
+            entries = tuple(dict.fromkeys(entries))
+            if len(self._classified) < CLASSIFY_CACHE_SIZE:
+                self._classified[key] = entries
+        return entries
+
+    def categories_for(self, code, major_id, sub_category=None, name=None):
+        """
+        Return the categories a course counts for in one program.
+
+        Returns:
+            list: Category names, e.g. ['core'] or ['humanities'].
+        """
+        return [
+            entry.category for entry in self.classify(code, name)
+            if entry.major_id == major_id
+            and (entry.category not in MAJOR_LIST_CATEGORIES or entry.sub_category == sub_category)
+        ]
+
+    def general_education_categories(self, code, major_id, name=None):
+        """Return the set of general education categories of a major that a course counts for."""
+        return frozenset(
+            entry.category for entry in self.classify(code, name)
+            if entry.major_id == major_id and entry.category not in MAJOR_LIST_CATEGORIES
+        )
+
+    def search(self, query, limit=20):
+        """
+        Find catalog courses by exact code, code prefix or name words.
+
+        Args:
+            query (str): e.g. 'CSCS 2', 'MATH101' or 'data structures'.
+            limit (int): Most results to return.
+
+        Returns:
+            list: Dictionaries with course_code, course_name and categories (IndexEntry dicts).
+        """
+        results = []
+        code_query = normalize_course_code(query or "")
+        if code_query:
+            start = bisect_left(self.sorted_codes, code_query)
+            for code in self.sorted_codes[start:]:
+                if not code.startswith(code_query) or len(results) >= limit:
+                    break
+                results.append(code)
+
+        tokens = normalize_name_key(query).split()
+        if tokens and len(results) < limit:
+            matches = set.intersection(*(self.name_tokens.get(token, set()) for token in tokens))
+            results.extend(code for code in sorted(matches) if code not in results)
+
+        return [
+            {
+                "course_code": code,
+                "course_name": self.names.get(code),
+                "categories": [entry._asdict() for entry in self.classify(code)],
+            }
+            for code in results[:limit]
+        ]
+
+
+def build_course_index(cache):
+    """
+    Build the course index from the cached catalog and the compiled requirement model.
+
+    Args:
+        cache (CatalogCache): The catalog cache to read from.
+
+    Returns:
+        CourseIndex: Index for the current catalog load.
+    """
+    tables = cache.get_tables(get_catalog_table_names())
+    names = {}
+    for rows in tables.values():
+        for row in rows:
+            if isinstance(row, CourseRow) and row.code:
+                names.setdefault(normalize_course_code(row.code), row.name)
+
+    by_code = {}
+    for (major_id, sub_category), program in requirement_model.programs.items():
+        for category in MAJOR_LIST_CATEGORIES:
+            for row in tables.get(program.tables[category], []) if program.tables[category] else ():
+                if row.code:
+                    entry = IndexEntry(major_id, sub_category, category)
+                    by_code.setdefault(normalize_course_code(row.code), {})[entry] = None
+
+    prefix_trie = PrefixTrie()
+    name_rules = []
+    for major_id, general_education in requirement_model.general_education.items():
+        for category, (_, options_key) in GENERAL_ED_COUNTS.items():
+            entry = IndexEntry(major_id, None, category)
+            for option in dict.fromkeys(general_education.rules.get(options_key, ())):
+                code = normalize_course_code(option)
+                if category in EXACT_CODE_CATEGORIES:
+                    by_code.setdefault(code, {})[entry] = None
+                elif CODE_OPTION_PATTERN.match(code):
+                    prefix_trie.insert(code, entry)
+                else:
+                    name_rules.append((normalize_name_key(option), entry))
+
+    index = CourseIndex({code: tuple(entries) for code, entries in by_code.items()}, prefix_trie, name_rules, names)
+    logger.info(
+        f"Built course index: {len(by_code)} indexed code(s), {len(names)} catalog course(s), "
+        f"{len(name_rules)} name rule(s)."
+    )
+    return index
+
+
+def get_course_index():
+    """Return the course index for the current catalog load."""
+    return catalog_cache.get_derived("course_index", build_course_index)
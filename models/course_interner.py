@@ -0,0 +1,86 @@
+import logging
+from models.catalog_cache import catalog_cache, get_catalog_table_names
+from models.catalog_loader import PrerequisiteRow
+from utils.normalization import extract_course_codes
+
+
+logger = logging.getLogger(__name__)
+
+
+class CourseInterner:
+    """Maps course codes to dense integer ids for one catalog load."""
+
+    __slots__ = ("_ids", "codes")
+
+    def __init__(self, codes=()):
+        self._ids = {}
+        self.codes = []
+        for code in codes:
+            self.intern(code)
+
+    def intern(self, code):
+        """Return the id of a course code, assigning the next free id if it is new."""
+        course_id = self._ids.get(code)
+        if course_id is None:
+            course_id = len(self.codes)
+            self._ids[code] = course_id
+            self.codes.append(code)
+        return course_id
+
+    def get(self, code):
+        """Return the id of a course code, or None if it is not part of the catalog."""
+        return self._ids.get(code)
+
+    def code(self, course_id):
+        """Return the course code for an id."""
+        return self.codes[course_id]
+
+    def mask(self, codes):
+        """Build a bitset (int) of the known courses among the given codes. Unknown codes are ignored."""
+        mask = 0
+        for code in codes:
+            course_id = self._ids.get(code)
+            if course_id is not None:
+                mask |= 1 << course_id
+        return mask
+
+    def codes_in(self, mask):
+        """Return the course codes set in a bitset, in id order."""
+        codes = []
+        while mask:
+            low_bit = mask & -mask
+            codes.append(self.codes[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._ids
+
+
+def build_course_interner(cache):
+    """
+    Intern every course code found in the cached catalog tables.
+
+    Args:
+        cache (CatalogCache): The catalog cache to read from.
+
+    Returns:
+        CourseInterner: Interner covering all catalog and prerequisite codes.
+    """
+    interner = CourseInterner()
+    for rows in cache.get_tables(get_catalog_table_names()).values():
+        for row in rows:
+            interner.intern(row[0])
+            if isinstance(row, PrerequisiteRow):
+                for code in extract_course_codes(row.prerequisite_code):
+                    interner.intern(code)
+    logger.info(f"Interned {len(interner)} catalog course code(s).")
+    return interner
+
+
+def get_course_interner():
+    """Return the course interner for the current catalog load."""
+    return catalog_cache.get_derived("course_interner", build_course_interner)
@@ -0,0 +1,234 @@
+import logging
+from config import MAJOR_TABLE_MAPPING
+from models.catalog_cache import catalog_cache
+from models.course_index import build_course_index
+from models.degree_audit_engine import elective_courses_required
+from models.requirement_model import DEFAULT_SUB_CATEGORY, EXACT_CODE_CATEGORIES, GENERAL_ED_COUNTS, requirement_model
+from models.transcript import get_passed_courses
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+MAJOR_CATEGORIES = ("core", "elective", "supporting")
+
+# Order in which overlapping catalog lists claim a course.
+CATEGORY_PRIORITY = ("core", "supporting", "elective")
+
+
+class ProgramCourseSets:
+    """Course lists and required counts of one major program, as the local degree audit counts them."""
+
+    __slots__ = (
+        "major_id", "sub_category", "name", "core", "elective", "supporting",
+        "core_required", "elective_required", "supporting_required",
+        "general_education_required", "reserved",
+    )
+
+    def __init__(self, program, core, elective, supporting):
+        """
+        Args:
+            program (MajorProgram): The compiled program the lists belong to.
+            core, elective, supporting (set): Normalized course codes of the catalog lists.
+        """
+        requirements = program.requirements
+        self.major_id = program.major_id
+        self.sub_category = program.sub_category
+        self.name = program.sub_category or program.name
+        # Categories overlap in the catalog; a course counts for the first one it appears in.
+        self.core = frozenset(core)
+        self.supporting = frozenset(supporting - self.core)
+        self.elective = frozenset(elective - self.core - self.supporting)
+        self.core_required = requirements.get("core_courses_needed") or len(self.core)
+        self.supporting_required = requirements.get("supporting_courses_needed") or len(self.supporting)
+        self.elective_required = elective_courses_required(requirements)
+
+        rules = program.general_education.rules
+        required_counts = program.general_education.required_counts
+        self.general_education_required = {
+            category: required_counts[category] for category in GENERAL_ED_COUNTS if required_counts[category]
+        }
+        # Compulsory and religious courses never count towards another general education category.
+        self.reserved = frozenset(
+            normalize_course_code(code)
+            for category in EXACT_CODE_CATEGORIES
+            for code in rules.get(GENERAL_ED_COUNTS[category][1], ())
+        )
+
+    def remaining_counts(self, matched):
+        """
+        Count the courses still needed in each category, counting like the local degree audit.
+
+        Args:
+            matched (dict): Category -> passed course codes that count for it, in transcript order.
+
+        Returns:
+            dict: Category -> courses still needed; general education categories are summed
+            under "general_education".
+        """
+        used = set()
+        remaining = {}
+        for category in MAJOR_CATEGORIES:
+            required = getattr(self, f"{category}_required")
+            taken = matched.get(category, [])[:required]
+            used.update(taken)
+            remaining[category] = required - len(taken)
+
+        remaining["general_education"] = 0
+        for category, required in self.general_education_required.items():
+            exact = category in EXACT_CODE_CATEGORIES
+            taken = [
+                code for code in matched.get(category, ())
+                if code not in used and (exact or code not in self.reserved)
+            ][:required]
+            used.update(taken)
+            remaining["general_education"] += required - len(taken)
+        return remaining
+
+    @property
+    def courses_required(self):
+        return (self.core_required + self.supporting_required + self.elective_required
+                + sum(self.general_education_required.values()))
+
+
+class CourseSetIndex:
+    """Per-program course lists for one catalog load, for auditing a transcript against every major."""
+
+    def __init__(self, course_sets, course_index):
+        """
+        Args:
+            course_sets (dict): (major_id, sub_category) -> ProgramCourseSets.
+            course_index (CourseIndex): Catalog-wide course index of the same catalog load.
+        """
+        self.course_sets = course_sets
+        self.course_index = course_index
+        self.programs = list(course_sets.values())
+        self.positions = {(course_sets.major_id, course_sets.sub_category): position
+                          for position, course_sets in enumerate(self.programs)}
+        self.major_positions = {}
+        for position, course_sets in enumerate(self.programs):
+            self.major_positions.setdefault(course_sets.major_id, []).append(position)
+
+    def lookup(self, code, name=None):
+        """
+        Return every (program position, category) a passed course counts for, from the course index.
+
+        Within a program a course belongs to one major category (core, then supporting,
+        then elective) but may also match several general education categories.
+        """
+        entries = []
+        major_categories = {}
+        for entry in self.course_index.classify(code, name):
+            if entry.category in MAJOR_CATEGORIES:
+                position = self.positions.get((entry.major_id, entry.sub_category))
+                if position is not None:
+                    major_categories.setdefault(position, set()).add(entry.category)
+                continue
+            for position in self.major_positions.get(entry.major_id, ()):
+                if entry.category in self.programs[position].general_education_required:
+                    entries.append((position, entry.category))
+        for position, categories in major_categories.items():
+            entries.append((position, next(category for category in CATEGORY_PRIORITY if category in categories)))
+        return entries
+
+    def get(self, major_id, sub_category=None):
+        """Return the ProgramCourseSets of a program, or None."""
+        return self.course_sets.get((major_id, sub_category))
+
+    def what_if(self, passed_courses, limit=None):
+        """
+        Audit one set of passed courses against every major program in a single pass.
+
+        Each passed course is looked up once in the course index and credited to
+        every (program, category) it counts for; the per-program counts are then
+        resolved like the local degree audit.
+
+        Args:
+            passed_courses (dict): Passed course code -> name, in transcript order.
+            limit (int, optional): Number of programs to return.
+
+        Returns:
+            list: Dictionaries with major_id, sub_category, major_name, courses_remaining,
+            the remaining count per category, courses_required and progress (0-1), fewest remaining first.
+        """
+        matched = {}
+        for code, name in passed_courses.items():
+            for position, category in self.lookup(code, name):
+                matched.setdefault(position, {}).setdefault(category, []).append(code)
+
+        ranking = []
+        for position, course_sets in enumerate(self.programs):
+            remaining = course_sets.remaining_counts(matched.get(position, {}))
+            required = course_sets.courses_required
+            courses_remaining = sum(remaining.values())
+            ranking.append({
+                "major_id": course_sets.major_id,
+                "sub_category": course_sets.sub_category,
+                "major_name": course_sets.name,
+                "courses_remaining": courses_remaining,
+                "core_remaining": remaining["core"],
+                "supporting_remaining": remaining["supporting"],
+                "elective_remaining": remaining["elective"],
+                "general_education_remaining": remaining["general_education"],
+                "courses_required": required,
+                "progress": round(1 - courses_remaining / required, 4) if required else 0.0,
+            })
+        ranking.sort(key=lambda entry: (entry["courses_remaining"], -entry["progress"], entry["major_id"]))
+        return ranking[:limit] if limit else ranking
+
+
+def _ranked_programs():
+    """Programs compared across majors: each bare major plus its table-level sub-categories."""
+    for (major_id, sub_category), program in requirement_model.programs.items():
+        table_sub_categories = MAJOR_TABLE_MAPPING[major_id].get("sub_categories", {})
+        if sub_category is None or (sub_category in table_sub_categories and sub_category != DEFAULT_SUB_CATEGORY):
+            yield program
+
+
+def build_course_set_index(cache):
+    """
+    Precompute the course lists of every major program from the cached catalog.
+
+    Args:
+        cache (CatalogCache): The catalog cache to read from.
+
+    Returns:
+        CourseSetIndex: Index for the current catalog load.
+    """
+    programs = list(_ranked_programs())
+    table_names = {program.tables[category] for program in programs for category in MAJOR_CATEGORIES}
+    tables = cache.get_tables([name for name in table_names if name])
+
+    course_index = cache.get_derived("course_index", build_course_index)
+
+    course_sets = {}
+    for program in programs:
+        codes = {
+            category: {normalize_course_code(row.code) for row in tables.get(program.tables[category], []) if row.code}
+            for category in MAJOR_CATEGORIES
+        }
+        course_sets[(program.major_id, program.sub_category)] = ProgramCourseSets(
+            program, codes["core"], codes["elective"], codes["supporting"]
+        )
+
+    logger.info(f"Built course lists for {len(course_sets)} program(s).")
+    return CourseSetIndex(course_sets, course_index)
+
+
+def get_course_set_index():
+    """Return the course set index for the current catalog load."""
+    return catalog_cache.get_derived("course_set_index", build_course_set_index)
+
+
+def get_what_if_majors(transcript_data, limit=None):
+    """
+    Rank every major program by the courses a transcript would still need after switching to it.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        limit (int, optional): Number of programs to return.
+
+    Returns:
+        list: Ranked entries as returned by CourseSetIndex.what_if.
+    """
+    return get_course_set_index().what_if(get_passed_courses(transcript_data), limit=limit)
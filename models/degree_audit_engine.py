@@ -0,0 +1,184 @@
+import logging
+from models.course_index import get_course_index
+from models.requirement_model import EXACT_CODE_CATEGORIES, GENERAL_ED_COUNTS
+from models.transcript import get_passed_courses
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+GENERAL_ED_DEPARTMENTS = {
+    "compulsory": "Compulsory",
+    "religious": "Religious Studies",
+    "humanities": "Humanities",
+    "social_sciences": "Social Sciences",
+    "science_lab": "Science with Lab",
+    "mathematics": "Mathematics",
+    "cs_require": "Computer Science",
+    "additional_courses": "Additional Courses",
+}
+
+
+def _course_entry(code, name):
+    return {"course_code": code, "course_name": name}
+
+
+def _catalog_courses(rows):
+    """Course code -> name for catalog rows, in catalog order."""
+    courses = {}
+    for row in rows:
+        if row.code:
+            courses.setdefault(normalize_course_code(row.code), row.name)
+    return courses
+
+
+def elective_courses_required(requirements):
+    """
+    Total number of elective courses a major requires.
+
+    Majors either set elective_courses_needed or split electives into several
+    counts (e.g. 'physical_elective_courses_needed' and 'human_elective').
+    """
+    if requirements.get("elective_courses_needed"):
+        return requirements["elective_courses_needed"]
+    return sum(
+        value for key, value in requirements.items()
+        if "elective" in key and isinstance(value, int) and not isinstance(value, bool)
+    )
+
+
+def _audit_course_list(catalog, passed, used, required_count):
+    """
+    Match passed courses against one catalog course list.
+
+    Args:
+        catalog (dict): Course code -> name of the list.
+        passed (dict): Passed course code -> name, in transcript order.
+        used (set): Codes already counted for another requirement; updated in place.
+        required_count (int): Number of courses needed from the list, 0 meaning all of them.
+
+    Returns:
+        tuple: (number of courses counted, list of missing course entries).
+    """
+    taken = [code for code in passed if code in catalog and code not in used]
+    if required_count:
+        taken = taken[:required_count]
+    used.update(taken)
+
+    if required_count and len(taken) >= required_count:
+        return len(taken), []
+    missing = [_course_entry(code, name) for code, name in catalog.items() if code not in passed]
+    return len(taken), missing
+
+
+def audit_general_education(general_education, passed, used, course_index=None):
+    """
+    Match passed courses against the general education categories.
+
+    Args:
+        general_education (GeneralEducationRequirements): The program's general education rules.
+        passed (dict): Passed course code -> name, in transcript order.
+        used (set): Codes already counted for a major requirement; updated in place.
+        course_index (CourseIndex, optional): Defaults to the index of the cached catalog.
+
+    Returns:
+        list: One entry (department, courses_needed, reason) per category that is still open.
+    """
+    rules = general_education.rules
+    course_index = course_index or get_course_index()
+    matches = {
+        code: course_index.general_education_categories(code, general_education.major_id, name=name)
+        for code, name in passed.items()
+    }
+    reserved = {code for code, categories in matches.items() if categories.intersection(EXACT_CODE_CATEGORIES)}
+
+    general_courses = []
+    for category, (_, options_key) in GENERAL_ED_COUNTS.items():
+        required = general_education.required_counts[category]
+        if not required:
+            continue
+        exact = category in EXACT_CODE_CATEGORIES
+        taken = [
+            code for code in passed
+            if category in matches[code] and code not in used and (exact or code not in reserved)
+        ][:required]
+        used.update(taken)
+
+        remaining = required - len(taken)
+        if remaining <= 0:
+            continue
+        if exact:
+            options = [normalize_course_code(option) for option in rules.get(options_key, ())]
+            choices = [option for option in options if option not in passed]
+            reason = f"{len(taken)} of {required} completed. Remaining options: {', '.join(choices)}."
+        else:
+            reason = (f"{len(taken)} of {required} completed. "
+                      f"Any course from: {', '.join(rules.get(options_key, ()))}.")
+        general_courses.append({
+            "department": GENERAL_ED_DEPARTMENTS[category],
+            "courses_needed": remaining,
+            "reason": reason,
+        })
+    return general_courses
+
+
+def run_degree_audit(transcript_data, program, required_rows):
+    """
+    Compute a degree audit locally, without a GPT call.
+
+    Passed courses (most recent passing attempt of each code) are matched against
+    the catalog lists in the order core, supporting, electives, general education.
+    A course counts towards one requirement only, and compulsory or religious
+    courses never count towards another general education category.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        program (MajorProgram): The student's compiled major program.
+        required_rows (dict): Catalog rows by category (core, elective, supporting),
+            as returned by CourseHandler.query_required_courses.
+
+    Returns:
+        dict: Audit in the same shape as the GPT audit: completed_courses and
+        needed_courses (general_courses, elective_courses, supporting_courses, core_courses).
+    """
+    requirements = program.requirements
+    passed = get_passed_courses(transcript_data)
+    core = _catalog_courses(required_rows.get("core", []))
+    elective = _catalog_courses(required_rows.get("elective", []))
+    supporting = _catalog_courses(required_rows.get("supporting", []))
+
+    used = set()
+    _, core_needed = _audit_course_list(core, passed, used, requirements.get("core_courses_needed", 0))
+    _, supporting_needed = _audit_course_list(
+        supporting, passed, used, requirements.get("supporting_courses_needed", 0)
+    )
+
+    electives_required = elective_courses_required(requirements)
+    electives_taken, _ = _audit_course_list(elective, passed, used, electives_required)
+    elective_needed = []
+    if electives_required > electives_taken:
+        elective_needed.append({
+            "courses_needed": electives_required - electives_taken,
+            "reason": f"{electives_taken} of {electives_required} elective course(s) completed.",
+        })
+
+    general_needed = audit_general_education(program.general_education, passed, used)
+
+    completed_courses = [
+        _course_entry(code, name or core.get(code) or elective.get(code) or supporting.get(code) or "")
+        for code, name in passed.items()
+    ]
+    logger.info(
+        f"Local audit for major ID {program.major_id}: {len(completed_courses)} passed, "
+        f"{len(core_needed)} core and {len(supporting_needed)} supporting course(s) missing, "
+        f"{len(general_needed)} general education requirement(s) open."
+    )
+    return {
+        "completed_courses": completed_courses,
+        "needed_courses": {
+            "general_courses": general_needed,
+            "elective_courses": elective_needed,
+            "supporting_courses": supporting_needed,
+            "core_courses": core_needed,
+        },
+    }
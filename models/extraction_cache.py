@@ -0,0 +1,192 @@
+import logging
+import hashlib
+import json
+import os
+import threading
+import time
+from config import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES, EXTRACTION_CACHE_TTL
+
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ExtractionCache:
+    """
+    Content-addressed disk cache of parsed transcript extractions.
+
+    Entries are keyed by the hash of the uploaded file bytes plus the extraction
+    version, so the same transcript is never sent to the vision model twice.
+    Entries expire after the TTL and the least recently used ones are evicted
+    once the directory grows past its size bound.
+    """
+
+    def __init__(self, directory, max_bytes=EXTRACTION_CACHE_MAX_BYTES, ttl_seconds=EXTRACTION_CACHE_TTL):
+        """
+        Args:
+            directory (str): Directory holding one JSON file per entry. Created on first write.
+            max_bytes (int): Size bound of the directory. 0 or less disables the cache.
+            ttl_seconds (int): Seconds an entry is served after it was stored.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(file_paths, version):
+        """
+        Hash the bytes of the uploaded files, in order, together with the extraction version.
+
+        Args:
+            file_paths (list or str): Uploaded transcript files.
+            version (str): Identifies the prompt, model and preprocessing used to extract.
+
+        Returns:
+            str: Hex digest used as the cache key.
+        """
+        if not isinstance(file_paths, list):
+            file_paths = [file_paths]
+        digest = hashlib.sha256(f"v={version}".encode("utf-8"))
+        for file_path in file_paths:
+            file_digest = hashlib.sha256()
+            with open(file_path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+                    file_digest.update(chunk)
+            digest.update(file_digest.digest())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Return the cached transcript for a key, or None on a miss or an expired entry.
+        A hit marks the entry as recently used.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {key}: {e}")
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+                self.expirations += 1
+                self.misses += 1
+                expired = True
+            else:
+                self.hits += 1
+                expired = False
+
+        if expired:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("data")
+
+    def put(self, key, data):
+        """Store a parsed transcript, then evict least recently used entries beyond the size bound."""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump({"stored_at": time.time(), "data": data}, handle)
+        os.replace(temp_path, path)
+        with self._lock:
+            self.stores += 1
+        self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every entry file."""
+        entries = []
+        try:
+            scanner = os.scandir(self.directory)
+        except FileNotFoundError:
+            return entries
+        with scanner:
+            for item in scanner:
+                if item.name.endswith(".json") and item.is_file():
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                evicted += 1
+        with self._lock:
+            self.evictions += evicted
+        logger.info(f"Evicted {evicted} extraction cache entry(ies); {total} bytes remain.")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        """Delete every entry. Returns the number of entries removed."""
+        removed = sum(1 for _, _, path in self._entries() if self._remove(path))
+        logger.info(f"Cleared {removed} extraction cache entry(ies).")
+        return removed
+
+    def stats(self):
+        """Return hit/miss counters of this process and the current size of the cache directory."""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(entries),
+                "size_bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR)
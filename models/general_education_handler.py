@@ -1,9 +1,9 @@
 
 import logging
 from dotenv import load_dotenv
-from sqlalchemy import text
-from db import db
-from config import GENERAL_ED_REQUIREMENTS, MAJOR_NAME_MAPPING
+from models.catalog_cache import catalog_cache
+from models.requirement_model import requirement_model
+from config import MAJOR_TABLE_MAPPING
 
 load_dotenv()
 
@@ -19,7 +19,7 @@ class GeneralEducationHandler:
     def __init__(self, major_name=None, major_id=None):
         """Initialize with either major name or major ID."""
         if major_name:
-            self.major_id = MAJOR_NAME_MAPPING.get(major_name)
+            self.major_id = requirement_model.major_id_for_name(major_name)
             if self.major_id is None:
                 raise ValueError(f"No mapping found for major name: {major_name}")
         elif major_id:
@@ -27,48 +27,30 @@ class GeneralEducationHandler:
         else:
             raise ValueError("Either major name or major ID must be provided.")
 
-        self.general_ed_requirements = GENERAL_ED_REQUIREMENTS.get(self.major_id, {})
+        self.general_education = requirement_model.general_education.get(self.major_id)
+        if self.general_education is None:
+            raise ValueError(f"No general education requirements found for major ID: {self.major_id}")
+        self.general_ed_requirements = self.general_education.rules
         logger.info(f"Initialized GeneralEducationHandler for major ID: {self.major_id}")
 
     def get_general_education_requirements(self):
         """Retrieve general education requirements."""
-        requirements = {
-            key: value for key, value in self.general_ed_requirements.items()
-            if key in [
-                'compulsory', 'required_compulsory', 'religious options', 'religious',
-                'required_religious', 'humanities', 'humanities_options', 
-                'social_sciences', 'social_sciences_options', 
-                'science_lab', 'science_lab_options', 
-                'mathematics', 'math_options', 
-                'cs_require', 'additional_courses_option'
-            ]
-        }
-        logger.info(f"General education requirements retrieved: {requirements}")
+        requirements = self.general_education.requirements
+        logger.info(f"General education requirements retrieved: {dict(requirements)}")
         return requirements
 
     def query_general_education_courses(self):
-        """Query all general education courses from the database."""
-        table_name = "bio_general_education"
-        query = text(f"SELECT * FROM {table_name}")
+        """Query all general education courses from the catalog cache."""
+        table_name = MAJOR_TABLE_MAPPING["general"]["table"]
 
-        logger.info(f"Executing query on general education table: {table_name}")
-        with db.session() as session:
-            result = session.execute(query).fetchall()
-            logger.info(f"Retrieved data from {table_name}: {result}")
+        logger.info(f"Reading general education table: {table_name}")
+        result = catalog_cache.get_table(table_name)
+        logger.info(f"Retrieved {len(result)} row(s) from {table_name}")
 
         return result
 
     def fetch_required_courses_count(self):
         """Fetch required number of courses from each category."""
-        required_counts = {
-            "compulsory": self.general_ed_requirements.get("required_compulsory", 0),
-            "religious": self.general_ed_requirements.get("required_religious", 0),
-            "humanities": self.general_ed_requirements.get("humanities", 0),
-            "social_sciences": self.general_ed_requirements.get("social_sciences", 0),
-            "science_lab": self.general_ed_requirements.get("science_lab", 0),
-            "mathematics": self.general_ed_requirements.get("mathematics", 0),
-            "cs_require": self.general_ed_requirements.get("cs_require", 0),
-            "additional_courses": self.general_ed_requirements.get("additional_courses_option", 0)
-        }
-        logger.info(f"Required counts retrieved: {required_counts}")
+        required_counts = self.general_education.required_counts
+        logger.info(f"Required counts retrieved: {dict(required_counts)}")
         return required_counts
@@ -0,0 +1,303 @@
+import logging
+import numpy as np
+from config import DEFAULT_COURSE_CREDITS, PREFIX_MAJOR_MAPPING, WHAT_IF_MAX_SCENARIOS
+from models.transcript import base_grade, parse_course_attempts, parse_credits
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+GRADE_POINTS = {
+    "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0,
+    "F": 0.0,
+}
+
+MAX_PLANNED_COURSES = 30
+
+
+def _round(value, digits=2):
+    """Round a NumPy scalar for JSON output; NaN (no graded credits) becomes None."""
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _grouped_gpa(quality, credits, group_ids, group_count):
+    """Credit-weighted GPA per group id. Groups without credits are NaN."""
+    group_quality = np.bincount(group_ids, weights=quality, minlength=group_count)
+    group_credits = np.bincount(group_ids, weights=credits, minlength=group_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return group_quality / group_credits, group_credits
+
+
+class TranscriptArrays:
+    """Graded course attempts of a transcript as parallel NumPy arrays."""
+
+    __slots__ = ("codes", "grades", "semesters", "prefixes", "points", "credits", "semester_index", "prefix_id", "latest")
+
+    def __init__(self, attempts):
+        """
+        Args:
+            attempts (list): CourseAttempt tuples with a letter grade in GRADE_POINTS, in chronological order.
+        """
+        self.codes = [attempt.code for attempt in attempts]
+        self.grades = np.array([base_grade(attempt.grade) for attempt in attempts], dtype=object)
+        self.semesters = list(dict.fromkeys(attempt.semester for attempt in attempts))
+        self.prefixes = sorted({code[:4] for code in self.codes})
+
+        semester_ids = {semester: index for index, semester in enumerate(self.semesters)}
+        prefix_ids = {prefix: index for index, prefix in enumerate(self.prefixes)}
+        self.points = np.array([GRADE_POINTS[grade] for grade in self.grades], dtype=float)
+        self.credits = np.array(
+            [DEFAULT_COURSE_CREDITS if attempt.credits is None else attempt.credits for attempt in attempts],
+            dtype=float,
+        )
+        self.semester_index = np.array([semester_ids[attempt.semester] for attempt in attempts], dtype=np.int64)
+        self.prefix_id = np.array([prefix_ids[code[:4]] for code in self.codes], dtype=np.int64)
+
+        # Repeat adjustment: only the most recent graded attempt of each course counts.
+        last_attempt = {code: index for index, code in enumerate(self.codes)}
+        self.latest = np.zeros(len(self.codes), dtype=bool)
+        self.latest[list(last_attempt.values())] = True
+
+    @classmethod
+    def from_transcript(cls, transcript_data):
+        """Build the arrays from parsed transcript data, skipping W, I and ungraded rows."""
+        attempts = [
+            attempt for attempt in parse_course_attempts(transcript_data)
+            if base_grade(attempt.grade) in GRADE_POINTS
+        ]
+        return cls(attempts)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def quality(self):
+        return self.points * self.credits
+
+    def repeat_adjusted_totals(self):
+        """Quality points and credits of the latest attempt of each course."""
+        return float(self.quality[self.latest].sum()), float(self.credits[self.latest].sum())
+
+
+def compute_gpa_analytics(transcript_data, major_id=None):
+    """
+    Compute GPA statistics from a parsed transcript.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        major_id (int, optional): Major whose course prefixes (PREFIX_MAJOR_MAPPING) form the major GPA.
+
+    Returns:
+        dict: cumulative_gpa (all attempts), repeat_adjusted_gpa, major_gpa, per-semester term
+        and running cumulative GPAs, the term GPA trend (slope per semester), prefix GPAs,
+        grade distribution and credit totals.
+    """
+    arrays = TranscriptArrays.from_transcript(transcript_data)
+    if not len(arrays):
+        return {"courses_graded": 0, "cumulative_gpa": None, "repeat_adjusted_gpa": None, "semesters": []}
+
+    quality = arrays.quality
+    credits = arrays.credits
+    latest = arrays.latest
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cumulative_gpa = quality.sum() / credits.sum()
+        repeat_adjusted_gpa = quality[latest].sum() / credits[latest].sum()
+
+    term_gpa, term_credits = _grouped_gpa(quality, credits, arrays.semester_index, len(arrays.semesters))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        running_gpa = np.cumsum(np.nan_to_num(term_gpa * term_credits)) / np.cumsum(term_credits)
+
+    graded_terms = term_credits > 0
+    trend = None
+    if graded_terms.sum() >= 2:
+        trend = _round(np.polyfit(np.flatnonzero(graded_terms), term_gpa[graded_terms], 1)[0], 3)
+
+    prefix_gpa, _ = _grouped_gpa(quality[latest], credits[latest], arrays.prefix_id[latest], len(arrays.prefixes))
+
+    major_gpa = None
+    if major_id is not None:
+        major_prefixes = [arrays.prefixes.index(prefix) for prefix, mapped in PREFIX_MAJOR_MAPPING.items()
+                          if mapped == major_id and prefix in arrays.prefixes]
+        in_major = latest & np.isin(arrays.prefix_id, major_prefixes)
+        if in_major.any():
+            major_gpa = _round(quality[in_major].sum() / credits[in_major].sum())
+
+    grades, counts = np.unique(arrays.grades.astype(str), return_counts=True)
+
+    return {
+        "courses_graded": int(latest.sum()),
+        "attempts_graded": len(arrays),
+        "cumulative_gpa": _round(cumulative_gpa),
+        "repeat_adjusted_gpa": _round(repeat_adjusted_gpa),
+        "major_gpa": major_gpa,
+        "credits_attempted": _round(credits.sum(), 1),
+        "credits_earned": _round(credits[latest & (arrays.points > 0)].sum(), 1),
+        "gpa_trend_per_semester": trend,
+        "semesters": [
+            {
+                "semester": semester,
+                "term_gpa": _round(term_gpa[index]),
+                "cumulative_gpa": _round(running_gpa[index]),
+                "credits": _round(term_credits[index], 1),
+            }
+            for index, semester in enumerate(arrays.semesters)
+        ],
+        "prefix_gpa": {prefix: _round(prefix_gpa[index]) for index, prefix in enumerate(arrays.prefixes)},
+        "grade_distribution": {grade: int(count) for grade, count in zip(grades, counts)},
+    }
+
+
+def _planned_course_arrays(planned_courses):
+    """Normalize planned courses into (codes, credits array)."""
+    if isinstance(planned_courses, int) and not isinstance(planned_courses, bool):
+        planned_courses = [{} for _ in range(min(planned_courses, MAX_PLANNED_COURSES + 1))]
+    if not isinstance(planned_courses, list) or not 0 < len(planned_courses) <= MAX_PLANNED_COURSES:
+        raise ValueError(f"'planned_courses' must be 1 to {MAX_PLANNED_COURSES} courses, as a number or a list.")
+
+    codes = []
+    credits = []
+    for course in planned_courses:
+        if isinstance(course, str):
+            course = {"course_code": course}
+        if not isinstance(course, dict):
+            raise ValueError("Each planned course must be a course code or an object with course_code and credits.")
+        code = course.get("course_code")
+        codes.append(normalize_course_code(code) if code else None)
+        course_credits = parse_credits(course.get("credits")) if course.get("credits") is not None else DEFAULT_COURSE_CREDITS
+        if course_credits is None:
+            raise ValueError(f"Invalid credits for planned course: {course}")
+        credits.append(course_credits)
+    if not sum(credits):
+        raise ValueError("Planned courses must carry at least one credit hour.")
+    return codes, np.array(credits, dtype=float)
+
+
+def _scenario_matrix(scenarios, grade_options, course_count):
+    """
+    Build the (scenarios x courses) matrix of grade points.
+
+    Explicit scenarios are used as given. Otherwise every combination of the grade
+    options is enumerated, or a fixed-seed sample of WHAT_IF_MAX_SCENARIOS when there are too many.
+    """
+    if scenarios is not None:
+        if not isinstance(scenarios, list) or not scenarios or len(scenarios) > WHAT_IF_MAX_SCENARIOS:
+            raise ValueError(f"'scenarios' must be a list of 1 to {WHAT_IF_MAX_SCENARIOS} grade lists.")
+        if any(not isinstance(scenario, list) or len(scenario) != course_count for scenario in scenarios):
+            raise ValueError(f"Every scenario must be a list of one grade per planned course ({course_count}).")
+        try:
+            matrix = np.array([[GRADE_POINTS[grade.strip().upper()] for grade in scenario] for scenario in scenarios],
+                              dtype=float)
+        except (AttributeError, KeyError, TypeError):
+            raise ValueError(f"Scenario grades must be letter grades: {', '.join(GRADE_POINTS)}.")
+        return matrix, "explicit"
+
+    if grade_options is not None and not isinstance(grade_options, list):
+        raise ValueError("'grade_options' must be a list of letter grades.")
+    grade_options = grade_options or list(GRADE_POINTS)
+    try:
+        option_points = np.array([GRADE_POINTS[grade.strip().upper()] for grade in grade_options], dtype=float)
+    except (AttributeError, KeyError):
+        raise ValueError(f"Grade options must be letter grades: {', '.join(GRADE_POINTS)}.")
+
+    combinations = len(option_points) ** course_count
+    if combinations <= WHAT_IF_MAX_SCENARIOS:
+        choices = np.indices((len(option_points),) * course_count).reshape(course_count, -1).T
+        return option_points[choices], "exhaustive"
+    choices = np.random.default_rng(0).integers(0, len(option_points), size=(WHAT_IF_MAX_SCENARIOS, course_count))
+    return option_points[choices], "sampled"
+
+
+def _letter_for_points(points):
+    return min(GRADE_POINTS, key=lambda grade: (abs(GRADE_POINTS[grade] - points), -GRADE_POINTS[grade]))
+
+
+def simulate_what_if(transcript_data, planned_courses, target_gpa=None, scenarios=None, grade_options=None):
+    """
+    Evaluate hypothetical grades for upcoming courses against the repeat-adjusted GPA.
+
+    Planned courses that repeat a graded course replace its latest attempt. All scenarios
+    are evaluated at once as one matrix product.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        planned_courses (int or list): Number of upcoming courses, or a list of course codes /
+            {"course_code": ..., "credits": ...} objects.
+        target_gpa (float, optional): GPA to reach, e.g. 3.0.
+        scenarios (list, optional): Explicit scenarios, each a list of letter grades per planned course.
+        grade_options (list, optional): Letter grades to enumerate when no scenarios are given.
+
+    Returns:
+        dict: Current GPA, projected GPA statistics over all scenarios and, with a target,
+        the average grade needed, the lowest uniform grade that reaches it and the
+        lowest-effort scenario that does.
+
+    Raises:
+        ValueError: If the planned courses, scenarios or target are invalid.
+    """
+    if target_gpa is not None:
+        try:
+            target_gpa = float(target_gpa)
+        except (TypeError, ValueError):
+            raise ValueError("'target_gpa' must be a number.")
+        if not 0 <= target_gpa <= 4:
+            raise ValueError("'target_gpa' must be between 0 and 4.")
+
+    arrays = TranscriptArrays.from_transcript(transcript_data)
+    codes, planned_credits = _planned_course_arrays(planned_courses)
+    matrix, mode = _scenario_matrix(scenarios, grade_options, len(codes))
+
+    base_quality, base_credits = arrays.repeat_adjusted_totals()
+    current_gpa = _round(np.float64(base_quality / base_credits)) if base_credits else None
+    replaced = arrays.latest & np.isin(np.array(arrays.codes, dtype=object), [code for code in codes if code])
+    base_quality -= float(arrays.quality[replaced].sum())
+    base_credits -= float(arrays.credits[replaced].sum())
+
+    total_credits = base_credits + planned_credits.sum()
+    projected = (base_quality + matrix @ planned_credits) / total_credits
+
+    result = {
+        "current_gpa": current_gpa,
+        "planned_credits": _round(planned_credits.sum(), 1),
+        "replaced_courses": [code for code, is_replaced in zip(arrays.codes, replaced) if is_replaced],
+        "scenario_mode": mode,
+        "scenarios_evaluated": int(matrix.shape[0]),
+        "projected_gpa": {
+            "min": _round(projected.min()),
+            "max": _round(projected.max()),
+            "mean": _round(projected.mean()),
+            "p10": _round(np.percentile(projected, 10)),
+            "median": _round(np.median(projected)),
+            "p90": _round(np.percentile(projected, 90)),
+        },
+    }
+    if mode == "explicit":
+        result["scenario_gpas"] = [_round(value) for value in projected]
+
+    if target_gpa is not None:
+        reaching = projected >= target_gpa - 1e-9
+        required_points = (target_gpa * total_credits - base_quality) / planned_credits.sum()
+        uniform_points = np.array(sorted(set(GRADE_POINTS.values())))
+        uniform_gpa = (base_quality + uniform_points * planned_credits.sum()) / total_credits
+        uniform_reaching = uniform_points[uniform_gpa >= target_gpa - 1e-9]
+
+        result["target"] = {
+            "target_gpa": target_gpa,
+            "reachable": bool(reaching.any()),
+            "share_of_scenarios_reaching": _round(reaching.mean(), 4),
+            "required_average_grade_points": _round(max(required_points, 0.0)),
+            "minimum_uniform_grade": _letter_for_points(uniform_reaching[0]) if uniform_reaching.size else None,
+        }
+        if reaching.any():
+            effort = np.where(reaching, matrix @ planned_credits, np.inf)
+            best = int(np.argmin(effort))
+            result["target"]["lowest_effort_scenario"] = {
+                "grades": [_letter_for_points(points) for points in matrix[best]],
+                "projected_gpa": _round(projected[best]),
+            }
+
+    logger.info(f"Evaluated {matrix.shape[0]} what-if scenario(s) ({mode}) over {len(codes)} planned course(s).")
+    return result
@@ -0,0 +1,346 @@
+import logging
+import math
+import time
+from itertools import combinations
+from config import GRADUATION_PLAN_MAX_COURSES, GRADUATION_PLAN_TIME_BUDGET
+from models.degree_audit_engine import audit_general_education, elective_courses_required
+from models.prerequisite_graph import get_prerequisite_graph
+from models.transcript import get_passed_courses
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+# Major course lists, in the order the degree audit counts them.
+PLAN_CATEGORIES = (
+    ("core", "core_courses_needed"),
+    ("supporting", "supporting_courses_needed"),
+    ("elective", None),
+)
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+def _bits(mask):
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class _SemesterSearch:
+    """
+    Minimum-semester scheduling of unit-load courses under prerequisite edges.
+
+    Semester counts are tried from the lower bound upwards (iterative deepening);
+    states (remaining courses, remaining open slots, semesters left) proven
+    infeasible are memoized so they are never expanded twice.
+    """
+
+    def __init__(self, prerequisites, dependents, heights, cap, deadline):
+        """
+        Args:
+            prerequisites (list): Course index -> bitset of the planned courses it requires.
+            dependents (list): Course index -> bitset of the planned courses that require it.
+            heights (list): Course index -> length of the longest prerequisite chain it starts.
+            cap (int): Most courses per semester.
+            deadline (float): time.monotonic() value after which the search gives up.
+        """
+        self.prerequisites = prerequisites
+        self.dependents = dependents
+        self.heights = heights
+        self.cap = cap
+        self.deadline = deadline
+        self.infeasible = set()
+        self.expanded = 0
+
+    def lower_bound(self, remaining, open_slots):
+        longest_chain = max((self.heights[i] for i in _bits(remaining)), default=0)
+        return max(longest_chain, math.ceil((remaining.bit_count() + open_slots) / self.cap))
+
+    def _eligible(self, remaining):
+        """Eligible courses split into ones other remaining courses wait on, and free-standing ones."""
+        blocking, leaves = [], []
+        for i in _bits(remaining):
+            if not self.prerequisites[i] & remaining:
+                (blocking if self.dependents[i] & remaining else leaves).append(i)
+        blocking.sort(key=lambda i: -self.heights[i])
+        return blocking, leaves
+
+    def _choices(self, remaining):
+        """
+        Course sets worth taking next semester.
+
+        With unit loads, swapping an eligible course forward never breaks a plan, so
+        a semester is always filled and blocking courses go before courses nothing
+        else waits on (which are interchangeable). Only the choice among blocking
+        courses is searched, highest chains first.
+        """
+        blocking, leaves = self._eligible(remaining)
+        if len(blocking) + len(leaves) <= self.cap:
+            yield blocking + leaves
+            return
+        size = min(self.cap, len(blocking))
+        for combination in combinations(blocking, size):
+            yield list(combination) + leaves[:self.cap - size]
+
+    def greedy(self, remaining, open_slots):
+        """Highest-chain-first list schedule: the topological layering used as the fallback plan."""
+        semesters = []
+        while remaining or open_slots:
+            taken = next(self._choices(remaining)) if remaining else []
+            slots = min(open_slots, self.cap - len(taken))
+            if not taken and not slots:
+                break
+            semesters.append((taken, slots))
+            for i in taken:
+                remaining &= ~(1 << i)
+            open_slots -= slots
+        return semesters
+
+    def _search(self, remaining, open_slots, semesters_left):
+        if not remaining:
+            if math.ceil(open_slots / self.cap) > semesters_left:
+                return None
+            semesters = []
+            while open_slots:
+                slots = min(open_slots, self.cap)
+                semesters.append(([], slots))
+                open_slots -= slots
+            return semesters
+        if self.lower_bound(remaining, open_slots) > semesters_left:
+            return None
+        state = (remaining, open_slots, semesters_left)
+        if state in self.infeasible:
+            return None
+
+        self.expanded += 1
+        if self.expanded % 256 == 0 and time.monotonic() > self.deadline:
+            raise _SearchTimeout()
+
+        for taken in self._choices(remaining):
+            slots = min(open_slots, self.cap - len(taken))
+            next_remaining = remaining
+            for i in taken:
+                next_remaining &= ~(1 << i)
+            rest = self._search(next_remaining, open_slots - slots, semesters_left - 1)
+            if rest is not None:
+                return [(taken, slots)] + rest
+        self.infeasible.add(state)
+        return None
+
+    def solve(self, remaining, open_slots):
+        """
+        Returns:
+            tuple: (list of (course indices, open slots) per semester, whether the plan is proven minimal).
+        """
+        best = self.greedy(remaining, open_slots)
+        try:
+            for semesters_left in range(self.lower_bound(remaining, open_slots), len(best)):
+                plan = self._search(remaining, open_slots, semesters_left)
+                if plan is not None:
+                    return plan, True
+        except _SearchTimeout:
+            logger.warning("Graduation plan search hit its time budget; returning the layered plan.")
+            return best, False
+        return best, True
+
+
+class _PlanBuilder:
+    """Collects the courses a plan has to contain and the prerequisite edges between them."""
+
+    def __init__(self, graph, passed):
+        self.graph = graph
+        self.interner = graph.interner
+        self.passed = passed
+        self.done_mask = self.interner.mask(passed)
+        self.courses = {}
+        self.planned_mask = 0
+        self.prerequisites = {}
+
+    def add(self, code, category):
+        if code not in self.courses and code not in self.passed:
+            self.courses[code] = category
+            self.planned_mask |= self.interner.mask([code])
+
+    def cost(self, code):
+        """Number of unfinished courses in the prerequisite chain of a course."""
+        course_id = self.interner.get(code)
+        if course_id is None:
+            return 0
+        return (self.graph.closure[course_id] & ~self.done_mask).bit_count()
+
+    def resolve(self, code, visiting=None):
+        """
+        Pick one course for every unmet prerequisite group of a planned course, adding
+        the pick to the plan. Alternatives already planned win, then the cheapest chain.
+        """
+        if code in self.prerequisites:
+            return
+        visiting = visiting or set()
+        visiting.add(code)
+        required = set()
+        course_id = self.interner.get(code)
+        groups = self.graph.requirement_groups[course_id] if course_id is not None else ()
+        for group in groups:
+            if group & self.done_mask:
+                continue
+            planned = group & self.planned_mask
+            if planned:
+                choice = self.interner.code(next(_bits(planned)))
+            else:
+                choice = min(self.interner.codes_in(group), key=self.cost)
+                self.add(choice, "prerequisite")
+            if choice not in visiting:
+                self.resolve(choice, visiting)
+            required.add(choice)
+        visiting.discard(code)
+        self.prerequisites[code] = required
+
+
+def _catalog_names(rows):
+    names = {}
+    for row in rows:
+        if row.code:
+            names.setdefault(normalize_course_code(row.code), row.name)
+    return names
+
+
+def plan_graduation(transcript_data, program, required_rows, max_courses_per_semester=None,
+                    time_budget=None, graph=None):
+    """
+    Build a minimum-semester plan of the courses a student still needs to graduate.
+
+    The remaining requirements are counted like the local degree audit (core,
+    supporting, electives, then general education). Electives and partial core
+    or supporting lists are filled with the courses that have the shortest
+    unfinished prerequisite chains, and every missing prerequisite is added to
+    the plan. The semesters are then found by a memoized search that is proven
+    minimal within the time budget; otherwise the topological layering plan is returned.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        program (MajorProgram): The student's compiled major program.
+        required_rows (dict): Catalog rows by category (core, elective, supporting).
+        max_courses_per_semester (int, optional): Course cap per semester. Defaults to GRADUATION_PLAN_MAX_COURSES.
+        time_budget (float, optional): Seconds for the search. Defaults to GRADUATION_PLAN_TIME_BUDGET.
+        graph (PrerequisiteGraph, optional): Defaults to the graph of the cached catalog.
+
+    Returns:
+        dict: semesters (courses and open general education/elective slots per semester),
+        semesters_needed, optimal, lower_bound, unschedulable courses and the search statistics.
+    """
+    cap = max_courses_per_semester or GRADUATION_PLAN_MAX_COURSES
+    if not isinstance(cap, int) or isinstance(cap, bool) or cap < 1:
+        raise ValueError("max_courses_per_semester must be a positive integer.")
+    time_budget = GRADUATION_PLAN_TIME_BUDGET if time_budget is None else time_budget
+    start = time.monotonic()
+
+    graph = graph or get_prerequisite_graph()
+    passed = get_passed_courses(transcript_data)
+    requirements = program.requirements
+    builder = _PlanBuilder(graph, passed)
+    names = {}
+    open_slots = []
+    used = set()
+
+    for category, count_key in PLAN_CATEGORIES:
+        catalog = _catalog_names(required_rows.get(category, []))
+        names.update({code: name for code, name in catalog.items() if code not in names})
+        if category == "elective":
+            # Unlike the core and supporting lists, electives are only needed when a count is set.
+            required = elective_courses_required(requirements)
+            if not required:
+                continue
+        else:
+            required = requirements.get(count_key, 0)
+
+        taken = [code for code in passed if code in catalog and code not in used]
+        if required:
+            taken = taken[:required]
+        used.update(taken)
+        candidates = [code for code in catalog if code not in passed and code not in builder.courses]
+        if not required:
+            chosen = candidates
+        else:
+            needed = max(0, required - len(taken))
+            chosen = sorted(candidates, key=builder.cost)[:needed]
+            open_slots.extend([category.capitalize()] * (needed - len(chosen)))
+        for code in chosen:
+            builder.add(code, category)
+
+    for entry in audit_general_education(program.general_education, passed, used):
+        open_slots.extend([entry["department"]] * entry["courses_needed"])
+
+    for code in list(builder.courses):
+        builder.resolve(code)
+
+    codes = list(builder.courses)
+    index = {code: i for i, code in enumerate(codes)}
+    prerequisites = [0] * len(codes)
+    dependents = [0] * len(codes)
+    for code, required in builder.prerequisites.items():
+        for prerequisite in required:
+            prerequisites[index[code]] |= 1 << index[prerequisite]
+            dependents[index[prerequisite]] |= 1 << index[code]
+
+    # Kahn order; courses caught in a prerequisite cycle are never reached and cannot be scheduled.
+    order = []
+    schedulable = 0
+    frontier = [i for i in range(len(codes)) if not prerequisites[i]]
+    while frontier:
+        i = frontier.pop()
+        order.append(i)
+        schedulable |= 1 << i
+        for dependent in _bits(dependents[i]):
+            if not prerequisites[dependent] & ~schedulable:
+                frontier.append(dependent)
+    unschedulable = [codes[i] for i in range(len(codes)) if not schedulable >> i & 1]
+
+    heights = [0] * len(codes)
+    for i in reversed(order):
+        heights[i] = 1 + max((heights[dependent] for dependent in _bits(dependents[i] & schedulable)), default=0)
+
+    search = _SemesterSearch(prerequisites, dependents, heights, cap, start + time_budget)
+    lower_bound = search.lower_bound(schedulable, len(open_slots))
+    semesters, optimal = search.solve(schedulable, len(open_slots))
+
+    plan = []
+    slot_labels = iter(open_slots)
+    for number, (taken, slots) in enumerate(semesters, start=1):
+        slot_counts = {}
+        for _ in range(slots):
+            label = next(slot_labels)
+            slot_counts[label] = slot_counts.get(label, 0) + 1
+        plan.append({
+            "semester": number,
+            "courses": [
+                {
+                    "course_code": codes[i],
+                    "course_name": names.get(codes[i]) or "",
+                    "category": builder.courses[codes[i]],
+                }
+                for i in sorted(taken, key=lambda i: (-heights[i], codes[i]))
+            ],
+            "open_requirements": [
+                {"requirement": label, "courses": count} for label, count in slot_counts.items()
+            ],
+        })
+
+    elapsed_ms = round((time.monotonic() - start) * 1000, 2)
+    logger.info(
+        f"Graduation plan for major ID {program.major_id}: {len(plan)} semester(s) "
+        f"(lower bound {lower_bound}, optimal={optimal}) in {elapsed_ms} ms, {search.expanded} state(s) expanded."
+    )
+    return {
+        "semesters": plan,
+        "semesters_needed": len(plan),
+        "optimal": optimal,
+        "lower_bound": lower_bound,
+        "max_courses_per_semester": cap,
+        "unschedulable": unschedulable,
+        "states_expanded": search.expanded,
+        "elapsed_ms": elapsed_ms,
+    }
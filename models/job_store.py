@@ -0,0 +1,257 @@
+import logging
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from config import JOB_RETENTION, JOB_STORE_PATH, JOB_WORKER_TIMEOUT
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+Job = namedtuple(
+    "Job",
+    ["job_id", "owner", "action", "status", "stage", "events", "result", "error", "session_update",
+     "applied", "worker", "created_at", "updated_at"],
+)
+
+_current = threading.local()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobStore:
+    """
+    SQLite store of background jobs, shared by every app instance that points at the same file.
+
+    A job moves from queued to running to completed (the action returned a response, which may
+    itself be an error) or failed (the action raised or the worker was interrupted). Every status
+    and stage change is appended to the job's events, which clients poll.
+
+    Each job records the worker process running it, and workers record a heartbeat. An unfinished
+    job whose worker stopped beating (the process exited or crashed) is failed when it is read.
+    """
+
+    def __init__(self, path, retention_seconds=JOB_RETENTION, worker_timeout=JOB_WORKER_TIMEOUT):
+        """
+        Args:
+            path (str): Path to the SQLite database file. Created on first use.
+            retention_seconds (int): Finished jobs older than this are purged when new jobs are created.
+            worker_timeout (int): Seconds without a heartbeat after which a worker counts as gone.
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.worker_timeout = worker_timeout
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    directory = os.path.dirname(os.path.abspath(self.path))
+                    os.makedirs(directory, exist_ok=True)
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        "job_id TEXT PRIMARY KEY, owner TEXT, action TEXT NOT NULL, status TEXT NOT NULL, "
+                        "stage TEXT, events_json TEXT NOT NULL, result_json TEXT, error TEXT, "
+                        "session_json TEXT, applied INTEGER NOT NULL DEFAULT 0, worker TEXT, "
+                        "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+                    )
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS job_workers (worker TEXT PRIMARY KEY, heartbeat_at TEXT NOT NULL)"
+                    )
+                    connection.commit()
+                    self._initialized = True
+        return connection
+
+    def create(self, action, owner=None, worker=None):
+        """
+        Insert a queued job and purge finished jobs past the retention period.
+
+        Returns:
+            Job: The new job.
+        """
+        job_id = uuid.uuid4().hex
+        created_at = _now()
+        events = [{"status": JOB_QUEUED, "at": created_at}]
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)).isoformat()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO jobs (job_id, owner, action, status, events_json, worker, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, owner, action, JOB_QUEUED, json.dumps(events), worker, created_at, created_at),
+                )
+                purged = connection.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (*FINISHED_STATUSES, cutoff)
+                ).rowcount
+        finally:
+            connection.close()
+        if purged:
+            logger.info(f"Purged {purged} finished job(s) older than {self.retention_seconds}s.")
+        return Job(job_id, owner, action, JOB_QUEUED, None, events, None, None, None, False, worker,
+                   created_at, created_at)
+
+    def get(self, job_id):
+        """Load a job, or None if there is none with this id. Jobs of a worker that is gone are failed first."""
+        job = self._load(job_id)
+        if job is not None and job.status not in FINISHED_STATUSES and not self._worker_alive(job.worker):
+            logger.warning(f"Worker {job.worker} of job {job_id} stopped; marking the job failed.")
+            self.fail(job_id, "Interrupted by a server restart. Please resubmit.")
+            job = self._load(job_id)
+        return job
+
+    def _load(self, job_id):
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT job_id, owner, action, status, stage, events_json, result_json, error, session_json, "
+                "applied, worker, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return Job(
+            job_id=row[0],
+            owner=row[1],
+            action=row[2],
+            status=row[3],
+            stage=row[4],
+            events=json.loads(row[5]),
+            result=json.loads(row[6]) if row[6] else None,
+            error=row[7],
+            session_update=json.loads(row[8]) if row[8] else None,
+            applied=bool(row[9]),
+            worker=row[10],
+            created_at=row[11],
+            updated_at=row[12],
+        )
+
+    def _update(self, job_id, event, **columns):
+        """Append an event and set columns in one transaction. Finished jobs are left untouched."""
+        event["at"] = _now()
+        assignments = "".join(f", {column} = ?" for column in columns)
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                row = connection.execute(
+                    "SELECT events_json FROM jobs WHERE job_id = ? AND status NOT IN (?, ?)",
+                    (job_id, *FINISHED_STATUSES),
+                ).fetchone()
+                if row is None:
+                    return False
+                events = json.loads(row[0])
+                events.append(event)
+                connection.execute(
+                    f"UPDATE jobs SET events_json = ?, updated_at = ?{assignments} WHERE job_id = ?",
+                    (json.dumps(events), event["at"], *columns.values(), job_id),
+                )
+        finally:
+            connection.close()
+        return True
+
+    def start(self, job_id):
+        return self._update(job_id, {"status": JOB_RUNNING}, status=JOB_RUNNING)
+
+    def set_stage(self, job_id, stage):
+        return self._update(job_id, {"stage": stage}, stage=stage)
+
+    def complete(self, job_id, result, session_update=None):
+        """Store the response of the action and the conversation changes to apply to the submitter's session."""
+        return self._update(
+            job_id, {"status": JOB_COMPLETED}, status=JOB_COMPLETED, result_json=json.dumps(result),
+            session_json=json.dumps(session_update) if session_update is not None else None,
+        )
+
+    def fail(self, job_id, message):
+        return self._update(job_id, {"status": JOB_FAILED, "message": message}, status=JOB_FAILED, error=message)
+
+    def mark_applied(self, job_id):
+        """Record that the job's session update was applied. Returns False if it already was."""
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE jobs SET applied = 1 WHERE job_id = ? AND applied = 0", (job_id,)
+                )
+        finally:
+            connection.close()
+        return cursor.rowcount > 0
+
+    def heartbeat(self, worker):
+        """Record that a worker process is alive."""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO job_workers VALUES (?, ?)", (worker, _now()))
+        finally:
+            connection.close()
+
+    def retire(self, worker):
+        """Forget a worker that shut down cleanly."""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM job_workers WHERE worker = ?", (worker,))
+        finally:
+            connection.close()
+
+    def _worker_alive(self, worker):
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT heartbeat_at FROM job_workers WHERE worker = ?", (worker,)).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return False
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(row[0])
+        return age.total_seconds() <= self.worker_timeout
+
+    def counts(self):
+        """Number of jobs per status."""
+        connection = self._connect()
+        try:
+            return dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            connection.close()
+
+
+job_store = JobStore(JOB_STORE_PATH)
+
+
+def report_progress(stage):
+    """
+    Record that the job running on this thread entered a stage (rendering, extracting, auditing, ...).
+    Does nothing outside a job, so services can report unconditionally.
+    """
+    job_id = getattr(_current, "job_id", None)
+    if job_id is None or getattr(_current, "stage", None) == stage:
+        return
+    _current.stage = stage
+    try:
+        _current.store.set_stage(job_id, stage)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not record stage '{stage}' of job {job_id}: {e}")
+
+
+def bind_job(job_id, store=None):
+    """Make report_progress on this thread record stages of a job; None unbinds."""
+    _current.job_id = job_id
+    _current.stage = None
+    _current.store = store or job_store
@@ -0,0 +1,104 @@
+import logging
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Grayscale values below this are ink; shaded table rows and backgrounds are lighter.
+INK_THRESHOLD = 128
+# A pixel row (or column) holding no more than this share of ink pixels counts as blank.
+BLANK_LINE_RATIO = 0.002
+# Blank border kept around the content, as a share of the page's shorter side.
+CONTENT_PADDING_RATIO = 0.01
+# Cuts are looked for within this share of a section's height around the even split.
+CUT_WINDOW_RATIO = 0.15
+# When no row gap is near a cut, neighbouring sections overlap by this share of a section's height.
+OVERLAP_RATIO = 0.03
+
+
+def _ink_profiles(pixels):
+    ink = pixels < INK_THRESHOLD
+    return ink.sum(axis=1), ink.sum(axis=0)
+
+
+def content_bounds(pixels):
+    """
+    Bounding box of the ink on a grayscale page, with a small blank border.
+
+    Args:
+        pixels (numpy.ndarray): 2-D uint8 array of the grayscale page.
+
+    Returns:
+        tuple or None: (left, top, right, bottom) in pixels, or None for a blank page.
+    """
+    height, width = pixels.shape
+    row_profile, column_profile = _ink_profiles(pixels)
+    rows = np.flatnonzero(row_profile > BLANK_LINE_RATIO * width)
+    columns = np.flatnonzero(column_profile > BLANK_LINE_RATIO * height)
+    if not len(rows) or not len(columns):
+        return None
+    padding = int(min(width, height) * CONTENT_PADDING_RATIO)
+    return (
+        max(int(columns[0]) - padding, 0),
+        max(int(rows[0]) - padding, 0),
+        min(int(columns[-1]) + 1 + padding, width),
+        min(int(rows[-1]) + 1 + padding, height),
+    )
+
+
+def row_gaps(pixels, bounds):
+    """
+    Blank horizontal bands between text rows inside the content box.
+
+    Returns:
+        list: (start, end) pixel rows of each gap, end exclusive, top to bottom.
+    """
+    left, top, right, bottom = bounds
+    row_profile, _ = _ink_profiles(pixels[top:bottom, left:right])
+    blank = row_profile <= BLANK_LINE_RATIO * (right - left)
+    # Rising and falling edges of the blank mask give the gap boundaries.
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], blank, [False])).astype(np.int8)))
+    return [(top + int(start), top + int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+
+def row_safe_boxes(pixels, bounds, sections):
+    """
+    Split the content box into horizontal sections that are only cut between text rows.
+
+    Each cut is placed in the widest row gap near the even split; if there is none, the
+    neighbouring sections overlap slightly so that no row is lost (duplicated rows are
+    dropped after parsing).
+
+    Args:
+        pixels (numpy.ndarray): 2-D uint8 array of the grayscale page.
+        bounds (tuple): Content box (left, top, right, bottom), as returned by content_bounds.
+        sections (int): Number of sections.
+
+    Returns:
+        list: Crop boxes (left, top, right, bottom), top to bottom.
+    """
+    left, top, right, bottom = bounds
+    if sections <= 1:
+        return [bounds]
+    section_height = (bottom - top) / sections
+    window = section_height * CUT_WINDOW_RATIO
+    overlap = max(int(section_height * OVERLAP_RATIO), 1)
+    gaps = [(start, end) for start, end in row_gaps(pixels, bounds) if start > top and end < bottom]
+
+    boxes = []
+    section_top = top
+    for index in range(1, sections):
+        target = top + index * section_height
+        nearby = [gap for gap in gaps if abs((gap[0] + gap[1]) / 2 - target) <= window and gap[0] > section_top]
+        if nearby:
+            start, end = max(nearby, key=lambda gap: (gap[1] - gap[0], -abs((gap[0] + gap[1]) / 2 - target)))
+            cut = (start + end) // 2
+            boxes.append((left, section_top, right, cut))
+            section_top = cut
+        else:
+            cut = int(target)
+            boxes.append((left, section_top, right, min(cut + overlap, bottom)))
+            section_top = max(cut - overlap, section_top + 1)
+            logger.debug(f"No row gap near pixel row {cut}; overlapping sections by {overlap} px.")
+    boxes.append((left, section_top, right, bottom))
+    return boxes
@@ -0,0 +1,235 @@
+import logging
+import re
+from config import MAJOR_TABLE_MAPPING
+from models.catalog_cache import catalog_cache
+from models.course_interner import build_course_interner
+from models.transcript import get_passed_courses
+from utils.normalization import extract_course_codes
+
+
+logger = logging.getLogger(__name__)
+
+PREREQUISITE_TABLES = [
+    mapping["prerequisites"] for mapping in MAJOR_TABLE_MAPPING.values() if mapping.get("prerequisites")
+]
+
+GROUP_SEPARATOR = re.compile(r'[,;&]|\band\b', re.IGNORECASE)
+
+
+def parse_prerequisite_groups(value):
+    """
+    Split a prerequisite cell into requirement groups.
+
+    Groups separated by ',', ';', '&' or 'and' must all be satisfied; codes inside a
+    group (e.g. 'MATH101 or MATH102', 'CSCS100/CSCS101') are alternatives.
+
+    Args:
+        value (str): Raw prerequisite value from a prerequisite table.
+
+    Returns:
+        list: One list of course codes per group. Empty when the value names no course.
+    """
+    groups = []
+    for part in GROUP_SEPARATOR.split(value or ""):
+        codes = extract_course_codes(part)
+        if codes:
+            groups.append(codes)
+    return groups
+
+
+class PrerequisiteGraph:
+    """
+    Prerequisite DAG over interned course ids.
+
+    Each course keeps its requirement groups as bitsets (any course in a group
+    satisfies it), flattened adjacency arrays in both directions, and the
+    transitive closure of every course that appears in its prerequisite chain.
+    """
+
+    def __init__(self, interner, requirement_groups):
+        """
+        Args:
+            interner (CourseInterner): Interner shared with the catalog load.
+            requirement_groups (dict): Course id -> list of group bitsets.
+        """
+        self.interner = interner
+        size = len(interner)
+        self.requirement_groups = [()] * size
+        self.prerequisites = [()] * size
+        self.dependents = [[] for _ in range(size)]
+
+        for course_id, groups in requirement_groups.items():
+            self.requirement_groups[course_id] = tuple(groups)
+            direct = 0
+            for group in groups:
+                direct |= group
+            self.prerequisites[course_id] = tuple(self._ids_in(direct))
+            for prerequisite_id in self.prerequisites[course_id]:
+                self.dependents[prerequisite_id].append(course_id)
+        self.dependents = [tuple(ids) for ids in self.dependents]
+
+        self.closure = self._compute_closure()
+
+    @staticmethod
+    def _ids_in(mask):
+        ids = []
+        while mask:
+            low_bit = mask & -mask
+            ids.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return ids
+
+    def _compute_closure(self):
+        """Transitive prerequisite bitsets, computed in topological order (Kahn)."""
+        size = len(self.prerequisites)
+        closure = [0] * size
+        remaining = [len(prerequisites) for prerequisites in self.prerequisites]
+        ready = [course_id for course_id in range(size) if remaining[course_id] == 0]
+
+        processed = 0
+        while ready:
+            course_id = ready.pop()
+            processed += 1
+            for dependent_id in self.dependents[course_id]:
+                closure[dependent_id] |= closure[course_id] | (1 << course_id)
+                remaining[dependent_id] -= 1
+                if remaining[dependent_id] == 0:
+                    ready.append(dependent_id)
+
+        if processed < size:
+            cyclic = [course_id for course_id in range(size) if remaining[course_id] > 0]
+            logger.warning(f"Prerequisite cycle(s) detected among: {[self.interner.code(i) for i in cyclic]}")
+            changed = True
+            while changed:
+                changed = False
+                for course_id in cyclic:
+                    mask = closure[course_id]
+                    for prerequisite_id in self.prerequisites[course_id]:
+                        mask |= closure[prerequisite_id] | (1 << prerequisite_id)
+                    if mask != closure[course_id]:
+                        closure[course_id] = mask
+                        changed = True
+        return closure
+
+    @classmethod
+    def from_rows(cls, interner, rows):
+        """
+        Build the graph from PrerequisiteRow tuples.
+
+        Args:
+            interner (CourseInterner): Interner covering every code in the rows.
+            rows (iterable): PrerequisiteRow tuples from the prerequisite tables.
+
+        Returns:
+            PrerequisiteGraph: The built graph.
+        """
+        requirement_groups = {}
+        for row in rows:
+            course_id = interner.get(row.course_code)
+            if course_id is None:
+                continue
+            groups = requirement_groups.setdefault(course_id, [])
+            for group_codes in parse_prerequisite_groups(row.prerequisite_code):
+                group = interner.mask(group_codes) & ~(1 << course_id)
+                if group and group not in groups:
+                    groups.append(group)
+        return cls(interner, requirement_groups)
+
+    def is_eligible(self, course_id, completed_mask):
+        """Check whether every requirement group of a course is satisfied by the completed bitset."""
+        for group in self.requirement_groups[course_id]:
+            if not group & completed_mask:
+                return False
+        return True
+
+    def eligible_courses(self, completed_codes, candidate_codes):
+        """
+        Return the candidate courses a student can take next.
+
+        Args:
+            completed_codes (iterable): Normalized codes of passed courses.
+            candidate_codes (iterable): Normalized codes to consider, e.g. the remaining major courses.
+
+        Returns:
+            list: Candidate codes that are not completed and whose prerequisites are all met.
+            Codes unknown to the catalog have no known prerequisites and are considered eligible.
+        """
+        completed_codes = set(completed_codes)
+        completed_mask = self.interner.mask(completed_codes)
+        eligible = []
+        for code in dict.fromkeys(candidate_codes):
+            if code in completed_codes:
+                continue
+            course_id = self.interner.get(code)
+            if course_id is None or self.is_eligible(course_id, completed_mask):
+                eligible.append(code)
+        return eligible
+
+    def missing_prerequisites(self, code, completed_codes):
+        """
+        List the unmet requirement groups of a course.
+
+        Returns:
+            list: One list of alternative course codes per unmet group.
+        """
+        course_id = self.interner.get(code)
+        if course_id is None:
+            return []
+        completed_mask = self.interner.mask(completed_codes)
+        return [
+            self.interner.codes_in(group)
+            for group in self.requirement_groups[course_id]
+            if not group & completed_mask
+        ]
+
+    def all_prerequisites(self, code):
+        """Return every course in the prerequisite chain of a course (transitive closure)."""
+        course_id = self.interner.get(code)
+        if course_id is None:
+            return []
+        return self.interner.codes_in(self.closure[course_id])
+
+    def unlocks(self, code):
+        """Return the courses that list the given course as a direct prerequisite."""
+        course_id = self.interner.get(code)
+        if course_id is None:
+            return []
+        return [self.interner.code(dependent_id) for dependent_id in self.dependents[course_id]]
+
+
+def build_prerequisite_graph(cache):
+    """
+    Build the prerequisite graph from every prerequisite table in the cached catalog.
+
+    Args:
+        cache (CatalogCache): The catalog cache to read from.
+
+    Returns:
+        PrerequisiteGraph: Graph for the current catalog load.
+    """
+    interner = cache.get_derived("course_interner", build_course_interner)
+    tables = cache.get_tables(PREREQUISITE_TABLES)
+    rows = [row for table_rows in tables.values() for row in table_rows]
+    graph = PrerequisiteGraph.from_rows(interner, rows)
+    logger.info(f"Built prerequisite graph with {len(rows)} edge row(s) over {len(interner)} course(s).")
+    return graph
+
+
+def get_prerequisite_graph():
+    """Return the prerequisite graph for the current catalog load."""
+    return catalog_cache.get_derived("prerequisite_graph", build_prerequisite_graph)
+
+
+def get_eligible_next_courses(transcript_data, candidate_codes):
+    """
+    Return the candidate courses a student is eligible to take next, based on a parsed transcript.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+        candidate_codes (iterable): Normalized course codes to consider.
+
+    Returns:
+        list: Eligible course codes, in candidate order.
+    """
+    passed = get_passed_courses(transcript_data)
+    return get_prerequisite_graph().eligible_courses(passed.keys(), candidate_codes)
@@ -0,0 +1,299 @@
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from config import (
+    GENERAL_ED_REQUIREMENTS,
+    MAJOR_NAME_MAPPING,
+    MAJOR_REQUIREMENTS,
+    MAJOR_TABLE_MAPPING,
+    PREFIX_MAJOR_MAPPING,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Sub-category whose tables serve a major that only defines its tables per sub-category
+# (e.g. Psychology). It is shared by several majors, so it is not a lookup name.
+DEFAULT_SUB_CATEGORY = "Normal"
+
+TABLE_KEYS = ("core", "elective", "supporting", "courses", "prerequisites", "prereq_column")
+
+REQUIREMENT_DEFAULTS = {
+    "core_courses_needed": 0,
+    "elective_courses_needed": 0,
+    "supporting_courses_needed": 0,
+    "supporting_prefixes": [],
+}
+
+GENERAL_ED_REQUIREMENT_KEYS = (
+    'compulsory', 'required_compulsory', 'religious options', 'religious',
+    'required_religious', 'humanities', 'humanities_options',
+    'social_sciences', 'social_sciences_options',
+    'science_lab', 'science_lab_options',
+    'mathematics', 'math_options',
+    'cs_require', 'additional_courses_option',
+)
+
+# Required-count category -> (count key, options key) in GENERAL_ED_REQUIREMENTS.
+GENERAL_ED_COUNTS = {
+    "compulsory": ("required_compulsory", "compulsory"),
+    "religious": ("required_religious", "religious"),
+    "humanities": ("humanities", "humanities_options"),
+    "social_sciences": ("social_sciences", "social_sciences_options"),
+    "science_lab": ("science_lab", "science_lab_options"),
+    "mathematics": ("mathematics", "math_options"),
+    "cs_require": ("cs_require", "computer_science"),
+    "additional_courses": ("additional_courses_option", "additional_courses"),
+}
+
+# General education categories whose options are exact course codes rather than department prefixes.
+EXACT_CODE_CATEGORIES = ("compulsory", "religious")
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class GeneralEducationRequirements:
+    """General education rules of one major."""
+    major_id: int
+    rules: MappingProxyType
+    requirements: MappingProxyType
+    required_counts: MappingProxyType
+
+
+@dataclass(frozen=True, slots=True)
+class MajorProgram:
+    """A major, or one of its sub-categories, with its catalog tables and requirements."""
+    major_id: int
+    name: str
+    sub_category: str
+    tables: MappingProxyType
+    requirements: MappingProxyType
+    general_education: GeneralEducationRequirements
+
+
+@dataclass(frozen=True, slots=True)
+class RequirementModel:
+    """Read-only view of the major configuration with constant-time lookups."""
+    programs: MappingProxyType
+    names: MappingProxyType
+    folded_names: MappingProxyType
+    prefixes: MappingProxyType
+    general_education: MappingProxyType
+
+    def resolve(self, major_name=None, course_code_prefix=None):
+        """
+        Resolve a major name, alias or sub-category name, or a course code prefix.
+
+        Args:
+            major_name (str, optional): Major or sub-major name, e.g. 'Applied Psychology'.
+            course_code_prefix (str, optional): Department prefix, e.g. 'CSCS'.
+
+        Returns:
+            tuple: (major_id, sub_category), or (None, None) when nothing matches.
+        """
+        if major_name:
+            match = self.names.get(major_name) or self.folded_names.get(major_name.strip().casefold())
+            if match:
+                return match
+        if course_code_prefix:
+            return self.prefixes.get(course_code_prefix.strip().upper()), None
+        return None, None
+
+    def major_id_for_name(self, major_name):
+        """Return the major ID for a major name or alias, or None."""
+        return self.resolve(major_name)[0]
+
+    def program(self, major_id, sub_category=None):
+        """Return the MajorProgram for a major and optional sub-category, or None."""
+        return self.programs.get((major_id, sub_category))
+
+
+def _compile_general_education(major_id, rules, errors):
+    for category, (count_key, options_key) in GENERAL_ED_COUNTS.items():
+        count = rules.get(count_key, 0)
+        if not isinstance(count, int) or count < 0:
+            errors.append(f"GENERAL_ED_REQUIREMENTS[{major_id}]['{count_key}'] must be a non-negative integer, got {count!r}.")
+        elif count and not rules.get(options_key):
+            errors.append(f"GENERAL_ED_REQUIREMENTS[{major_id}] requires {count} '{category}' course(s) but lists no '{options_key}'.")
+
+    return GeneralEducationRequirements(
+        major_id=major_id,
+        rules=freeze(rules),
+        requirements=freeze({key: value for key, value in rules.items() if key in GENERAL_ED_REQUIREMENT_KEYS}),
+        required_counts=freeze({
+            category: rules.get(count_key, 0) for category, (count_key, _) in GENERAL_ED_COUNTS.items()
+        }),
+    )
+
+
+def _table_scope(mapping, sub_category):
+    """Table sub-category a program reads its tables from, or None when it uses the major's own tables."""
+    sub_mappings = mapping.get("sub_categories", {})
+    if sub_category in sub_mappings:
+        return sub_category
+    if not mapping.get("core") and DEFAULT_SUB_CATEGORY in sub_mappings:
+        return DEFAULT_SUB_CATEGORY
+    return None
+
+
+def _elective_count(requirements):
+    return sum(
+        value for key, value in requirements.items()
+        if "elective" in key and isinstance(value, int) and not isinstance(value, bool)
+    )
+
+
+def _compile_requirements(major_id, name, sub_category, table_scope, elective_table, general_education, errors):
+    base = MAJOR_REQUIREMENTS[major_id]
+    requirements = dict(base)
+    sub_requirements = base.get("sub_categories", {})
+    # Requirements follow the tables: a program reads its own requirement sub-category, else the
+    # one of the table sub-category it uses. The major's default tables may be keyed by the
+    # major's name instead of "Normal" (Psychology).
+    candidates = [sub_category, table_scope]
+    if table_scope in (None, DEFAULT_SUB_CATEGORY):
+        candidates.append(name)
+    scope = next((key for key in candidates if key is not None and key in sub_requirements), None)
+    if scope is not None:
+        requirements.update(sub_requirements[scope])
+    # A missing count audits the elective table as optional; an explicit 0 says so on purpose.
+    if elective_table and not _elective_count(requirements) and "elective_courses_needed" not in requirements:
+        label = f"{major_id}/{sub_category}" if sub_category else major_id
+        logger.warning(
+            f"Program {label} reads elective table '{elective_table}' but MAJOR_REQUIREMENTS[{major_id}] "
+            f"sets no elective count for it; no electives will be required."
+        )
+    for key, default in REQUIREMENT_DEFAULTS.items():
+        requirements.setdefault(key, default)
+
+    if "general_education" not in requirements:
+        requirements["general_education"] = general_education.rules
+    elif requirements["general_education"] != GENERAL_ED_REQUIREMENTS[major_id]:
+        errors.append(f"MAJOR_REQUIREMENTS[{major_id}]['general_education'] differs from GENERAL_ED_REQUIREMENTS[{major_id}].")
+
+    for key, value in requirements.items():
+        if key.endswith("courses_needed") and (not isinstance(value, int) or value < 0):
+            errors.append(f"MAJOR_REQUIREMENTS[{major_id}]['{key}'] must be a non-negative integer, got {value!r}.")
+    return freeze(requirements)
+
+
+def _compile_tables(major_id, sub_category, mapping, errors):
+    table_scope = _table_scope(mapping, sub_category)
+    scope = mapping["sub_categories"][table_scope] if table_scope else mapping
+
+    tables = {key: scope.get(key, mapping.get(key)) for key in TABLE_KEYS}
+    for key in ("core", "elective"):
+        if not tables[key]:
+            label = f"{major_id}/{sub_category}" if sub_category else major_id
+            errors.append(f"MAJOR_TABLE_MAPPING[{label}] has no '{key}' table.")
+    return MappingProxyType(tables)
+
+
+def compile_requirement_model():
+    """
+    Compile the major configuration in config.py into a RequirementModel.
+
+    Every numeric MAJOR_TABLE_MAPPING entry becomes a MajorProgram, plus one per
+    sub-category. Names are indexed in the precedence the handlers used to scan
+    them: main categories, table sub-categories, requirement sub-categories, then
+    MAJOR_NAME_MAPPING aliases.
+
+    Returns:
+        RequirementModel: The compiled model.
+
+    Raises:
+        ValueError: If the configuration dictionaries are inconsistent.
+    """
+    errors = []
+    major_ids = [major_id for major_id in MAJOR_TABLE_MAPPING if isinstance(major_id, int)]
+
+    for source_name, source in (("GENERAL_ED_REQUIREMENTS", GENERAL_ED_REQUIREMENTS),
+                                ("MAJOR_REQUIREMENTS", MAJOR_REQUIREMENTS)):
+        missing = [major_id for major_id in major_ids if major_id not in source]
+        if missing:
+            errors.append(f"Majors missing from {source_name}: {missing}")
+        unknown = [major_id for major_id in source if major_id not in MAJOR_TABLE_MAPPING]
+        if unknown:
+            errors.append(f"{source_name} has entries for unknown majors: {unknown}")
+    if errors:
+        raise ValueError("Invalid major configuration:\n  " + "\n  ".join(errors))
+
+    general_education = {
+        major_id: _compile_general_education(major_id, GENERAL_ED_REQUIREMENTS[major_id], errors)
+        for major_id in major_ids
+    }
+
+    programs = {}
+    names = {}
+
+    def add_name(name, target, source_name):
+        current = names.setdefault(name, target)
+        if current[0] != target[0]:
+            errors.append(f"{source_name} maps '{name}' to major {target[0]}, but it already names major {current[0]}.")
+
+    for major_id in major_ids:
+        mapping = MAJOR_TABLE_MAPPING[major_id]
+        name = mapping.get("main_category")
+        if not name:
+            errors.append(f"MAJOR_TABLE_MAPPING[{major_id}] has no main_category.")
+            continue
+        sub_categories = list(mapping.get("sub_categories", {}))
+        sub_categories += [sub for sub in MAJOR_REQUIREMENTS[major_id].get("sub_categories", {}) if sub not in sub_categories]
+
+        for sub_category in [None] + sub_categories:
+            tables = _compile_tables(major_id, sub_category, mapping, errors)
+            requirements = _compile_requirements(
+                major_id, name, sub_category, _table_scope(mapping, sub_category), tables["elective"],
+                general_education[major_id], errors
+            )
+            programs[(major_id, sub_category)] = MajorProgram(
+                major_id=major_id,
+                name=name,
+                sub_category=sub_category,
+                tables=tables,
+                requirements=requirements,
+                general_education=general_education[major_id],
+            )
+
+    for major_id in major_ids:
+        add_name(MAJOR_TABLE_MAPPING[major_id].get("main_category"), (major_id, None), "MAJOR_TABLE_MAPPING")
+    for (major_id, sub_category) in programs:
+        if sub_category and sub_category != DEFAULT_SUB_CATEGORY:
+            add_name(sub_category, (major_id, sub_category), "MAJOR_TABLE_MAPPING/MAJOR_REQUIREMENTS")
+    for name, major_id in MAJOR_NAME_MAPPING.items():
+        if major_id not in general_education:
+            errors.append(f"MAJOR_NAME_MAPPING maps '{name}' to unknown major {major_id}.")
+            continue
+        add_name(name, (major_id, None), "MAJOR_NAME_MAPPING")
+
+    for prefix, major_id in PREFIX_MAJOR_MAPPING.items():
+        if major_id not in general_education:
+            errors.append(f"PREFIX_MAJOR_MAPPING maps '{prefix}' to unknown major {major_id}.")
+
+    if errors:
+        raise ValueError("Invalid major configuration:\n  " + "\n  ".join(errors))
+
+    folded_names = {}
+    for name, target in names.items():
+        folded_names.setdefault(name.casefold(), target)
+
+    model = RequirementModel(
+        programs=MappingProxyType(programs),
+        names=MappingProxyType(names),
+        folded_names=MappingProxyType(folded_names),
+        prefixes=MappingProxyType(dict(PREFIX_MAJOR_MAPPING)),
+        general_education=MappingProxyType(general_education),
+    )
+    logger.info(f"Compiled requirement model: {len(major_ids)} majors, {len(programs)} programs, {len(names)} names.")
+    return model
+
+
+requirement_model = compile_requirement_model()
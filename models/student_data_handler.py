@@ -1,8 +1,10 @@
 import logging
 import json
-import re
 from models.course_handler import CourseHandler
+from models.course_index import get_course_index
 from models.general_education_handler import GeneralEducationHandler
+from models.gpa_analytics import compute_gpa_analytics
+from models.prerequisite_graph import get_eligible_next_courses
 from services.transcript_vision_service import TranscriptVisionService
 
 
@@ -56,10 +58,11 @@ class StudentDataHandler:
             dict: A dictionary of required courses categorized as core, elective, supporting, and general education.
         """
         try:
-            core_courses = self.course_handler.query_core_courses()
-            elective_courses = self.course_handler.query_elective_courses()
-            supporting_courses = self.course_handler.query_supporting_courses()
-            general_education_courses = self.general_education_handler.query_general_education_courses()
+            required_rows = self.course_handler.query_required_courses()
+            core_courses = required_rows["core"]
+            elective_courses = required_rows["elective"]
+            supporting_courses = required_rows["supporting"]
+            general_education_courses = required_rows["general_education"]
 
             logger.info("Successfully fetched required courses.")
 
@@ -68,58 +71,8 @@ class StudentDataHandler:
             logger.debug(f"Supporting Courses: {supporting_courses}")
             logger.debug(f"General Education Courses: {general_education_courses}")
 
-            def get_course_code_and_name(course_row):
-                logger.debug(f"Course row: {course_row}, Type: {type(course_row)}")
-
-                if isinstance(course_row, dict):
-                    keys = course_row.keys()
-                    course_row_dict = course_row
-                elif hasattr(course_row, '_fields'):  
-                    keys = course_row._fields
-                    course_row_dict = course_row._asdict()
-                elif hasattr(course_row, '__dict__'): 
-                    keys = vars(course_row).keys()
-                    course_row_dict = vars(course_row)
-                elif isinstance(course_row, tuple):
- 
-                    if len(course_row) >= 2:
-                        course_code = course_row[0]
-                        course_name = course_row[1]
-                        return course_code.replace(' ', ''), course_name
-                    else:
-                        logger.error("Course tuple does not have enough elements.")
-                        raise ValueError("Course tuple does not have enough elements.")
-                else:
-                    logger.error(f"Unsupported course_row type: {type(course_row)}")
-                    raise ValueError("Unsupported course_row type")
-
-                course_code = None
-                for key in keys:
-                    if re.search('code', key, re.IGNORECASE):
-                        course_code = course_row_dict[key]
-                        break
-
-                course_name = None
-                for key in keys:
-                    if re.search('name', key, re.IGNORECASE):
-                        course_name = course_row_dict[key]
-                        break
-
-                if not course_code or not course_name:
-                    raise ValueError("Course code or name not found in course_row.")
-
-                return course_code.replace(' ', ''), course_name
-
             def format_courses(courses):
-                formatted_courses = []
-                for c in courses:
-                    try:
-                        logger.debug(f"Processing course: {c}, Type: {type(c)}")
-                        course_code, course_name = get_course_code_and_name(c)
-                        formatted_courses.append(f"{course_code}: {course_name}")
-                    except ValueError as e:
-                        logger.warning(f"Skipping course due to error: {e}")
-                return formatted_courses
+                return [f"{course.code}: {course.name}" for course in courses if course.code and course.name]
 
             formatted_core_courses = format_courses(core_courses)
             formatted_elective_courses = format_courses(elective_courses)
@@ -207,7 +160,7 @@ class StudentDataHandler:
             if gen_ed_requirements:
                 formatted_requirements += "\n**General Education Requirements:**\n"
                 for key, value in gen_ed_requirements.items():
-                    if isinstance(value, list):
+                    if isinstance(value, (list, tuple)):
                         courses = ', '.join(value)
                         formatted_requirements += f"- {key.replace('_', ' ').capitalize()}: {courses}\n"
                     else:
@@ -260,6 +213,8 @@ class StudentDataHandler:
 
             formatted_data = []
             formatted_data.append("### Student Transcript\n")
+            course_index = get_course_index()
+            program = self.course_handler.program
 
             for semester, courses in self.transcript_data.items():
                 formatted_data.append(f"#### {semester}:\n")
@@ -303,6 +258,13 @@ class StudentDataHandler:
                     if gpa:  
                         course_details += f"    **GPA**: {gpa}\n"
 
+                    categories = course_index.categories_for(
+                        course_code, program.major_id, program.sub_category, name=course_name
+                    ) if course_code else []
+                    if categories:
+                        counts_toward = ", ".join(category.replace("_", " ") for category in categories)
+                        course_details += f"    **Counts Toward**: {counts_toward}\n"
+
                     formatted_data.append(course_details)
 
                 if semester_gpa is not None:
@@ -313,6 +275,60 @@ class StudentDataHandler:
             logger.error(f"Error formatting transcript data: {e}")
             raise
 
+    def get_eligible_next_courses(self):
+        """
+        Find the remaining major courses whose prerequisites the student has already met.
+
+        Returns:
+            list: Formatted "CODE: Name" entries for the eligible core, elective and supporting courses.
+        """
+        try:
+            course_names = {}
+            for category in ("raw_core_courses", "raw_elective_courses", "raw_supporting_courses"):
+                for course in self.required_courses.get(category, []):
+                    if course.code and course.name:
+                        course_names.setdefault(course.code, course.name)
+
+            eligible_codes = get_eligible_next_courses(self.transcript_data, course_names.keys())
+            logger.info(f"{len(eligible_codes)} of {len(course_names)} major course(s) are eligible to take next.")
+            return [f"{code}: {course_names[code]}" for code in eligible_codes]
+        except Exception as e:
+            logger.error(f"Error computing eligible next courses: {e}")
+            raise
+
+    def format_gpa_summary(self):
+        """
+        Format GPA analytics computed from the transcript for GPT prompts.
+
+        Returns:
+            str: Cumulative, repeat-adjusted and major GPA, the trend, term GPAs and the weakest prefixes.
+        """
+        try:
+            analytics = compute_gpa_analytics(self.transcript_data, major_id=self.course_handler.major_id)
+            if not analytics.get("courses_graded"):
+                return "- No graded courses found on the transcript."
+
+            lines = [
+                f"- Cumulative GPA (all attempts): {analytics['cumulative_gpa']}",
+                f"- Repeat-adjusted GPA (latest attempt of each course): {analytics['repeat_adjusted_gpa']}",
+            ]
+            if analytics["major_gpa"] is not None:
+                lines.append(f"- Major GPA: {analytics['major_gpa']}")
+            if analytics["gpa_trend_per_semester"] is not None:
+                lines.append(f"- Term GPA trend: {analytics['gpa_trend_per_semester']:+} per semester")
+            terms = ", ".join(
+                f"{term['semester']}: {term['term_gpa']}" for term in analytics["semesters"] if term["term_gpa"] is not None
+            )
+            lines.append(f"- Term GPAs: {terms}")
+            prefix_gpa = sorted(
+                (gpa, prefix) for prefix, gpa in analytics["prefix_gpa"].items() if gpa is not None
+            )
+            lines.append(f"- Lowest department GPAs: {', '.join(f'{prefix} {gpa}' for gpa, prefix in prefix_gpa[:3])}")
+            return "\n".join(lines)
+        except Exception as e:
+            logger.error(f"Error formatting GPA summary: {e}")
+            raise
+
     def prepare_gpt_input(self):
         """
         Prepare data for GPT prompt.
@@ -0,0 +1,212 @@
+import logging
+import json
+import re
+from collections import namedtuple
+from utils.normalization import normalize_course_code
+
+
+logger = logging.getLogger(__name__)
+
+PASSING_GRADES = ("A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D")
+TERM_ORDER = {"spring": 1, "summer": 2, "fall": 3}
+# Key under which a page extraction lists rows printed before the page's first semester heading.
+CONTINUED_SEMESTER = "continued"
+
+CourseAttempt = namedtuple("CourseAttempt", ["semester", "semester_index", "code", "name", "grade", "credits"])
+
+
+def semester_sort_key(semester):
+    """
+    Sort key for semester labels such as '2024 Spring' or 'Fall 2023'.
+
+    Returns:
+        tuple or None: (year, term order), or None if the label cannot be parsed.
+    """
+    year_match = re.search(r'(\d{4})', semester)
+    term_match = re.search(r'(spring|summer|fall)', semester, re.IGNORECASE)
+    if not year_match or not term_match:
+        return None
+    return int(year_match.group(1)), TERM_ORDER[term_match.group(1).lower()]
+
+
+def order_semesters(semesters):
+    """
+    Order semester labels chronologically. Falls back to the given order if any label cannot be parsed.
+
+    Args:
+        semesters (iterable): Semester labels.
+
+    Returns:
+        list: Semester labels in chronological order.
+    """
+    semesters = list(semesters)
+    keys = [semester_sort_key(semester) for semester in semesters]
+    if any(key is None for key in keys):
+        return semesters
+    return [semester for _, semester in sorted(zip(keys, semesters), key=lambda pair: pair[0])]
+
+
+def base_grade(grade):
+    """Return the letter grade without repeat markers, e.g. 'F R' -> 'F'."""
+    if not grade:
+        return ""
+    return grade.strip().split()[0].upper()
+
+
+def is_passing_grade(grade):
+    """Check whether a transcript grade counts as a completed course."""
+    return base_grade(grade) in PASSING_GRADES
+
+
+def parse_credits(value):
+    """Parse a credit-hours value from a transcript row. Returns None when missing or invalid."""
+    try:
+        credits = float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return credits if credits >= 0 else None
+
+
+def parse_course_attempts(transcript_data):
+    """
+    Flatten parsed transcript data into course attempts in chronological order.
+
+    Args:
+        transcript_data (dict): Semester -> list of course entries, as returned by TranscriptVisionService.
+
+    Returns:
+        list: CourseAttempt tuples. GPA entries and rows without a course code are skipped.
+    """
+    if not isinstance(transcript_data, dict) or 'error' in transcript_data:
+        return []
+
+    attempts = []
+    for semester_index, semester in enumerate(order_semesters(transcript_data.keys())):
+        courses = transcript_data.get(semester)
+        if not isinstance(courses, list):
+            continue
+        for course in courses:
+            if isinstance(course, str):
+                try:
+                    course = json.loads(course)
+                except json.JSONDecodeError:
+                    logger.error(f"Unable to parse course data: {course}")
+                    continue
+            if not isinstance(course, dict):
+                continue
+
+            course_code = (course.get('Course_code') or '').strip()
+            if not course_code:
+                continue
+            grade = (course.get('GR') or course.get('grade') or '').strip()
+            attempts.append(CourseAttempt(
+                semester=semester,
+                semester_index=semester_index,
+                code=normalize_course_code(course_code),
+                name=(course.get('Course_name') or '').strip(),
+                grade=grade,
+                credits=parse_credits(course.get('Credits') or course.get('credits') or course.get('CR')),
+            ))
+    return attempts
+
+
+def get_passed_courses(transcript_data):
+    """
+    Collect the courses the student has passed.
+
+    Args:
+        transcript_data (dict): Parsed transcript data.
+
+    Returns:
+        dict: Course code -> course name, using the most recent passing attempt of each course.
+    """
+    passed = {}
+    for attempt in parse_course_attempts(transcript_data):
+        if is_passing_grade(attempt.grade):
+            passed[attempt.code] = attempt.name
+    return passed
+
+
+def _entry_key(entry):
+    return json.dumps(entry, sort_keys=True) if isinstance(entry, dict) else str(entry)
+
+
+def _is_gpa_entry(entry):
+    return isinstance(entry, dict) and 'gpa' in entry and not entry.get('Course_code')
+
+
+def merge_transcript_pages(pages):
+    """
+    Merge per-page transcript extractions into one transcript.
+
+    A semester that continues on the next page is joined; entries repeated on
+    both pages are kept once. Rows a page lists under CONTINUED_SEMESTER (they
+    precede any semester heading on it) belong to the last semester of the
+    previous page. Each semester keeps a single GPA entry, placed last: the last
+    non-empty GPA, since a semester's totals are printed where it ends.
+
+    Args:
+        pages (list): Parsed transcript dicts, one per page, in page order.
+
+    Returns:
+        dict: Semester -> list of entries, semesters in first-seen order.
+    """
+    merged = {}
+    seen = {}
+    gpas = {}
+    last_semester = None
+    for page in pages:
+        if not isinstance(page, dict) or 'error' in page:
+            continue
+        page_last_semester = last_semester
+        for semester, entries in page.items():
+            if not isinstance(entries, list):
+                continue
+            if semester == CONTINUED_SEMESTER:
+                if last_semester is None:
+                    logger.warning("Rows continue a semester, but no earlier page names one; keeping them apart.")
+                else:
+                    semester = last_semester
+            else:
+                page_last_semester = semester
+            semester_entries = merged.setdefault(semester, [])
+            semester_seen = seen.setdefault(semester, set())
+            for entry in entries:
+                if _is_gpa_entry(entry):
+                    if semester not in gpas or str(entry.get('gpa') or '').strip():
+                        gpas[semester] = entry
+                    continue
+                key = _entry_key(entry)
+                if key not in semester_seen:
+                    semester_seen.add(key)
+                    semester_entries.append(entry)
+        last_semester = page_last_semester
+    for semester, entry in gpas.items():
+        merged[semester].append(entry)
+    return merged
+
+
+def diff_transcripts(previous, current):
+    """
+    Compare two parsed transcripts semester by semester.
+
+    Args:
+        previous (dict or None): Transcript from the last upload.
+        current (dict): Transcript from the new upload.
+
+    Returns:
+        dict: Lists of added, changed (e.g. a new grade for a repeat) and removed semester labels.
+    """
+    previous = previous or {}
+
+    def fingerprint(entries):
+        return sorted(_entry_key(entry) for entry in entries or [])
+
+    return {
+        "added": [semester for semester in current if semester not in previous],
+        "changed": [
+            semester for semester in current
+            if semester in previous and fingerprint(current[semester]) != fingerprint(previous[semester])
+        ],
+        "removed": [semester for semester in previous if semester not in current],
+    }
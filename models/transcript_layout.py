@@ -0,0 +1,189 @@
+import logging
+import html
+import re
+from collections import namedtuple
+from models.transcript import PASSING_GRADES
+
+
+logger = logging.getLogger(__name__)
+
+TextWord = namedtuple("TextWord", ["x_min", "y_min", "x_max", "y_max", "text"])
+
+PAGE_PATTERN = re.compile(r'<page\b[^>]*>(.*?)</page>', re.DOTALL)
+WORD_PATTERN = re.compile(
+    r'<word xMin="([\d.\-]+)" yMin="([\d.\-]+)" xMax="([\d.\-]+)" yMax="([\d.\-]+)">(.*?)</word>'
+)
+
+SEMESTER_HEADING_PATTERN = re.compile(r'^(\d{4})\s+(Spring|Summer|Fall|Winter)$', re.IGNORECASE)
+TERM_CODE_PATTERN = re.compile(r'^(\d{4})(FA|SP|SU|WI|F|S)$')
+TERM_CODE_NAMES = {"FA": "Fall", "F": "Fall", "SP": "Spring", "S": "Spring", "SU": "Summer", "WI": "Winter"}
+DEPT_PATTERN = re.compile(r'^[A-Z]{2,5}$')
+CRSE_PATTERN = re.compile(r'^\d{3}[A-Z]?$')
+NUMBER_PATTERN = re.compile(r'^\d+(\.\d+)?$')
+
+# Header cells that identify the course table (DEPT/CRSE/Sec/Title/.../GR layout).
+REQUIRED_HEADER_CELLS = ("dept", "crse", "title", "gr")
+FINAL_GRADES = PASSING_GRADES + ("F", "W", "R", "I")
+REPEAT_MARKER = "R"
+
+# Words whose vertical centres are closer than this fraction of the word height share a line.
+LINE_TOLERANCE = 0.5
+# Right-aligned cells (grades, credits) may start this many points before their header.
+COLUMN_SLACK = 12.0
+
+
+def parse_bbox_document(document):
+    """
+    Read the words of a `pdftotext -bbox` XHTML document.
+
+    Args:
+        document (str): Output of pdftotext -bbox.
+
+    Returns:
+        list: One list of TextWord per page.
+    """
+    pages = []
+    for page in PAGE_PATTERN.findall(document):
+        pages.append([
+            TextWord(float(x_min), float(y_min), float(x_max), float(y_max), html.unescape(text))
+            for x_min, y_min, x_max, y_max, text in WORD_PATTERN.findall(page)
+        ])
+    return pages
+
+
+def group_lines(words):
+    """Group the words of a page into lines, top to bottom, each line ordered left to right."""
+    lines = []
+    current, current_y, current_height = [], None, 0.0
+    for word in sorted(words, key=lambda word: ((word.y_min + word.y_max) / 2, word.x_min)):
+        y = (word.y_min + word.y_max) / 2
+        height = word.y_max - word.y_min
+        if current and abs(y - current_y) > LINE_TOLERANCE * max(height, current_height):
+            lines.append(sorted(current, key=lambda word: word.x_min))
+            current = []
+        if not current:
+            current_y, current_height = y, height
+        current.append(word)
+    if current:
+        lines.append(sorted(current, key=lambda word: word.x_min))
+    return lines
+
+
+def _header_columns(line):
+    """Return [(name, start x)] when the line is the course table header, otherwise None."""
+    names = [word.text.lower() for word in line]
+    if not all(cell in names for cell in REQUIRED_HEADER_CELLS):
+        return None
+    columns = []
+    previous_end = None
+    for word, name in zip(line, names):
+        slack = COLUMN_SLACK if previous_end is None else min(COLUMN_SLACK, (word.x_min - previous_end) / 2)
+        columns.append((name, word.x_min - max(slack, 0.0)))
+        previous_end = word.x_max
+    return columns
+
+
+def _cells(line, columns):
+    """Split a line into header cell -> text, placing each word by its horizontal centre."""
+    cells = {}
+    for word in line:
+        centre = (word.x_min + word.x_max) / 2
+        name = columns[0][0]
+        for column_name, start in columns:
+            if centre < start:
+                break
+            name = column_name
+        cells[name] = f"{cells[name]} {word.text}" if name in cells else word.text
+    return cells
+
+
+def _grade(text):
+    """Normalize a grade cell. Returns (grade, valid); in-progress courses have an empty grade."""
+    parts = text.upper().split()
+    if not parts:
+        return "", True
+    if parts[0] in FINAL_GRADES and all(part == REPEAT_MARKER for part in parts[1:]):
+        return " ".join(parts), True
+    return "", False
+
+
+def _term_semester(term):
+    match = TERM_CODE_PATTERN.match(term)
+    if not match:
+        return None
+    return f"{match.group(1)} {TERM_CODE_NAMES[match.group(2)]}"
+
+
+def parse_transcript_layout(pages):
+    """
+    Parse the course table of a transcript text layer into the extraction format of the vision model.
+
+    Columns are located from the header row (Term, Dept, Crse, Sec, Title, ..., Gr, Att, Ern, Pts, GPA)
+    and every word is placed in the column it sits under. Semester headings ('2024 Fall') open a
+    semester, course rows add {'Course_code', 'Course_name', 'GR'} entries and the first totals row
+    of a semester supplies its GPA. Sections before the first course table header are ignored.
+
+    Args:
+        pages (list): One list of TextWord per page, as returned by parse_bbox_document.
+
+    Returns:
+        tuple: (semester -> list of entries, confidence). Confidence is the share of course-like rows
+        that parsed cleanly, 0.0 when no course table was found.
+    """
+    transcript = {}
+    gpas = {}
+    columns = None
+    semester = None
+    candidates = 0
+    parsed = 0
+
+    for page in pages:
+        for line in group_lines(page):
+            header = _header_columns(line)
+            if header:
+                columns = header
+                continue
+            if columns is None:
+                continue
+
+            heading = SEMESTER_HEADING_PATTERN.match(" ".join(word.text for word in line))
+            if heading:
+                semester = f"{heading.group(1)} {heading.group(2).capitalize()}"
+                transcript.setdefault(semester, [])
+                continue
+
+            cells = _cells(line, columns)
+            dept = cells.get("dept", "")
+            crse = cells.get("crse", "")
+            term = cells.get("term", "")
+            if TERM_CODE_PATTERN.match(term) or CRSE_PATTERN.match(crse):
+                candidates += 1
+                grade, grade_valid = _grade(cells.get("gr", ""))
+                title = cells.get("title", "")
+                row_semester = semester or _term_semester(term)
+                if not (DEPT_PATTERN.match(dept) and CRSE_PATTERN.match(crse) and title
+                        and grade_valid and row_semester):
+                    logger.debug(f"Unparsed transcript row: {cells}")
+                    continue
+                parsed += 1
+                transcript.setdefault(row_semester, []).append(
+                    {"Course_code": f"{dept}{crse}", "Course_name": title, "GR": grade}
+                )
+                continue
+
+            gpa = cells.get("gpa", "")
+            attempted = cells.get("att", "")
+            if semester and semester not in gpas and NUMBER_PATTERN.match(gpa) and NUMBER_PATTERN.match(attempted):
+                # Semesters in progress report a 0 GPA.
+                gpas[semester] = gpa if float(gpa) > 0 else ""
+
+    transcript = {semester: entries for semester, entries in transcript.items() if entries}
+    for semester, entries in transcript.items():
+        entries.append({"gpa": gpas.get(semester, "")})
+
+    confidence = parsed / candidates if candidates else 0.0
+    logger.info(
+        f"Parsed transcript text layer: {parsed} of {candidates} course row(s) in "
+        f"{len(transcript)} semester(s), confidence {confidence:.2f}."
+    )
+    return transcript, confidence
@@ -0,0 +1,123 @@
+import logging
+import math
+from collections import namedtuple
+from config import VISION_MAX_DPI, VISION_MAX_SECTIONS, VISION_MIN_DPI
+
+
+logger = logging.getLogger(__name__)
+
+# How the vision model bills high-detail images: the image is scaled to fit a 2048 px square,
+# then its shortest side is scaled down to 768 px, and it is billed per 512 px tile.
+VISION_MAX_SIDE = 2048
+VISION_SHORT_SIDE = 768
+VISION_TILE_SIZE = 512
+VISION_BASE_TOKENS = 85
+VISION_TILE_TOKENS = 170
+
+ImageSizingPlan = namedtuple(
+    "ImageSizingPlan",
+    ["dpi", "sections", "section_size", "tiles", "tokens_per_section", "total_tokens", "legible"]
+)
+
+
+def vision_input_size(width, height):
+    """Pixel size the vision model actually looks at for an image of the given size."""
+    scale = min(1.0, VISION_MAX_SIDE / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, VISION_SHORT_SIDE / min(width, height))
+    return width * scale, height * scale
+
+
+def vision_tiles(width, height):
+    """Number of 512 px tiles billed for an image of the given pixel size."""
+    width, height = vision_input_size(width, height)
+    return math.ceil(width / VISION_TILE_SIZE) * math.ceil(height / VISION_TILE_SIZE)
+
+
+def image_tokens(width, height):
+    """Estimated input tokens of one high-detail image of the given pixel size."""
+    return VISION_BASE_TOKENS + VISION_TILE_TOKENS * vision_tiles(width, height)
+
+
+def fit_to_tiles(size, plan):
+    """
+    Shrink a section size, keeping its aspect ratio, so it is billed no more tiles than the plan's sections.
+
+    Content-aware cuts make sections slightly taller or shorter than the even split the plan assumed.
+    """
+    width, height = size
+    tiles_wide = math.ceil(plan.section_size[0] / VISION_TILE_SIZE)
+    tiles_high = math.ceil(plan.section_size[1] / VISION_TILE_SIZE)
+    scale = min(1.0, tiles_wide * VISION_TILE_SIZE / width, tiles_high * VISION_TILE_SIZE / height)
+    return max(int(width * scale), 1), max(int(height * scale), 1)
+
+
+def _section_plan(width_inches, height_inches, sections, min_dpi, max_dpi):
+    section_height = height_inches / sections
+    # Resolution above this is scaled away by the model before it reads the image.
+    preserved_dpi = min(
+        VISION_MAX_SIDE / max(width_inches, section_height),
+        VISION_SHORT_SIDE / min(width_inches, section_height),
+        max_dpi,
+    )
+    legible = preserved_dpi >= min_dpi
+    if legible:
+        # Grow from the legibility floor while the section still fits the same tiles.
+        tiles_wide = math.ceil(width_inches * min_dpi / VISION_TILE_SIZE)
+        tiles_high = math.ceil(section_height * min_dpi / VISION_TILE_SIZE)
+        dpi = min(
+            tiles_wide * VISION_TILE_SIZE / width_inches,
+            tiles_high * VISION_TILE_SIZE / section_height,
+            preserved_dpi,
+        )
+    else:
+        dpi = preserved_dpi
+    dpi = max(int(dpi), 1)
+    size = (max(int(width_inches * dpi), 1), max(int(section_height * dpi), 1))
+    tokens = image_tokens(*size)
+    return ImageSizingPlan(
+        dpi=dpi,
+        sections=sections,
+        section_size=size,
+        tiles=vision_tiles(*size),
+        tokens_per_section=tokens,
+        total_tokens=tokens * sections,
+        legible=legible,
+    )
+
+
+def plan_image_sizing(width_inches, height_inches, min_dpi=VISION_MIN_DPI, max_sections=VISION_MAX_SECTIONS,
+                      max_dpi=VISION_MAX_DPI):
+    """
+    Pick the section count and resolution that send a page to the vision model in the fewest tokens.
+
+    A page is split into horizontal sections. For every section count the resolution is
+    grown from min_dpi as far as the section still fits the same number of tiles, never
+    beyond what the model would scale away. The cheapest legible plan wins, ties going to
+    the sharper one; when no section count keeps min_dpi the sharpest plan is used.
+
+    Args:
+        width_inches (float): Page width.
+        height_inches (float): Page height.
+        min_dpi (int): Lowest resolution at which transcript text stays legible.
+        max_sections (int): Most sections a page may be split into.
+        max_dpi (int): Highest resolution worth rendering or upscaling to.
+
+    Returns:
+        ImageSizingPlan: dpi, sections, section_size (pixels), tiles and tokens per section,
+        total_tokens for the page and whether min_dpi is met.
+    """
+    if width_inches <= 0 or height_inches <= 0:
+        raise ValueError("Page dimensions must be positive.")
+    plans = [
+        _section_plan(width_inches, height_inches, sections, min_dpi, max_dpi)
+        for sections in range(1, max(max_sections, 1) + 1)
+    ]
+    legible = [plan for plan in plans if plan.legible]
+    if legible:
+        return min(legible, key=lambda plan: (plan.total_tokens, -plan.dpi, plan.sections))
+    logger.warning(
+        f"No section count keeps {min_dpi} DPI for a {width_inches:.1f}x{height_inches:.1f} in page; "
+        f"using the sharpest plan."
+    )
+    return max(plans, key=lambda plan: (plan.dpi, -plan.total_tokens))
@@ -0,0 +1,73 @@
+from flask import Blueprint, request, jsonify
+from functools import wraps
+import hmac
+import logging
+from config import ADMIN_API_TOKEN
+from models.catalog_cache import catalog_cache
+from models.extraction_cache import extraction_cache
+from services.job_service import job_runner
+from services.openai_services import openai_client, openai_limiter
+
+logger = logging.getLogger(__name__)
+
+
+admin_bp = Blueprint('admin_bp', __name__)
+
+
+def require_admin_token(view):
+    """Reject requests without a valid X-Admin-Token header. Admin routes are disabled when no token is configured."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_API_TOKEN:
+            logger.warning("Admin endpoint called but ADMIN_API_TOKEN is not configured.")
+            return jsonify({"status": "error", "message": "Admin endpoints are disabled."}), 403
+
+        token = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode()):
+            logger.warning("Rejected admin request with an invalid token.")
+            return jsonify({"status": "error", "message": "Invalid admin token."}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/catalog-cache', methods=['GET'])
+@require_admin_token
+def catalog_cache_stats():
+    return jsonify({"status": "success", "cache": catalog_cache.stats()}), 200
+
+
+@admin_bp.route('/catalog-cache/invalidate', methods=['POST'])
+@require_admin_token
+def invalidate_catalog_cache():
+    data = request.get_json(silent=True) or {}
+    table_name = data.get("table")
+    if table_name is not None and not isinstance(table_name, str):
+        return jsonify({"status": "error", "message": "The 'table' field must be a string."}), 400
+
+    catalog_cache.invalidate(table_name)
+    return jsonify({"status": "success", "invalidated": table_name or "all", "cache": catalog_cache.stats()}), 200
+
+
+@admin_bp.route('/extraction-cache', methods=['GET'])
+@require_admin_token
+def extraction_cache_stats():
+    return jsonify({"status": "success", "cache": extraction_cache.stats()}), 200
+
+
+@admin_bp.route('/extraction-cache/clear', methods=['POST'])
+@require_admin_token
+def clear_extraction_cache():
+    removed = extraction_cache.clear()
+    return jsonify({"status": "success", "removed": removed, "cache": extraction_cache.stats()}), 200
+
+
+@admin_bp.route('/openai-limiter', methods=['GET'])
+@require_admin_token
+def openai_limiter_stats():
+    return jsonify({"status": "success", "limiter": openai_limiter.stats(), "client": openai_client.stats()}), 200
+
+
+@admin_bp.route('/jobs', methods=['GET'])
+@require_admin_token
+def job_stats():
+    return jsonify({"status": "success", "jobs": job_runner.stats()}), 200
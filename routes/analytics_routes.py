@@ -0,0 +1,85 @@
+from flask import Blueprint, request, jsonify
+import logging
+from models.course_sets import get_what_if_majors
+from models.gpa_analytics import compute_gpa_analytics, simulate_what_if
+from models.requirement_model import requirement_model
+
+logger = logging.getLogger(__name__)
+
+
+analytics_bp = Blueprint('analytics_bp', __name__)
+
+
+def _get_transcript_data(data):
+    transcript_data = data.get("transcript_data")
+    if not isinstance(transcript_data, dict) or not transcript_data:
+        return None
+    return transcript_data
+
+
+@analytics_bp.route('/gpa', methods=['POST'])
+def gpa_analytics():
+    """Cumulative, repeat-adjusted, major and per-semester GPA statistics for a parsed transcript."""
+    data = request.get_json(silent=True) or {}
+    transcript_data = _get_transcript_data(data)
+    if transcript_data is None:
+        return jsonify({"status": "error", "message": "'transcript_data' must be a non-empty object."}), 400
+
+    major_id = None
+    major_name = data.get("major_name")
+    if major_name:
+        major_id = requirement_model.major_id_for_name(major_name)
+        if major_id is None:
+            return jsonify({"status": "error", "message": f"Unknown major: {major_name}"}), 400
+
+    try:
+        analytics = compute_gpa_analytics(transcript_data, major_id=major_id)
+    except Exception as e:
+        logger.error(f"Error computing GPA analytics: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
+    return jsonify({"status": "success", "analytics": analytics}), 200
+
+
+@analytics_bp.route('/what-if', methods=['POST'])
+def gpa_what_if():
+    """Evaluate hypothetical grades for planned courses, e.g. what is needed to reach a 3.0."""
+    data = request.get_json(silent=True) or {}
+    transcript_data = _get_transcript_data(data)
+    if transcript_data is None:
+        return jsonify({"status": "error", "message": "'transcript_data' must be a non-empty object."}), 400
+
+    try:
+        result = simulate_what_if(
+            transcript_data,
+            planned_courses=data.get("planned_courses"),
+            target_gpa=data.get("target_gpa"),
+            scenarios=data.get("scenarios"),
+            grade_options=data.get("grade_options"),
+        )
+    except ValueError as ve:
+        logger.error(f"Invalid what-if request: {ve}")
+        return jsonify({"status": "error", "message": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Error running GPA what-if simulation: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
+    return jsonify({"status": "success", "what_if": result}), 200
+
+
+@analytics_bp.route('/what-if/majors', methods=['POST'])
+def majors_what_if():
+    """Audit a parsed transcript against every major and rank them by the courses still needed."""
+    data = request.get_json(silent=True) or {}
+    transcript_data = _get_transcript_data(data)
+    if transcript_data is None:
+        return jsonify({"status": "error", "message": "'transcript_data' must be a non-empty object."}), 400
+
+    limit = data.get("limit")
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"status": "error", "message": "'limit' must be a positive integer."}), 400
+
+    try:
+        majors = get_what_if_majors(transcript_data, limit=limit)
+    except Exception as e:
+        logger.error(f"Error running the major what-if audit: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
+    return jsonify({"status": "success", "majors": majors}), 200
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify
+import logging
+from models.course_index import get_course_index
+from utils.normalization import normalize_course_code
+
+logger = logging.getLogger(__name__)
+
+
+catalog_bp = Blueprint('catalog_bp', __name__)
+
+MAX_SEARCH_RESULTS = 100
+
+
+@catalog_bp.route('/search', methods=['GET'])
+def search_courses():
+    """Search catalog courses by code, code prefix or name words, with the categories each one counts for."""
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"status": "error", "message": "Query parameter 'q' is required."}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"status": "error", "message": "'limit' must be an integer."}), 400
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+
+    try:
+        results = get_course_index().search(query, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching the course catalog: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
+    return jsonify({"status": "success", "results": results}), 200
+
+
+@catalog_bp.route('/courses/<course_code>', methods=['GET'])
+def classify_course(course_code):
+    """List every (major, sub-category, category) a course counts for. 'name' helps match name-based rules."""
+    try:
+        course_index = get_course_index()
+        code = normalize_course_code(course_code)
+        entries = course_index.classify(code, request.args.get('name'))
+    except Exception as e:
+        logger.error(f"Error classifying course {course_code}: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
+    return jsonify({
+        "status": "success",
+        "course_code": code,
+        "course_name": course_index.names.get(code),
+        "categories": [entry._asdict() for entry in entries],
+    }), 200
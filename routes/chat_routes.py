@@ -1,6 +1,12 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session, url_for
 import logging
+import uuid
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from models.audit_state_store import audit_state_store
 from services.chat_service import ChatService
+from services.job_service import JobQueueFull, job_runner
+from routes.job_routes import session_owner
+from config import ASYNC_ACTIONS, AUDIT_MODES, AUDIT_STATE_RETENTION, JOB_POLL_INTERVAL
 from werkzeug.utils import secure_filename
 import os
 
@@ -13,6 +19,7 @@ logger = logging.getLogger(__name__)
 chat_bp = Blueprint('chat_bp', __name__)
 
 UPLOAD_FOLDER = 'uploads'
+VALID_ACTIONS = ("degree_audit", "advising", "graduation_plan")
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -21,6 +28,79 @@ def allowed_file(filename):
     """Check if the uploaded file has an allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def parse_course_cap(value):
+    """Parse the optional 'max_courses_per_semester' field. Raises ValueError when it is not a positive integer."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (bool, float)):
+        raise ValueError("max_courses_per_semester must be a positive integer.")
+    try:
+        cap = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("max_courses_per_semester must be a positive integer.")
+    if cap < 1:
+        raise ValueError("max_courses_per_semester must be a positive integer.")
+    return cap
+
+def wants_async(value):
+    """Whether an action should run as a background job; the optional 'async' field overrides ASYNC_ACTIONS."""
+    if value in (None, ""):
+        return ASYNC_ACTIONS
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("1", "true", "yes")
+
+def resolve_audit_state(student_id, audit_token):
+    """
+    Find the stored audit state of a degree audit and the token the client keeps for it.
+
+    A returning student presents the audit_token of an earlier audit, from any session. A first
+    upload with a student_id opens new state under a random key. Keys only leave the server
+    inside tokens signed with the app's secret key, so a client can reach no state but its own.
+
+    Returns:
+        tuple: (state key, signed audit token), or (None, None) without a student_id or token.
+
+    Raises:
+        ValueError: The token was not issued here or is older than AUDIT_STATE_RETENTION.
+    """
+    serializer = URLSafeTimedSerializer(current_app.secret_key, salt="audit-state")
+    if audit_token:
+        try:
+            state_key = serializer.loads(audit_token, max_age=AUDIT_STATE_RETENTION)
+        except BadSignature:
+            raise ValueError("Invalid or expired 'audit_token'. Upload without it to start a new audit history.")
+    elif student_id:
+        state_key = uuid.uuid4().hex
+        logger.info(f"Opened audit state {state_key} for student {student_id}.")
+    else:
+        return None, None
+    return state_key, serializer.dumps(state_key)
+
+def submit_action_job(action, major_name, file_paths, audit_mode, student_id, max_courses_per_semester,
+                      audit_token=None):
+    """Queue an action for the job workers and answer 202 with where to follow it."""
+    try:
+        job = job_runner.submit_action(
+            session_owner(), session["conversation_history"], session["context"],
+            action, major_name, file_paths, audit_mode, student_id, max_courses_per_semester
+        )
+    except JobQueueFull as e:
+        logger.warning(f"Rejected {action} job: {e}")
+        return jsonify({
+            "status": "error",
+            "message": "Too many requests are being processed. Please try again shortly."
+        }), 503
+    response = {
+        "status": "accepted",
+        "job_id": job.job_id,
+        "job_url": url_for('job_bp.get_job', job_id=job.job_id),
+        "poll_after": JOB_POLL_INTERVAL,
+    }
+    if audit_token:
+        response["audit_token"] = audit_token
+    return jsonify(response), 202
+
 @chat_bp.route('/', methods=['POST'])
 def chat():
     try:
@@ -32,6 +112,11 @@ def chat():
             files = request.files.getlist('file')
             action = request.form.get('action', '').lower()
             major_name = request.form.get('major_name', None)
+            audit_mode = request.form.get('audit_mode', '').lower() or None
+            student_id = request.form.get('student_id', '').strip() or None
+            audit_token = request.form.get('audit_token', '').strip() or None
+            max_courses_per_semester = request.form.get('max_courses_per_semester')
+            run_async = wants_async(request.form.get('async'))
 
             if not action or not major_name:
                 logger.error("Missing 'action' or 'major_name' in multipart request")
@@ -69,14 +154,39 @@ def chat():
                 context=session["context"]
             )
 
-            if action not in ["degree_audit", "advising"]:
+            if action not in VALID_ACTIONS:
                 logger.error(f"Invalid action received: {action}")
                 return jsonify({
                     "status": "error",
-                    "message": "Invalid action. Valid actions: 'degree_audit', 'advising'."
+                    "message": "Invalid action. Valid actions: 'degree_audit', 'advising', 'graduation_plan'."
+                }), 400
+
+            if audit_mode and audit_mode not in AUDIT_MODES:
+                logger.error(f"Invalid audit mode received: {audit_mode}")
+                return jsonify({
+                    "status": "error",
+                    "message": f"Invalid audit_mode. Valid modes: {', '.join(AUDIT_MODES)}."
                 }), 400
 
-            action_response = chat_service.handle_action(action, major_name, file_paths)
+            try:
+                max_courses_per_semester = parse_course_cap(max_courses_per_semester)
+                state_key, audit_token = (
+                    resolve_audit_state(student_id, audit_token) if action == "degree_audit" else (None, None)
+                )
+            except ValueError as ve:
+                logger.error(f"Invalid action parameters received: {ve}")
+                return jsonify({"status": "error", "message": str(ve)}), 400
+
+            if run_async:
+                return submit_action_job(
+                    action, major_name, file_paths, audit_mode, state_key, max_courses_per_semester, audit_token
+                )
+
+            action_response = chat_service.handle_action(
+                action, major_name, file_paths, audit_mode, state_key, max_courses_per_semester
+            )
+            if audit_token:
+                action_response["audit_token"] = audit_token
 
             session["conversation_history"] = chat_service.conversation_history
             session["context"] = chat_service.context
@@ -92,6 +202,11 @@ def chat():
             major_name = data.get("major_name")
             file_paths = data.get("file_paths", [])
             user_message = data.get("message")
+            audit_mode = (data.get("audit_mode") or "").lower() or None
+            student_id = str(data.get("student_id") or "").strip() or None
+            audit_token = str(data.get("audit_token") or "").strip() or None
+            max_courses_per_semester = data.get("max_courses_per_semester")
+            run_async = wants_async(data.get("async"))
 
             if "conversation_history" not in session:
                 session["conversation_history"] = []
@@ -104,11 +219,11 @@ def chat():
             )
 
             if action:
-                if action not in ["degree_audit", "advising"]:
+                if action not in VALID_ACTIONS:
                     logger.error(f"Invalid action received: {action}")
                     return jsonify({
                         "status": "error",
-                        "message": "Invalid action. Valid actions: 'degree_audit', 'advising'."
+                        "message": "Invalid action. Valid actions: 'degree_audit', 'advising', 'graduation_plan'."
                     }), 400
 
                 if not major_name or not file_paths:
@@ -118,7 +233,32 @@ def chat():
                         "message": "Major name and file paths are required for this action."
                     }), 400
 
-                action_response = chat_service.handle_action(action, major_name, file_paths)
+                if audit_mode and audit_mode not in AUDIT_MODES:
+                    logger.error(f"Invalid audit mode received: {audit_mode}")
+                    return jsonify({
+                        "status": "error",
+                        "message": f"Invalid audit_mode. Valid modes: {', '.join(AUDIT_MODES)}."
+                    }), 400
+
+                try:
+                    max_courses_per_semester = parse_course_cap(max_courses_per_semester)
+                    state_key, audit_token = (
+                        resolve_audit_state(student_id, audit_token) if action == "degree_audit" else (None, None)
+                    )
+                except ValueError as ve:
+                    logger.error(f"Invalid action parameters received: {ve}")
+                    return jsonify({"status": "error", "message": str(ve)}), 400
+
+                if run_async:
+                    return submit_action_job(
+                        action, major_name, file_paths, audit_mode, state_key, max_courses_per_semester, audit_token
+                    )
+
+                action_response = chat_service.handle_action(
+                    action, major_name, file_paths, audit_mode, state_key, max_courses_per_semester
+                )
+                if audit_token:
+                    action_response["audit_token"] = audit_token
 
                 session["conversation_history"] = chat_service.conversation_history
                 session["context"] = chat_service.context
@@ -151,3 +291,20 @@ def chat():
     except Exception as e:
         logger.error(f"Error during chat interaction: {e}", exc_info=True)
         return jsonify({'status': 'error', 'message': 'An unexpected error occurred'}), 500
+
+
+@chat_bp.route('/audit-state', methods=['DELETE'])
+def delete_audit_state():
+    """Forget the stored transcript pages and audit that an audit_token reaches."""
+    data = request.get_json(silent=True) or {}
+    try:
+        state_key, _ = resolve_audit_state(None, str(data.get("audit_token") or "").strip() or None)
+    except ValueError as ve:
+        logger.error(f"Rejected audit state deletion: {ve}")
+        return jsonify({"status": "error", "message": str(ve)}), 400
+    if state_key is None:
+        return jsonify({"status": "error", "message": "'audit_token' is required."}), 400
+
+    deleted = audit_state_store.delete(state_key)
+    logger.info(f"Deleted audit state {state_key}: {deleted}.")
+    return jsonify({"status": "success", "deleted": deleted}), 200
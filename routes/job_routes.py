@@ -0,0 +1,68 @@
+from flask import Blueprint, jsonify, session
+import logging
+import uuid
+from config import JOB_POLL_INTERVAL
+from models.job_store import FINISHED_STATUSES, JOB_COMPLETED, job_store
+
+logger = logging.getLogger(__name__)
+
+
+job_bp = Blueprint('job_bp', __name__)
+
+
+def session_owner():
+    """Random identifier of the current session, created on first use. Jobs belong to it."""
+    if "owner" not in session:
+        session["owner"] = uuid.uuid4().hex
+    return session["owner"]
+
+
+def _owned_job(job_id):
+    """The job if it belongs to the current session, otherwise None."""
+    job = job_store.get(job_id)
+    if job is None or job.owner != session.get("owner"):
+        return None
+    return job
+
+
+def _apply_session_update(job):
+    """Add the messages and context of a completed job to the session, once."""
+    if job.status != JOB_COMPLETED or not job.session_update or job.applied:
+        return
+    if not job_store.mark_applied(job.job_id):
+        return
+    session["conversation_history"] = session.get("conversation_history", []) + job.session_update["messages"]
+    session["context"] = {**session.get("context", {}), **job.session_update["context"]}
+
+
+def _job_summary(job):
+    return {
+        "job_id": job.job_id,
+        "action": job.action,
+        "status": job.status,
+        "stage": job.stage,
+        "events": job.events,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = _owned_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found."}), 404
+
+    _apply_session_update(job)
+    summary = _job_summary(job)
+    if job.status == JOB_COMPLETED:
+        result = dict(job.result)
+        if "history" in result:
+            result["history"] = session.get("conversation_history", [])
+        summary["result"] = result
+    elif job.error:
+        summary["error"] = job.error
+    if job.status not in FINISHED_STATUSES:
+        summary["poll_after"] = JOB_POLL_INTERVAL
+    return jsonify({"status": "success", "job": summary}), 200
+
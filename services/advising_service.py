@@ -1,5 +1,6 @@
 import logging
 import json
+from models.job_store import report_progress
 from services.openai_services import generate_chatgpt_response
 from models.student_data_handler import StudentDataHandler
 from utils.prompt_builder import PromptHandler
@@ -37,6 +38,7 @@ class AdvisingService:
                 major_name=self.major_name
             )
             logger.info("Transcript data successfully processed.")
+            report_progress("advising")
 
             logger.info("Generating advising prompt.")
             prompt_handler = PromptHandler(student_data_handler=student_data_handler)
@@ -47,7 +49,8 @@ class AdvisingService:
             advising_response = generate_chatgpt_response(
                 prompt=advising_prompt,
                 max_tokens=3000,
-                temperature=0.5
+                temperature=0.5,
+                call_type="advising"
             )
             logger.debug(f"Raw GPT response: {advising_response}")
 
@@ -0,0 +1,204 @@
+import logging
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from models.catalog_cache import catalog_cache, get_catalog_table_names
+from models.degree_audit_engine import run_degree_audit
+from models.requirement_model import requirement_model
+
+
+logger = logging.getLogger(__name__)
+
+AUDIT_CATEGORIES = ("core", "elective", "supporting")
+
+CSV_FIELDS = (
+    "student_id", "major_name", "status", "completed_courses", "core_courses_needed",
+    "supporting_courses_needed", "elective_courses_needed", "general_courses_needed", "message", "elapsed_ms",
+)
+
+
+def _make_record(data, student_id, default_major):
+    """Normalize an input object into an audit record. Bare transcripts get the default major."""
+    if isinstance(data, dict) and "transcript_data" in data:
+        record = data
+    else:
+        record = {"transcript_data": data}
+    return {
+        "student_id": str(record.get("student_id") or student_id),
+        "major_name": record.get("major_name") or default_major,
+        "transcript_data": record.get("transcript_data"),
+    }
+
+
+def iter_audit_records(source, default_major=None):
+    """
+    Read audit records from a directory of JSON files or from a JSONL file.
+
+    Each JSON object is either {"student_id", "major_name", "transcript_data"} or a bare
+    parsed transcript. Student IDs default to the file name or the line number.
+
+    Args:
+        source (str): Directory of *.json files, or a .jsonl file ('-' for stdin).
+        default_major (str, optional): Major used for records that do not name one.
+
+    Yields:
+        dict: Audit records. Unreadable entries carry an "error" key instead of a transcript.
+    """
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            if not file_name.lower().endswith(".json"):
+                continue
+            student_id = os.path.splitext(file_name)[0]
+            try:
+                with open(os.path.join(source, file_name), encoding="utf-8") as handle:
+                    yield _make_record(json.load(handle), student_id, default_major)
+            except (OSError, json.JSONDecodeError) as e:
+                yield {"student_id": student_id, "major_name": default_major, "error": f"Unreadable file: {e}"}
+        return
+
+    handle = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            student_id = f"line-{line_number}"
+            try:
+                yield _make_record(json.loads(line), student_id, default_major)
+            except json.JSONDecodeError as e:
+                yield {"student_id": student_id, "major_name": default_major, "error": f"Invalid JSON: {e}"}
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def init_audit_worker(tables, log_level):
+    """Pool initializer: install the catalog loaded once by the parent process."""
+    logging.getLogger().setLevel(log_level)
+    catalog_cache.preload(tables)
+
+
+def audit_record(record):
+    """
+    Audit one record with the local audit engine.
+
+    Args:
+        record (dict): Record from iter_audit_records.
+
+    Returns:
+        dict: student_id, major_name, status, audit_info (or message) and elapsed_ms.
+    """
+    start = time.perf_counter()
+    result = {"student_id": record.get("student_id"), "major_name": record.get("major_name")}
+    try:
+        if record.get("error"):
+            raise ValueError(record["error"])
+        if not isinstance(record.get("transcript_data"), dict) or not record["transcript_data"]:
+            raise ValueError("transcript_data must be a non-empty object.")
+
+        major_id, sub_category = requirement_model.resolve(record.get("major_name"))
+        program = requirement_model.program(major_id, sub_category)
+        if program is None:
+            raise ValueError(f"No mapping found for major name: {record.get('major_name')}")
+
+        table_names = {category: program.tables[category] for category in AUDIT_CATEGORIES}
+        tables = catalog_cache.get_tables(list(table_names.values()))
+        required_rows = {category: tables.get(name, []) if name else [] for category, name in table_names.items()}
+
+        result["status"] = "success"
+        result["audit_info"] = run_degree_audit(record["transcript_data"], program, required_rows)
+    except Exception as e:
+        result["status"] = "error"
+        result["message"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def _csv_row(result):
+    row = {field: result.get(field, "") for field in ("student_id", "major_name", "status", "message", "elapsed_ms")}
+    audit_info = result.get("audit_info")
+    if audit_info:
+        needed = audit_info["needed_courses"]
+        row["completed_courses"] = len(audit_info["completed_courses"])
+        row["core_courses_needed"] = ";".join(course["course_code"] for course in needed["core_courses"])
+        row["supporting_courses_needed"] = ";".join(course["course_code"] for course in needed["supporting_courses"])
+        row["elective_courses_needed"] = sum(entry["courses_needed"] for entry in needed["elective_courses"])
+        row["general_courses_needed"] = ";".join(
+            f"{entry['department']}:{entry['courses_needed']}" for entry in needed["general_courses"]
+        )
+    return row
+
+
+def run_batch_audit(source, output, output_format="jsonl", workers=None, default_major=None,
+                    chunksize=16, log_level=logging.WARNING):
+    """
+    Audit many parsed transcripts across a process pool, streaming results as they finish.
+
+    The catalog is loaded once here and handed to every worker through the pool
+    initializer, so workers never query the database.
+
+    Args:
+        source (str): Directory of JSON transcripts or a JSONL file (see iter_audit_records).
+        output (file): Writable text stream for the results.
+        output_format (str): "jsonl" or "csv".
+        workers (int, optional): Worker processes. Defaults to the CPU count; 1 runs in-process.
+        default_major (str, optional): Major for records that do not name one.
+        chunksize (int): Records sent to a worker at a time.
+        log_level (int): Log level inside the workers.
+
+    Returns:
+        dict: Throughput summary (records, succeeded, failed, workers, seconds, audits_per_second).
+    """
+    if output_format not in ("jsonl", "csv"):
+        raise ValueError(f"Unsupported output format: {output_format}. Use 'jsonl' or 'csv'.")
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    tables = catalog_cache.get_tables(get_catalog_table_names())
+    load_seconds = time.perf_counter() - start
+    logger.info(f"Loaded {len(tables)} catalog table(s) for the batch audit in {load_seconds:.2f}s.")
+
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    records = iter_audit_records(source, default_major)
+    summary = {"records": 0, "succeeded": 0, "failed": 0}
+    pool = None
+    try:
+        if workers == 1:
+            results = map(audit_record, records)
+        else:
+            pool = multiprocessing.Pool(workers, initializer=init_audit_worker, initargs=(tables, log_level))
+            results = pool.imap(audit_record, records, chunksize=chunksize)
+
+        for result in results:
+            summary["records"] += 1
+            summary["succeeded" if result["status"] == "success" else "failed"] += 1
+            if writer:
+                writer.writerow(_csv_row(result))
+            else:
+                output.write(json.dumps(result) + "\n")
+    except BaseException:
+        # Stop the workers without auditing the records still queued, so the error surfaces at once.
+        if pool:
+            pool.terminate()
+            pool.join()
+        raise
+    if pool:
+        pool.close()
+        pool.join()
+    output.flush()
+
+    seconds = time.perf_counter() - start
+    summary.update({
+        "workers": workers,
+        "catalog_load_seconds": round(load_seconds, 3),
+        "seconds": round(seconds, 3),
+        "audits_per_second": round(summary["records"] / seconds, 1) if seconds else None,
+    })
+    logger.info(f"Batch audit finished: {summary}")
+    return summary
@@ -3,6 +3,8 @@ import json
 from services.openai_services import generate_chatgpt_response
 from services.advising_service import AdvisingService
 from services.degree_audit_service import DegreeAuditService
+from services.graduation_plan_service import GraduationPlanService
+from services.incremental_audit_service import IncrementalAuditService
 
 
 logger = logging.getLogger(__name__)
@@ -31,28 +33,42 @@ class ChatService:
         self.context = context if context is not None else {}
         logger.info(f"ChatService initialized with conversation_id: {self.conversation_id}")
 
-    def handle_action(self, action, major_name, file_paths):
+    def handle_action(self, action, major_name, file_paths, audit_mode=None, student_id=None,
+                      max_courses_per_semester=None):
         """
         Handle specific actions like degree audit or advising.
 
         Args:
-            action (str): The action to perform (e.g., "degree_audit", "advising").
+            action (str): The action to perform ("degree_audit", "advising" or "graduation_plan").
             major_name (str): The user's major.
             file_paths (list): List of file paths for processing.
+            audit_mode (str, optional): Degree audit mode ("gpt" or "local"); defaults to AUDIT_MODE.
+            student_id (str, optional): Key of a returning student's stored state; the degree audit then
+                only re-extracts pages that changed since their last upload, and reuses the last audit
+                when the transcript is unchanged.
+            max_courses_per_semester (int, optional): Course cap per semester for "graduation_plan".
 
         Returns:
             dict: The assistant's structured response.
         """
         try:
             if action.lower() == "degree_audit":
-                degree_audit_service = DegreeAuditService(major_name=major_name, file_paths=file_paths)
+                if student_id:
+                    degree_audit_service = IncrementalAuditService(
+                        student_id=student_id, file_paths=file_paths, major_name=major_name, audit_mode=audit_mode
+                    )
+                else:
+                    degree_audit_service = DegreeAuditService(major_name=major_name, file_paths=file_paths, audit_mode=audit_mode)
                 result = degree_audit_service.perform_audit()
 
                 if result.get("status") == "success":
                     self.context["degree_audit"] = result["audit_info"]
                     audit_summary = f"Degree audit results for {major_name}: {json.dumps(result['audit_info'], indent=2)}"
                     self._append_to_history("assistant", audit_summary)
-                    return {"status": "success", "response": audit_summary, "history": self.conversation_history}
+                    response = {"status": "success", "response": audit_summary, "history": self.conversation_history}
+                    if "incremental" in result:
+                        response["incremental"] = result["incremental"]
+                    return response
                 else:
                     error_message = result.get("message", "Error performing degree audit.")
                     self._append_to_history("assistant", error_message)
@@ -72,7 +88,23 @@ class ChatService:
                     self._append_to_history("assistant", error_message)
                     return {"status": "error", "response": error_message, "history": self.conversation_history}
 
-            error_message = "Unsupported action provided. Valid actions: 'degree_audit', 'advising'."
+            elif action.lower() == "graduation_plan":
+                graduation_plan_service = GraduationPlanService(
+                    file_paths=file_paths, major_name=major_name, max_courses_per_semester=max_courses_per_semester
+                )
+                result = graduation_plan_service.create_plan()
+
+                if result.get("status") == "success":
+                    self.context["graduation_plan"] = result["graduation_plan"]
+                    plan_summary = f"Graduation plan for {major_name}: {json.dumps(result['graduation_plan'], indent=2)}"
+                    self._append_to_history("assistant", plan_summary)
+                    return {"status": "success", "response": plan_summary, "history": self.conversation_history}
+                else:
+                    error_message = result.get("message", "Error building the graduation plan.")
+                    self._append_to_history("assistant", error_message)
+                    return {"status": "error", "response": error_message, "history": self.conversation_history}
+
+            error_message = "Unsupported action provided. Valid actions: 'degree_audit', 'advising', 'graduation_plan'."
             self._append_to_history("assistant", error_message)
             return {"status": "error", "response": error_message, "history": self.conversation_history}
 
@@ -157,6 +189,10 @@ class ChatService:
             advising_notes = json.dumps(self.context["advising"], indent=2)
             context_items.append(f"Advising Notes:\n{advising_notes}")
 
+        if "graduation_plan" in self.context:
+            graduation_plan = json.dumps(self.context["graduation_plan"]["semesters"], indent=2)
+            context_items.append(f"Graduation Plan (minimum semesters):\n{graduation_plan}")
+
         system_prompt = "\n\n".join(context_items)
         logger.debug(f"Constructed system prompt: {system_prompt}")
         return system_prompt if system_prompt else None
@@ -1,7 +1,10 @@
 import logging
 import json
 import re
+from config import AUDIT_MODE, AUDIT_MODES
 from services.openai_services import generate_chatgpt_response
+from models.degree_audit_engine import run_degree_audit
+from models.job_store import report_progress
 from models.student_data_handler import StudentDataHandler
 from utils.prompt_builder import PromptHandler
 
@@ -20,17 +23,23 @@ logger = logging.getLogger(__name__)
 class DegreeAuditService:
     """Handles the degree audit functionality for a student's academic progress."""
 
-    def __init__(self, file_paths, major_name):
+    def __init__(self, file_paths, major_name, audit_mode=None, transcript_data=None):
         """
         Initialize the DegreeAuditService with the student's major and files.
 
         Args:
             file_paths (list): List of file paths (PDF or images).
             major_name (str): The student's major.
+            audit_mode (str, optional): "gpt" or "local". Defaults to AUDIT_MODE.
+            transcript_data (dict, optional): Already parsed transcript; skips extraction from the files.
         """
-        logger.info(f"Initializing DegreeAuditService for major: {major_name}")
+        self.audit_mode = (audit_mode or AUDIT_MODE).lower()
+        if self.audit_mode not in AUDIT_MODES:
+            raise ValueError(f"Invalid audit mode: {audit_mode}. Valid modes: {', '.join(AUDIT_MODES)}.")
+        logger.info(f"Initializing DegreeAuditService for major: {major_name} (audit mode: {self.audit_mode})")
         self.file_paths = file_paths
         self.major_name = major_name
+        self.transcript_data = transcript_data
 
     def perform_audit(self):
         """
@@ -43,9 +52,14 @@ class DegreeAuditService:
             logger.info("Initializing StudentDataHandler.")
             student_data_handler = StudentDataHandler(
                 file_paths=self.file_paths,
-                major_name=self.major_name
+                major_name=self.major_name,
+                raw_transcript_data=self.transcript_data
             )
             logger.info("Transcript data successfully processed.")
+            report_progress("auditing")
+
+            if self.audit_mode == "local":
+                return self._perform_local_audit(student_data_handler)
 
             logger.info("Generating degree audit prompt.")
             prompt_handler = PromptHandler(student_data_handler=student_data_handler)
@@ -56,7 +70,8 @@ class DegreeAuditService:
             audit_response = generate_chatgpt_response(
                 prompt=degree_audit_prompt,
                 max_tokens=3000,
-                temperature=0.0
+                temperature=0.0,
+                call_type="audit"
             )
             logger.debug(f"Raw GPT response: {audit_response}")
 
@@ -91,6 +106,34 @@ class DegreeAuditService:
             logger.error(f"Unexpected error during degree audit: {e}", exc_info=True)
             return {"status": "error", "message": "An unexpected error occurred during the degree audit process."}
 
+    def _perform_local_audit(self, student_data_handler):
+        """
+        Compute the degree audit with the local engine instead of GPT.
+
+        Args:
+            student_data_handler (StudentDataHandler): Handler holding the parsed transcript and catalog rows.
+
+        Returns:
+            dict: The degree audit result, in the same format as the GPT audit.
+        """
+        required_courses = student_data_handler.required_courses
+        required_rows = {
+            "core": required_courses.get("raw_core_courses", []),
+            "elective": required_courses.get("raw_elective_courses", []),
+            "supporting": required_courses.get("raw_supporting_courses", []),
+        }
+        audit_info = run_degree_audit(
+            student_data_handler.transcript_data,
+            student_data_handler.course_handler.program,
+            required_rows
+        )
+        logger.info("Local degree audit completed successfully.")
+        return {
+            "status": "success",
+            "audit_info": audit_info,
+            "raw_response": json.dumps(audit_info)
+        }
+
     def _extract_json(self, raw_content):
         """
         Extract JSON from GPT response content.
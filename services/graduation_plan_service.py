@@ -0,0 +1,66 @@
+import logging
+from models.graduation_planner import plan_graduation
+from models.job_store import report_progress
+from models.student_data_handler import StudentDataHandler
+
+logger = logging.getLogger(__name__)
+
+
+class GraduationPlanService:
+    """Builds a minimum-semester graduation plan locally, without a GPT call."""
+
+    def __init__(self, file_paths, major_name, max_courses_per_semester=None, transcript_data=None):
+        """
+        Initialize the GraduationPlanService with the student's major and files.
+
+        Args:
+            file_paths (list): List of file paths (PDF or images).
+            major_name (str): The student's major.
+            max_courses_per_semester (int, optional): Course cap per semester. Defaults to GRADUATION_PLAN_MAX_COURSES.
+            transcript_data (dict, optional): Already parsed transcript; skips extraction from the files.
+        """
+        logger.info(f"Initializing GraduationPlanService for major: {major_name}")
+        self.file_paths = file_paths
+        self.major_name = major_name
+        self.max_courses_per_semester = max_courses_per_semester
+        self.transcript_data = transcript_data
+
+    def create_plan(self):
+        """
+        Plan the remaining semesters based on the student's transcript files.
+
+        Returns:
+            dict: The graduation plan or error message.
+        """
+        try:
+            logger.info("Initializing StudentDataHandler.")
+            student_data_handler = StudentDataHandler(
+                file_paths=self.file_paths,
+                major_name=self.major_name,
+                raw_transcript_data=self.transcript_data
+            )
+            logger.info("Transcript data successfully processed.")
+            report_progress("planning")
+
+            required_courses = student_data_handler.required_courses
+            required_rows = {
+                "core": required_courses.get("raw_core_courses", []),
+                "elective": required_courses.get("raw_elective_courses", []),
+                "supporting": required_courses.get("raw_supporting_courses", []),
+            }
+            graduation_plan = plan_graduation(
+                student_data_handler.transcript_data,
+                student_data_handler.course_handler.program,
+                required_rows,
+                max_courses_per_semester=self.max_courses_per_semester
+            )
+            logger.info("Graduation plan completed successfully.")
+            return {"status": "success", "graduation_plan": graduation_plan}
+
+        except ValueError as ve:
+            logger.error(f"Validation error: {ve}")
+            return {"status": "error", "message": str(ve)}
+
+        except Exception as e:
+            logger.error(f"Unexpected error during graduation planning: {e}", exc_info=True)
+            return {"status": "error", "message": "An unexpected error occurred during graduation planning."}
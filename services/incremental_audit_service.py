@@ -0,0 +1,137 @@
+import logging
+import json
+from config import AUDIT_MODE
+from models.audit_state_store import StudentAuditState, audit_state_store
+from models.transcript import merge_transcript_pages, diff_transcripts
+from services.degree_audit_service import DegreeAuditService
+from services.transcript_vision_service import TranscriptVisionService
+
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalAuditService:
+    """
+    Re-audits a returning student from their stored state.
+
+    Only transcript pages that changed since the last upload are sent to the vision model; text-layer
+    PDFs are parsed locally and pages seen in any earlier upload come from the extraction cache.
+    The audit is not computed per semester: it is a cache of the whole result, reused when
+    the merged transcript, major and audit mode are unchanged. Any added, changed or removed
+    semester reruns the full DegreeAuditService audit, since requirements depend on the
+    whole transcript.
+    """
+
+    def __init__(self, student_id, file_paths, major_name, audit_mode=None, store=None, transcript_service=None):
+        """
+        Args:
+            student_id (str): Key of the student's stored state, handed to the client only inside a signed token.
+            file_paths (list): List of file paths (PDF or images) of the full transcript.
+            major_name (str): The student's major.
+            audit_mode (str, optional): "gpt" or "local". Defaults to AUDIT_MODE.
+            store (AuditStateStore, optional): State store. Defaults to the configured store.
+            transcript_service (TranscriptVisionService, optional): Service used to extract pages.
+        """
+        if not student_id:
+            raise ValueError("A student_id is required for an incremental audit.")
+        self.student_id = str(student_id)
+        self.file_paths = file_paths if isinstance(file_paths, list) else [file_paths]
+        self.major_name = major_name
+        self.audit_mode = (audit_mode or AUDIT_MODE).lower()
+        self.store = store or audit_state_store
+        self.transcript_service = transcript_service or TranscriptVisionService()
+
+    def perform_audit(self):
+        """
+        Perform the degree audit, extracting only the pages that changed.
+
+        Returns:
+            dict: The degree audit result (as DegreeAuditService.perform_audit) with an
+            "incremental" entry describing the semester delta, where each page's extraction came
+            from and whether the stored audit was reused.
+        """
+        try:
+            state = self.store.get(self.student_id)
+            known_pages = dict(state.pages) if state else {}
+
+            pages, page_counts = self.transcript_service.extract_transcript_pages(self.file_paths, known_pages)
+            if not pages:
+                return {"status": "error", "message": "No transcript pages found in the uploaded files."}
+
+            extracted_pages = [(page_hash, data) for page_hash, data in pages if isinstance(data, dict) and 'error' not in data]
+            if len(extracted_pages) < len(pages):
+                failed = [data.get('error', 'Unknown error') for _, data in pages if isinstance(data, dict) and 'error' in data]
+                # Keep the pages that did extract so a retry only resends the failed ones.
+                self._save(state, extracted_pages)
+                return {"status": "error", "message": f"Transcript data could not be extracted: {'; '.join(failed) or 'Unknown error'}"}
+
+            transcript_data = merge_transcript_pages([data for _, data in pages])
+            delta = diff_transcripts(state.transcript_data if state else None, transcript_data)
+            unchanged = (
+                state is not None
+                and state.audit_info is not None
+                and state.major_name == self.major_name
+                and state.audit_mode == self.audit_mode
+                and not any(delta.values())
+            )
+
+            if unchanged:
+                logger.info(f"Transcript of student {self.student_id} unchanged; reusing the stored audit.")
+                result = {
+                    "status": "success",
+                    "audit_info": state.audit_info,
+                    "raw_response": json.dumps(state.audit_info),
+                }
+            else:
+                logger.info(
+                    f"Running the full audit for student {self.student_id}: {len(delta['added'])} semester(s) "
+                    f"added, {len(delta['changed'])} changed, {len(delta['removed'])} removed."
+                )
+                result = DegreeAuditService(
+                    file_paths=self.file_paths,
+                    major_name=self.major_name,
+                    audit_mode=self.audit_mode,
+                    transcript_data=transcript_data
+                ).perform_audit()
+
+            if result.get("status") == "success":
+                self._save(state, pages, transcript_data, result["audit_info"])
+            else:
+                self._save(state, pages)
+
+            result["incremental"] = {
+                **delta,
+                "pages_total": len(pages),
+                **page_counts,
+                "audit_reused": unchanged,
+            }
+            return result
+
+        except ValueError as ve:
+            logger.error(f"Validation error: {ve}")
+            return {"status": "error", "message": str(ve)}
+
+        except Exception as e:
+            logger.error(f"Unexpected error during incremental degree audit: {e}", exc_info=True)
+            return {"status": "error", "message": "An unexpected error occurred during the degree audit process."}
+
+    def _save(self, state, pages, transcript_data=None, audit_info=None):
+        """
+        Store the current pages only, so hashes of replaced pages do not accumulate.
+
+        Without a new audit, the transcript and audit of the last successful run are kept,
+        together with the major and audit mode they were computed for.
+        """
+        major_name, audit_mode = self.major_name, self.audit_mode
+        if audit_info is None and state is not None:
+            major_name, audit_mode = state.major_name, state.audit_mode
+            transcript_data, audit_info = state.transcript_data, state.audit_info
+        self.store.save(StudentAuditState(
+            student_id=self.student_id,
+            major_name=major_name,
+            audit_mode=audit_mode,
+            transcript_data=transcript_data or {},
+            pages=[list(page) for page in pages],
+            audit_info=audit_info,
+            updated_at=state.updated_at if state else None,
+        ))
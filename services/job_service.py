@@ -0,0 +1,140 @@
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import JOB_HEARTBEAT_INTERVAL, JOB_QUEUE_LIMIT, JOB_WORKERS
+from models.job_store import bind_job, job_store
+from services.chat_service import ChatService
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when an instance already has JOB_QUEUE_LIMIT jobs queued or running."""
+
+
+class JobRunner:
+    """
+    Runs chat actions (degree audit, advising, graduation plan) on a bounded pool of background
+    threads, so the request that submits one returns at once with a job id.
+
+    State lives in the job store, so any instance can report on a job. The action runs on a copy
+    of the submitter's conversation; the messages and context it adds are stored with the job
+    and applied to the submitter's session when they next fetch it.
+
+    Jobs are tagged with an id unique to this process, which the runner keeps alive with a
+    heartbeat from its first job on. Other processes on the host (CLI commands, a second server)
+    therefore never touch its jobs, while jobs of a process that died are failed when read.
+    """
+
+    def __init__(self, store=None, max_workers=JOB_WORKERS, queue_limit=JOB_QUEUE_LIMIT):
+        self.store = store or job_store
+        self.max_workers = max(max_workers, 1)
+        self.queue_limit = max(queue_limit, self.max_workers)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.app = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def init_app(self, app):
+        """Bind the Flask app whose context jobs run in."""
+        self.app = app
+
+    def _executor(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self.store.heartbeat(self.worker)
+                    threading.Thread(target=self._beat, name="job-heartbeat", daemon=True).start()
+                    atexit.register(self.store.retire, self.worker)
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._pool
+
+    def _beat(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_INTERVAL)
+            try:
+                self.store.heartbeat(self.worker)
+            except Exception as e:
+                logger.warning(f"Could not record the job worker heartbeat: {e}")
+
+    def submit_action(self, owner, conversation_history, context, action, major_name, file_paths,
+                      audit_mode=None, student_id=None, max_courses_per_semester=None):
+        """
+        Queue a chat action.
+
+        Args:
+            owner (str): Identifies the submitting session; only it may read the job.
+            conversation_history (list): The submitter's conversation so far.
+            context (dict): The submitter's conversation context.
+            action, major_name, file_paths, audit_mode, student_id, max_courses_per_semester:
+                As ChatService.handle_action.
+
+        Returns:
+            Job: The queued job.
+
+        Raises:
+            JobQueueFull: Too many jobs are already queued or running on this instance.
+        """
+        with self._lock:
+            if self._pending >= self.queue_limit:
+                raise JobQueueFull(f"{self._pending} job(s) already queued or running.")
+            self._pending += 1
+        try:
+            executor = self._executor()
+            job = self.store.create(action, owner=owner, worker=self.worker)
+            executor.submit(
+                self._run, job.job_id, list(conversation_history), dict(context), action, major_name,
+                file_paths, audit_mode, student_id, max_courses_per_semester
+            )
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        logger.info(f"Queued {action} job {job.job_id}.")
+        return job
+
+    def _run(self, job_id, conversation_history, context, action, *arguments):
+        history_length = len(conversation_history)
+        context_before = dict(context)
+        bind_job(job_id, self.store)
+        try:
+            self.store.start(job_id)
+            chat_service = ChatService(conversation_history=conversation_history, context=context)
+            with self.app.app_context():
+                response = chat_service.handle_action(action, *arguments)
+            session_update = {
+                "messages": chat_service.conversation_history[history_length:],
+                "context": {
+                    key: value for key, value in chat_service.context.items()
+                    if context_before.get(key) != value
+                },
+            }
+            self.store.complete(job_id, response, session_update)
+            logger.info(f"Job {job_id} completed with status {response.get('status')}.")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self.store.fail(job_id, "An unexpected error occurred while processing your request.")
+        finally:
+            bind_job(None)
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "pending": pending,
+            "jobs": self.store.counts(),
+        }
+
+
+job_runner = JobRunner()
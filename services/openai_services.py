@@ -1,15 +1,411 @@
 import openai
 import os
 import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
+import httpx
 import tiktoken
+from config import (
+    OPENAI_BACKOFF_BASE, OPENAI_BACKOFF_MAX, OPENAI_BASE_URL, OPENAI_CALL_QUOTAS, OPENAI_CONNECT_TIMEOUT,
+    OPENAI_MAX_CONCURRENCY, OPENAI_MAX_RETRIES, OPENAI_POOL_CONNECTIONS, OPENAI_QUEUE_TIMEOUT,
+    OPENAI_READ_TIMEOUT, OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT
+)
 
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
 logger = logging.getLogger(__name__)
 
-def generate_chatgpt_response(prompt=None, conversation_history=None, model="gpt-4o", temperature=0.7, max_tokens=3000, system_prompt=None):
+CALL_TYPES = ("vision", "audit", "advising", "chat")
+
+# Status codes worth retrying: request timeout, conflict, rate limit and server errors.
+RETRYABLE_STATUS_CODES = (408, 409, 429)
+# Input tokens assumed per image part when the caller gives no estimate (a four-tile image).
+DEFAULT_IMAGE_TOKENS = 765
+# Characters per token when the tokenizer is unavailable.
+CHARS_PER_TOKEN = 4
+
+
+class OpenAIQueueTimeout(Exception):
+    """Raised when an OpenAI call waited longer than its timeout for a free slot."""
+
+
+class _Waiter:
+    __slots__ = ("call_type", "event", "granted")
+
+    def __init__(self, call_type):
+        self.call_type = call_type
+        self.event = threading.Event()
+        self.granted = False
+
+
+class OpenAICallLimiter:
+    """
+    Process-wide limit on concurrent OpenAI calls.
+
+    At most max_concurrency calls run at once, and at most quotas[call_type] of one
+    call type. Callers beyond the limits wait in a FIFO queue: a freed slot goes to the
+    longest-waiting caller whose call type is under its quota. A caller that waits longer
+    than its timeout gets OpenAIQueueTimeout instead of a slot.
+    """
+
+    def __init__(self, max_concurrency=OPENAI_MAX_CONCURRENCY, quotas=None, timeout=OPENAI_QUEUE_TIMEOUT):
+        """
+        Args:
+            max_concurrency (int): Most OpenAI calls in flight across all call types.
+            quotas (dict, optional): Call type -> most calls of that type in flight. Defaults to OPENAI_CALL_QUOTAS.
+            timeout (float): Default seconds a caller waits for a slot.
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.quotas = dict(OPENAI_CALL_QUOTAS if quotas is None else quotas)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._active = 0
+        self._active_by_type = {}
+        self._metrics = {}
+
+    def _type_metrics(self, call_type):
+        metrics = self._metrics.get(call_type)
+        if metrics is None:
+            metrics = self._metrics[call_type] = {
+                "calls": 0, "timeouts": 0, "queued": 0, "max_queued": 0,
+                "wait_seconds_total": 0.0, "max_wait_seconds": 0.0,
+            }
+        return metrics
+
+    def _has_room(self, call_type):
+        return (self._active < self.max_concurrency
+                and self._active_by_type.get(call_type, 0) < self.quotas.get(call_type, self.max_concurrency))
+
+    def _dispatch(self):
+        """Grant free slots to queued callers in arrival order. Called with the lock held."""
+        for waiter in list(self._queue):
+            if self._active >= self.max_concurrency:
+                break
+            if self._has_room(waiter.call_type):
+                self._queue.remove(waiter)
+                self._grant(waiter)
+
+    def _grant(self, waiter):
+        waiter.granted = True
+        self._active += 1
+        self._active_by_type[waiter.call_type] = self._active_by_type.get(waiter.call_type, 0) + 1
+        self._type_metrics(waiter.call_type)["queued"] -= 1
+        waiter.event.set()
+
+    def acquire(self, call_type, timeout=None):
+        """
+        Wait for a slot for one call.
+
+        Args:
+            call_type (str): One of CALL_TYPES; decides which quota applies.
+            timeout (float, optional): Seconds to wait. Defaults to the limiter's timeout.
+
+        Raises:
+            OpenAIQueueTimeout: No slot became free in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        waiter = _Waiter(call_type)
+        with self._lock:
+            metrics = self._type_metrics(call_type)
+            metrics["queued"] += 1
+            metrics["max_queued"] = max(metrics["max_queued"], metrics["queued"])
+            self._queue.append(waiter)
+            self._dispatch()
+
+        waiter.event.wait(timeout)
+        with self._lock:
+            waited = time.monotonic() - start
+            metrics = self._type_metrics(call_type)
+            if not waiter.granted:
+                self._queue.remove(waiter)
+                metrics["queued"] -= 1
+                metrics["timeouts"] += 1
+                logger.warning(f"OpenAI {call_type} call timed out after {waited:.1f}s in the queue.")
+                raise OpenAIQueueTimeout(f"No OpenAI slot free for a {call_type} call within {timeout}s.")
+            metrics["calls"] += 1
+            metrics["wait_seconds_total"] += waited
+            metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+        if waited > 1:
+            logger.info(f"OpenAI {call_type} call waited {waited:.1f}s for a slot.")
+
+    def release(self, call_type):
+        with self._lock:
+            self._active -= 1
+            self._active_by_type[call_type] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, call_type, timeout=None):
+        """Hold a slot for the duration of a with block."""
+        self.acquire(call_type, timeout=timeout)
+        try:
+            yield
+        finally:
+            self.release(call_type)
+
+    def stats(self):
+        """Return slots in use, queue depth and per call type counters and wait times."""
+        with self._lock:
+            by_type = {}
+            for call_type, metrics in self._metrics.items():
+                entry = dict(metrics)
+                entry["in_flight"] = self._active_by_type.get(call_type, 0)
+                entry["quota"] = self.quotas.get(call_type, self.max_concurrency)
+                entry["avg_wait_seconds"] = (
+                    round(metrics["wait_seconds_total"] / metrics["calls"], 4) if metrics["calls"] else 0.0
+                )
+                entry["wait_seconds_total"] = round(metrics["wait_seconds_total"], 4)
+                entry["max_wait_seconds"] = round(metrics["max_wait_seconds"], 4)
+                by_type[call_type] = entry
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._active,
+                "queued": len(self._queue),
+                "timeout_seconds": self.timeout,
+                "call_types": by_type,
+            }
+
+
+openai_limiter = OpenAICallLimiter()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate, holding at most one minute's worth."""
+
+    def __init__(self, per_minute):
+        """
+        Args:
+            per_minute (int): Refill rate and capacity. 0 or less disables the bucket.
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount, timeout):
+        """
+        Take amount tokens, waiting for the refill. Requests larger than the capacity take the whole bucket.
+
+        Raises:
+            OpenAIQueueTimeout: The tokens would not be available within timeout seconds.
+        """
+        if self.capacity <= 0:
+            return
+        amount = min(float(amount), self.capacity)
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                delay = (amount - self._available) / self.rate
+            if now + delay > deadline:
+                raise OpenAIQueueTimeout(f"Rate limit budget of {amount:.0f} not available within {timeout}s.")
+            time.sleep(min(delay, 1.0))
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return int(self._available)
+
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _token_count(text):
+    """Tokens in a text; approximated from its length when the tokenizer cannot be loaded."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.encoding_for_model("gpt-4o")
+                except Exception as e:
+                    logger.warning(f"Tokenizer unavailable, estimating tokens from text length: {e}")
+                    _encoding = False
+    if _encoding is False:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(_encoding.encode(text))
+
+
+def estimate_message_tokens(messages, image_tokens=None):
+    """
+    Estimate the input tokens of chat messages before sending them.
+
+    Args:
+        messages (list): Chat messages; content may be a string or a list of text and image parts.
+        image_tokens (int, optional): Tokens of all image parts together, if known.
+
+    Returns:
+        int: Estimated input tokens.
+    """
+    total = 0
+    images = 0
+    for message in messages:
+        total += 4  # role and message framing
+        content = message.get("content")
+        if isinstance(content, str):
+            total += _token_count(content)
+            continue
+        for part in content or ():
+            if part.get("type") == "text":
+                total += _token_count(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                images += 1
+    return total + (image_tokens if image_tokens is not None else images * DEFAULT_IMAGE_TOKENS)
+
+
+class OpenAIClient:
+    """
+    Shared OpenAI client for every call the app makes.
+
+    One SDK client with a pooled keep-alive HTTP connection pool and explicit connect/read
+    timeouts. Each attempt first takes its estimated tokens from the RPM/TPM token buckets and
+    a slot from the concurrency limiter; rate limits, timeouts and server errors are retried
+    with jittered exponential backoff. A server-sent Retry-After is waited out in full, unless it
+    is longer than the limiter's queue timeout, in which case the call fails at once.
+    OPENAI_BASE_URL points the client at another server, e.g. a local fake for testing.
+    """
+
+    def __init__(self, api_key=None, base_url=OPENAI_BASE_URL, limiter=None, max_retries=OPENAI_MAX_RETRIES,
+                 rpm_limit=OPENAI_RPM_LIMIT, tpm_limit=OPENAI_TPM_LIMIT, backoff_base=OPENAI_BACKOFF_BASE,
+                 backoff_max=OPENAI_BACKOFF_MAX):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.limiter = limiter or openai_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests_bucket = TokenBucket(rpm_limit)
+        self.tokens_bucket = TokenBucket(tpm_limit)
+        self._client = None
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    @property
+    def client(self):
+        """The SDK client, created on first use so the API key can come from the environment."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    timeout = httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+                    self._client = openai.OpenAI(
+                        api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                        base_url=self.base_url or None,
+                        timeout=timeout,
+                        max_retries=0,
+                        http_client=httpx.Client(
+                            timeout=timeout,
+                            limits=httpx.Limits(
+                                max_connections=OPENAI_POOL_CONNECTIONS,
+                                max_keepalive_connections=OPENAI_POOL_CONNECTIONS
+                            )
+                        )
+                    )
+        return self._client
+
+    @staticmethod
+    def _retry_after(error):
+        """Seconds the server asked us to wait, from Retry-After or retry-after-ms, or None."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            return None
+        return None
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        status = getattr(error, "status_code", None)
+        return status in RETRYABLE_STATUS_CODES or (status is not None and status >= 500)
+
+    def _backoff(self, attempt, error):
+        """Seconds to wait before the next attempt, or None when the server asks for longer than we queue."""
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.limiter.timeout else None
+        # Full jitter: anywhere between 0 and the exponential ceiling.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def chat_completion(self, call_type, messages, max_tokens, image_tokens=None, **kwargs):
+        """
+        Create a chat completion through the shared limits, retrying transient failures.
+
+        Args:
+            call_type (str): Limiter quota the call counts against (one of CALL_TYPES).
+            messages (list): Chat messages.
+            max_tokens (int): Most tokens to generate; counted against the TPM budget.
+            image_tokens (int, optional): Estimated tokens of the image parts, if known.
+            **kwargs: Further arguments for chat.completions.create (model, temperature, ...).
+
+        Returns:
+            ChatCompletion: The SDK response.
+
+        Raises:
+            OpenAIQueueTimeout: No slot or rate budget became free in time.
+            openai.OpenAIError: The call failed and is not retryable, or ran out of retries.
+        """
+        budget = estimate_message_tokens(messages, image_tokens=image_tokens) + max_tokens
+        attempt = 0
+        while True:
+            self.requests_bucket.acquire(1, self.limiter.timeout)
+            self.tokens_bucket.acquire(budget, self.limiter.timeout)
+            try:
+                with self.limiter.slot(call_type):
+                    return self.client.chat.completions.create(messages=messages, max_tokens=max_tokens, **kwargs)
+            except openai.OpenAIError as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    logger.error(
+                        f"OpenAI {call_type} call rate limited; the server asked to wait "
+                        f"{self._retry_after(e):.0f}s, longer than the {self.limiter.timeout}s queue timeout."
+                    )
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(
+                    f"OpenAI {call_type} call failed ({type(e).__name__}); "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s."
+                )
+                time.sleep(delay)
+
+    def stats(self):
+        return {
+            "retries": self.retries,
+            "requests_available": self.requests_bucket.available(),
+            "tokens_available": self.tokens_bucket.available(),
+        }
+
+
+openai_client = OpenAIClient()
+
+
+def generate_chatgpt_response(prompt=None, conversation_history=None, model="gpt-4o", temperature=0.7, max_tokens=3000, system_prompt=None, call_type="chat"):
     """
     Generate a response from OpenAI's GPT model, handling both standalone prompts and conversation history.
 
@@ -20,6 +416,7 @@ def generate_chatgpt_response(prompt=None, conversation_history=None, model="gpt
         temperature (float): Controls randomness in output (default: 0.7).
         max_tokens (int): Max tokens to generate (default: 3000).
         system_prompt (str): Optional system-level prompt to set context.
+        call_type (str): Quota of the shared OpenAI limiter the call counts against (default: 'chat').
 
     Returns:
         dict: The response from OpenAI's API or an error message.
@@ -40,17 +437,21 @@ def generate_chatgpt_response(prompt=None, conversation_history=None, model="gpt
 
         logger.debug(f"Payload for OpenAI: {messages}")
 
-        response = openai.chat.completions.create(
+        response = openai_client.chat_completion(
+            call_type,
+            messages,
+            max_tokens,
             model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
+            temperature=temperature
         )
 
         logger.info("Response successfully generated by OpenAI.")
         logger.debug(f"OpenAI response: {response}")
         return response
 
+    except OpenAIQueueTimeout as timeout_error:
+        logger.error(str(timeout_error))
+        return {"status": "error", "message": "The assistant is busy right now. Please try again shortly.", "code": 503}
     except openai.OpenAIError as api_error:  
         error_message = f"OpenAI API error: {str(api_error)}"
         logger.error(error_message, exc_info=True)
@@ -1,33 +1,83 @@
 import os
 import logging
 import base64
-import openai
-from pdf2image import convert_from_path
+import hashlib
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image, ImageEnhance
 from io import BytesIO
+import numpy as np
 import json
 import re
+import shutil
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from config import (
+    PAGE_HASH_DPI, PDFTOTEXT_TIMEOUT, RENDER_MEMORY_CAP_MB, RENDER_WORKERS, TEXT_LAYER_MIN_CONFIDENCE, VISION_CONCURRENCY,
+    VISION_DEBUG_DIR, VISION_MAX_DPI, VISION_PAGES_PER_REQUEST
+)
+from models.extraction_cache import extraction_cache
+from models.job_store import report_progress
+from models.transcript import CONTINUED_SEMESTER, merge_transcript_pages
+from models.page_tiling import content_bounds, row_safe_boxes
+from models.transcript_layout import parse_bbox_document, parse_transcript_layout
+from models.vision_sizing import fit_to_tiles, image_tokens, plan_image_sizing
+from services.openai_services import openai_client
+from utils.normalization import extract_course_codes
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)  # Ensure that debug logs are captured
 
+VISION_MODEL = "gpt-4o"
+VISION_DETAIL = "high"
+VISION_JPEG_QUALITY = 75
+# Contrast factor applied to grayscale sections; 1.0 leaves them unchanged and skips the pass.
+VISION_CONTRAST = 1.0
+
+# Letter-size pages are assumed when a PDF's page size cannot be read, and screen
+# resolution for images that carry no DPI. Uploaded images are never upscaled more than
+# this; rendered PDF pages are not upscaled at all.
+DEFAULT_PAGE_SIZE_INCHES = (8.5, 11.0)
+DEFAULT_IMAGE_DPI = 96
+MAX_IMAGE_UPSCALE = 2
+PAGE_SIZE_PATTERN = re.compile(r'([\d.]+) x ([\d.]+) pts')
+
+# Text that differs between downloads of the same transcript (print dates and times, page
+# numbers); it is left out of page hashes.
+VOLATILE_TEXT_PATTERN = re.compile(
+    r'\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b'
+    r'|\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[ap]\.?m\b\.?)?'
+    r'|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}\b'
+    r'|\bpage\s+\d+(?:\s+of\s+\d+)?\b',
+    re.IGNORECASE,
+)
+
+# Bump whenever rendering or preprocessing changes in a way that can change extraction
+# results; together with the prompt and model it invalidates cached extractions.
+PREPROCESSING_VERSION = "6"
+
 class TranscriptVisionService:
-    def __init__(self):
+    def __init__(self, cache=None):
         """
         Initializes the TranscriptVisionService with OpenAI GPT-4 configuration.
+
+        Args:
+            cache (ExtractionCache, optional): Cache of parsed extractions. Defaults to the shared disk cache.
         """
-        openai.api_key = os.getenv("OPENAI_API_KEY")
+        self.cache = cache if cache is not None else extraction_cache
         self.poppler_path = os.getenv("POPPLER_PATH")
-        self.output_folder = "/tmp/processed_images"  
-        if not os.path.exists(self.output_folder):
-            os.makedirs(self.output_folder)  
+        # Processed sections are only written to disk when a debug directory is configured.
+        self.output_folder = VISION_DEBUG_DIR
+        if self.output_folder:
+            os.makedirs(self.output_folder, exist_ok=True)
+        self._local = threading.local()
         if not self.poppler_path:
             logger.error("Poppler path is not set in the environment variables.")
             raise EnvironmentError("Poppler path is not set. Ensure it is configured correctly in the .env file.")
-        if not openai.api_key:
+        if not os.getenv("OPENAI_API_KEY"):
             logger.error("OpenAI API key is not set in the environment variables.")
             raise EnvironmentError("OpenAI API key is missing. Please set it in your environment variables.")
-        self.api_call_in_progress = False
 
     def validate_file_type(self, file_path):
         """
@@ -39,13 +89,20 @@ class TranscriptVisionService:
             raise ValueError(f"Invalid file type. Supported types are: {', '.join(valid_extensions)}")
         logger.info(f"Validated file type: {file_path}")
 
-    def convert_pdf_to_images(self, file_path, dpi=300):
+    def convert_pdf_to_images(self, file_path, dpi=300, first_page=None, last_page=None):
         """
-        Converts a PDF file to a list of PIL Image objects with specified DPI.
+        Converts a PDF file, or the page range first_page..last_page of it, to a list of PIL Image objects with specified DPI.
         """
         try:
-            images = convert_from_path(file_path, poppler_path=self.poppler_path, dpi=dpi)
-            logger.info(f"Converted PDF to {len(images)} image(s) at {dpi} DPI.")
+            images = convert_from_path(
+                file_path, poppler_path=self.poppler_path, dpi=dpi, first_page=first_page, last_page=last_page
+            )
+            for image in images:
+                image.info["dpi"] = (dpi, dpi)
+                image.info["rendered"] = True
+            logger.info(
+                f"Converted PDF pages {first_page or 1}-{last_page or 'end'} to {len(images)} image(s) at {dpi} DPI."
+            )
             return images
         except Exception as e:
             logger.error(f"Error converting PDF to images: {e}")
@@ -53,58 +110,47 @@ class TranscriptVisionService:
 
     def encode_image(self, image):
         """
-        Encodes a PIL Image to a base64 string.
+        Encodes a PIL Image to a base64 JPEG data URL.
+
+        The JPEG is written once into a per-thread buffer that is reused across images,
+        and base64 is computed straight from a view of that buffer without copying it.
         """
         try:
-            buffer = BytesIO()
-            image.save(buffer, format="JPEG")
+            buffer = getattr(self._local, "buffer", None)
+            if buffer is None:
+                buffer = self._local.buffer = BytesIO()
             buffer.seek(0)
-            encoded_image = base64.b64encode(buffer.read()).decode("utf-8")
+            buffer.truncate()
+            image.save(buffer, format="JPEG", quality=VISION_JPEG_QUALITY)
+            with buffer.getbuffer() as view:
+                encoded_image = base64.b64encode(view)
             logger.debug("Image successfully encoded to base64.")
-            return f"data:image/jpeg;base64,{encoded_image}"
+            return "data:image/jpeg;base64," + encoded_image.decode("ascii")
         except Exception as e:
             logger.error(f"Error encoding image to base64: {e}")
             raise
 
-    def split_image_into_sections(self, image, sections=4):
+    def preprocess_image(self, image, image_index=0, size=None, box=None):
         """
-        Splits an image into horizontal sections.
-
-        Divides the image into 4 equal sections by default.
+        Preprocesses the image in memory: turns it black and white, crops it to box and resizes
+        it to the planned size in one pass, and enhances contrast. Each stage is skipped when it
+        would not change the image. The result is saved to the debug directory only if one is set.
         """
         try:
-            width, height = image.size
-            section_height = height // sections
-            split_images = []
-            for i in range(sections):
-                top = i * section_height
-                bottom = (i + 1) * section_height if i < sections - 1 else height
-                cropped_image = image.crop((0, top, width, bottom))
-                split_images.append(cropped_image)
-            logger.info(f"Split image into {sections} sections.")
-            return split_images
-        except Exception as e:
-            logger.error(f"Error splitting image: {e}")
-            raise
+            if image.mode != "L":
+                image = image.convert("L")
+            region = tuple(box) if box else (0, 0, image.width, image.height)
+            size = tuple(size) if size else (region[2] - region[0], region[3] - region[1])
+            if region != (0, 0, image.width, image.height) or size != image.size:
+                image = image.resize(size, Image.LANCZOS, box=region)
+            if VISION_CONTRAST != 1.0:
+                image = ImageEnhance.Contrast(image).enhance(VISION_CONTRAST)
 
-    def preprocess_image(self, image, image_index=0):
-        """
-        Preprocesses the image by improving clarity, turning it black and white, and increasing contrast.
-        """
-        try:
-            
-            width, height = image.size
-            
-            upscale_factor = 2
-            image = image.resize((width * upscale_factor, height * upscale_factor), Image.LANCZOS)
-
-            bw_image = image.convert("L")  
-            contrast_enhancer = ImageEnhance.Contrast(bw_image)
-            high_contrast_image = contrast_enhancer.enhance(1.0) 
-            output_path = os.path.join(self.output_folder, f"processed_image_{image_index}.jpg")
-            high_contrast_image.save(output_path, quality=100)  
-            logger.info(f"Processed (upscaled, black and white with enhanced contrast) image saved at: {output_path}")
-            return high_contrast_image, output_path
+            if self.output_folder:
+                output_path = os.path.join(self.output_folder, f"processed_image_{image_index}.jpg")
+                image.save(output_path, quality=100)
+                logger.debug(f"Processed image saved at: {output_path}")
+            return image
         except Exception as e:
             logger.error(f"Error during image preprocessing: {e}")
             raise
@@ -117,6 +163,9 @@ class TranscriptVisionService:
             "You are analyzing transcript images and must return data strictly in JSON format as follows:"
             "\n- The top-level keys in the JSON are the semesters (e.g., '2024 Spring')."
             "\n- For each semester, provide a list of courses and one GPA entry as shown in the example."
+            f"\n- The images may start in the middle of a semester. List any course rows (and a totals line) that "
+            f"appear before the first semester heading under the key '{CONTINUED_SEMESTER}'. Never guess a semester "
+            f"name for them."
             "\n- Each course object should include:"
             "\n   'Course_code': Combine 'DEPT' and 'CRSE' columns (e.g., 'CSCS203'). Ignore and do not include the 'Sec' column at all. The 'Sec' column is the 4th column in the transcript and should never appear in the final data."
             "\n   'Course_name': Extract from the 'Title' column."
@@ -150,16 +199,18 @@ class TranscriptVisionService:
         )
 
 
-    def image_to_text(self, images):
-        
-        if self.api_call_in_progress:
-            logger.warning("Attempt to call image_to_text while a call is already in progress.")
-            return {"error": "API call already in progress."}
-        self.api_call_in_progress = True
+    def image_to_text(self, images, estimated_tokens=None):
+        """
+        Send images to the vision model in one request. Safe to call from several threads at once.
 
+        Args:
+            images (list): PIL images or already encoded data URLs.
+            estimated_tokens (int, optional): Image tokens of the request, used for rate limiting.
+        """
         try:
            
-            encoded_images = [self.encode_image(image) for image in images]
+            # Images may already be encoded to data URLs by the caller.
+            encoded_images = [image if isinstance(image, str) else self.encode_image(image) for image in images]
 
             messages = [
                 {
@@ -173,7 +224,8 @@ class TranscriptVisionService:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": encoded_image  
+                                    "url": encoded_image,
+                                    "detail": VISION_DETAIL
                                 }
                             }
                             for encoded_image in encoded_images 
@@ -184,11 +236,13 @@ class TranscriptVisionService:
 
             logger.info("Sending transcript images to OpenAI GPT-4 for processing.")
 
-            response = openai.chat.completions.create(
-                model="gpt-4o",  
-                messages=messages,
-                max_tokens=4000,
-                temperature=0  
+            response = openai_client.chat_completion(
+                "vision",
+                messages,
+                4000,
+                image_tokens=estimated_tokens,
+                model=VISION_MODEL,
+                temperature=0
             )
 
             extracted_data = response.choices[0].message.content.strip()
@@ -198,11 +252,397 @@ class TranscriptVisionService:
         except Exception as e:
             logger.error(f"Error during OpenAI Vision API processing: {e}")
             raise
-        finally:
-            self.api_call_in_progress = False
 
 
 
+    def extraction_version(self):
+        """Identify the prompt, model and preprocessing that produce an extraction, for cache keys."""
+        version = f"{PREPROCESSING_VERSION}|{VISION_MODEL}|{self.create_transcript_prompt()}"
+        return hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+
+    def read_text_layer(self, file_path):
+        """
+        Read the words and positions of a PDF's text layer with poppler's pdftotext.
+
+        Returns:
+            list or None: One list of TextWord per page, or None if pdftotext is unavailable or fails.
+        """
+        pdftotext = shutil.which("pdftotext", path=self.poppler_path) or shutil.which("pdftotext")
+        if not pdftotext:
+            logger.info("pdftotext not found; skipping the PDF text layer.")
+            return None
+        try:
+            result = subprocess.run(
+                [pdftotext, "-bbox", "-enc", "UTF-8", file_path, "-"],
+                capture_output=True, timeout=PDFTOTEXT_TIMEOUT, check=True
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not read the text layer of {file_path}: {e}")
+            return None
+        return parse_bbox_document(result.stdout.decode("utf-8", errors="replace"))
+
+    def extract_text_layer(self, file_paths):
+        """
+        Parse transcript PDFs from their text layer, without rendering or calling the vision model.
+
+        Args:
+            file_paths (list or str): List of file paths or a single file path.
+
+        Returns:
+            dict or None: Parsed transcript data, or None when any file is not a PDF, has no
+            text layer, or its course table parses below TEXT_LAYER_MIN_CONFIDENCE.
+        """
+        if not isinstance(file_paths, list):
+            file_paths = [file_paths]
+        if not all(file_path.lower().endswith(".pdf") for file_path in file_paths):
+            return None
+
+        transcripts = []
+        for file_path in file_paths:
+            transcript = self.parse_text_layer(file_path)
+            if transcript is None:
+                return None
+            transcripts.append(transcript)
+
+        logger.info(f"Extracted transcript from the PDF text layer of {len(file_paths)} file(s).")
+        return merge_transcript_pages(transcripts)
+
+    def parse_text_layer(self, file_path, pages=None):
+        """
+        Parse one PDF from its text layer.
+
+        Args:
+            file_path (str): PDF file.
+            pages (list, optional): Its text layer as returned by read_text_layer; read when omitted.
+
+        Returns:
+            dict or None: Parsed transcript, or None when the PDF has no text layer or its course
+            table parses below TEXT_LAYER_MIN_CONFIDENCE.
+        """
+        if pages is None:
+            pages = self.read_text_layer(file_path)
+        if not pages or not any(pages):
+            logger.info(f"No text layer in {file_path}; using the vision model.")
+            return None
+        transcript, confidence = parse_transcript_layout(pages)
+        if not transcript or confidence < TEXT_LAYER_MIN_CONFIDENCE:
+            logger.info(f"Text layer of {file_path} parsed with confidence {confidence:.2f}; using the vision model.")
+            return None
+        return transcript
+
+    def read_pdf_info(self, file_path):
+        """
+        Read the page count and first page size of a PDF with poppler's pdfinfo.
+
+        Returns:
+            tuple: (page count or None if unknown, page width in inches, page height in inches).
+            Letter size is assumed when the page size cannot be read.
+        """
+        width, height = DEFAULT_PAGE_SIZE_INCHES
+        try:
+            info = pdfinfo_from_path(file_path, poppler_path=self.poppler_path)
+        except Exception as e:
+            logger.warning(f"Could not read PDF info of {file_path}; assuming letter-size pages: {e}")
+            return None, width, height
+        match = PAGE_SIZE_PATTERN.search(str(info.get("Page size", "")))
+        if match:
+            width, height = float(match.group(1)) / 72, float(match.group(2)) / 72
+        return info.get("Pages"), width, height
+
+    def iter_pdf_pages(self, file_path):
+        """
+        Render the pages of a PDF one at a time, in order.
+
+        Pages are rendered ahead by a small thread pool (poppler runs out of process), bounded
+        by RENDER_WORKERS and by how many rendered pages fit in RENDER_MEMORY_CAP_MB, so at most
+        that many pages plus the one being consumed are held in memory.
+
+        Yields:
+            PIL.Image: One rendered page at the planned DPI.
+        """
+        page_count, width, height = self.read_pdf_info(file_path)
+        dpi = plan_image_sizing(width, height).dpi
+        if not page_count:
+            yield from self.convert_pdf_to_images(file_path, dpi=dpi)
+            return
+
+        page_bytes = max(int(width * dpi) * int(height * dpi) * 3, 1)
+        ahead = max(1, min(RENDER_WORKERS, page_count, RENDER_MEMORY_CAP_MB * 1024 * 1024 // page_bytes - 1))
+        logger.info(f"Rendering {page_count} page(s) of {file_path} at {dpi} DPI, {ahead} page(s) ahead.")
+
+        pending = deque()
+        next_page = 1
+        with ThreadPoolExecutor(max_workers=ahead) as pool:
+            try:
+                while next_page <= page_count or pending:
+                    while next_page <= page_count and len(pending) < ahead:
+                        pending.append(pool.submit(self.convert_pdf_to_images, file_path, dpi, next_page, next_page))
+                        next_page += 1
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def iter_page_images(self, file_paths):
+        """
+        Yield every page of the given files as an image (PDF pages are rendered), one at a time.
+
+        Args:
+            file_paths (list or str): List of file paths or a single file path.
+
+        Yields:
+            PIL.Image: One image per page, in file order.
+        """
+        if not isinstance(file_paths, list):
+            file_paths = [file_paths]
+
+        report_progress("rendering")
+        for file_path in file_paths:
+            self.validate_file_type(file_path)
+            if file_path.lower().endswith(".pdf"):
+                yield from self.iter_pdf_pages(file_path)
+            else:
+                logger.info(f"Loaded image file: {file_path}")
+                yield Image.open(file_path)
+
+    @staticmethod
+    def image_hash(image):
+        """Hash of an image's pixels."""
+        digest = hashlib.sha256()
+        digest.update(f"image:{image.mode}:{image.size}".encode("utf-8"))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def page_hashes(self, file_path, page_count=None, text_pages=None):
+        """
+        Content hashes of a file's pages, used to recognise pages that were already extracted
+        without rendering them for extraction.
+
+        An image file hashes its bytes. A PDF page whose text layer lists course codes hashes
+        that text less print dates, times and page numbers, so a re-downloaded transcript keeps
+        its hashes. Other PDF pages (scans) hash a grayscale rendering at PAGE_HASH_DPI.
+
+        Args:
+            file_path (str): PDF or image file.
+            page_count (int, optional): Page count of the PDF, as read by read_pdf_info.
+            text_pages (list, optional): Text layer of the PDF, as read by read_text_layer; read when omitted.
+
+        Returns:
+            list: One hash per page, in page order.
+        """
+        if not file_path.lower().endswith(".pdf"):
+            with open(file_path, "rb") as handle:
+                return [hashlib.sha256(b"file:" + handle.read()).hexdigest()]
+
+        if text_pages is None:
+            text_pages = self.read_text_layer(file_path)
+        hashes = []
+        for words in text_pages or []:
+            text = " ".join(VOLATILE_TEXT_PATTERN.sub(" ", " ".join(word.text for word in words)).split())
+            if extract_course_codes(text):
+                hashes.append(hashlib.sha256(f"text:{text}".encode("utf-8")).hexdigest())
+            else:
+                hashes.append(None)
+
+        if not hashes and not page_count:
+            thumbnails = self.convert_pdf_to_images(file_path, dpi=PAGE_HASH_DPI)
+            return [self.image_hash(thumbnail.convert("L")) for thumbnail in thumbnails]
+        hashes += [None] * ((page_count or 0) - len(hashes))
+        for index, page_hash in enumerate(hashes):
+            if page_hash is None:
+                thumbnail = self.convert_pdf_to_images(file_path, PAGE_HASH_DPI, index + 1, index + 1)[0]
+                hashes[index] = self.image_hash(thumbnail.convert("L"))
+        return hashes
+
+    def _parse_extraction(self, raw_data):
+        """Pull the transcript JSON out of the vision model's reply."""
+        # Attempt to extract JSON from the response
+        if raw_data.strip().startswith("```json"):
+            # Extract JSON within code block
+            json_match = re.search(r'```json\s*(\{.*\})\s*```', raw_data, re.DOTALL)
+            if json_match:
+                raw_data = json_match.group(1)
+            else:
+                logger.error("JSON code block not properly formatted.")
+                return {"error": "Failed to extract JSON from GPT response."}
+        else:
+            
+            json_match = re.search(r'(\{.*\})', raw_data, re.DOTALL)
+            if json_match:
+                raw_data = json_match.group(1)
+            else:
+                logger.error("No JSON found in GPT response.")
+                return {"error": "Failed to extract JSON from GPT response."}
+
+        try:
+            parsed_data = json.loads(raw_data)
+            logger.info("Parsed transcript data successfully.")
+            return parsed_data
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse GPT response into JSON: {e}")
+            logger.debug(f"Raw Data: {raw_data}")
+            return {"error": "Failed to parse GPT response into JSON format."}
+
+    def prepare_images(self, images, index_offset=0):
+        """
+        Crop, split and preprocess page images into encoded sections for one vision request.
+
+        Each page is cropped to its content and split into sections only between text
+        rows, so no course row is cut in half. Pages are consumed one at a time and each
+        section is encoded as soon as it is preprocessed, so only the encoded payload is kept.
+
+        Args:
+            images (iterable): PIL page images, e.g. from iter_page_images.
+            index_offset (int): Page number of the first image, used to name processed images.
+
+        Returns:
+            tuple: (list of encoded image data URLs, estimated image tokens, number of pages read).
+        """
+        encoded_images = []
+        estimated_tokens = 0
+        page_count = 0
+        for index, image in enumerate(images, start=index_offset):
+            page_count += 1
+            source_dpi = float((image.info.get("dpi") or (DEFAULT_IMAGE_DPI,))[0]) or DEFAULT_IMAGE_DPI
+            # Convert the page once so every section is cropped and resized from grayscale.
+            page = image.convert("L") if image.mode != "L" else image
+            pixels = np.asarray(page)
+            bounds = content_bounds(pixels)
+            if bounds is None:
+                logger.info(f"Page {index} is blank; skipping it.")
+                continue
+            left, top, right, bottom = bounds
+            # A rendered PDF page already has the planned resolution; upscaling it adds tokens, not detail.
+            upscale = 1 if image.info.get("rendered") else MAX_IMAGE_UPSCALE
+            plan = plan_image_sizing(
+                (right - left) / source_dpi, (bottom - top) / source_dpi,
+                max_dpi=min(VISION_MAX_DPI, source_dpi * upscale)
+            )
+            scale = plan.dpi / source_dpi
+            for section_index, box in enumerate(row_safe_boxes(pixels, bounds, plan.sections)):
+                size = fit_to_tiles(
+                    (max(round((box[2] - box[0]) * scale), 1), max(round((box[3] - box[1]) * scale), 1)), plan
+                )
+                preprocessed_image = self.preprocess_image(
+                    page, image_index=f"{index}_{section_index}", size=size, box=box
+                )
+                estimated_tokens += image_tokens(*preprocessed_image.size)
+                encoded_images.append(self.encode_image(preprocessed_image))
+        return encoded_images, estimated_tokens, page_count
+
+    def request_extraction(self, encoded_images, estimated_tokens=None):
+        """
+        Send encoded sections to the vision model in one request and parse the reply.
+
+        Returns:
+            dict: Parsed transcript data or error message. Rows read twice from
+            overlapping sections are dropped.
+        """
+        if not encoded_images:
+            return {"error": "No transcript content found."}
+        raw_data = self.image_to_text(encoded_images, estimated_tokens=estimated_tokens)
+        if isinstance(raw_data, dict):
+            return raw_data
+        parsed_data = self._parse_extraction(raw_data)
+        if 'error' in parsed_data:
+            return parsed_data
+        return merge_transcript_pages([parsed_data])
+
+    def extract_from_images(self, images, index_offset=0):
+        """
+        Crop, split, preprocess and send page images to the vision model in one request.
+
+        Args:
+            images (iterable): PIL page images, e.g. from iter_page_images.
+            index_offset (int): Page number of the first image, used to name processed images.
+
+        Returns:
+            dict: Parsed transcript data or error message.
+        """
+        encoded_images, estimated_tokens, page_count = self.prepare_images(images, index_offset=index_offset)
+        logger.info(
+            f"Sending {len(encoded_images)} image(s) for {page_count} page(s); "
+            f"estimated {estimated_tokens} image token(s)."
+        )
+        return self.request_extraction(encoded_images, estimated_tokens=estimated_tokens)
+
+    @staticmethod
+    def _page_groups(images, pages_per_request):
+        """Group pages into (first page index, pages) for one request each; 0 puts every page in one group."""
+        group, first_index = [], 0
+        for index, image in enumerate(images):
+            if not group:
+                first_index = index
+            group.append(image)
+            if pages_per_request and len(group) >= pages_per_request:
+                yield first_index, group
+                group = []
+        if group:
+            yield first_index, group
+
+    def extract_concurrently(self, images, pages_per_request=VISION_PAGES_PER_REQUEST,
+                             max_workers=VISION_CONCURRENCY):
+        """
+        Extract a transcript with one vision request per group of pages, sent concurrently.
+
+        Groups are prepared on the calling thread while earlier groups are in flight; at most
+        max_workers requests run at once. The partial semester -> courses maps are merged in
+        page order, so a semester spanning two groups is joined and the result does not depend
+        on which request finishes first.
+
+        Args:
+            images (iterable): PIL page images, e.g. from iter_page_images.
+            pages_per_request (int): Pages per request; 0 sends every page in a single request.
+            max_workers (int): Most requests in flight at once.
+
+        Returns:
+            dict: Parsed transcript data or error message.
+        """
+        max_workers = max(max_workers, 1)
+        requests = []
+        estimated_total = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for first_index, group in self._page_groups(images, pages_per_request):
+                encoded_images, estimated_tokens, page_count = self.prepare_images(group, index_offset=first_index)
+                if not encoded_images:
+                    continue
+                pages = f"{first_index}-{first_index + page_count - 1}"
+                estimated_total += estimated_tokens
+                logger.info(
+                    f"Queueing pages {pages}: {len(encoded_images)} image(s), "
+                    f"estimated {estimated_tokens} image token(s)."
+                )
+                # Keep prepared payloads from piling up while every worker is busy.
+                in_flight = [future for _, future in requests if not future.done()]
+                if len(in_flight) >= 2 * max_workers:
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                report_progress("extracting")
+                requests.append((pages, pool.submit(self.request_extraction, encoded_images, estimated_tokens)))
+
+            if not requests:
+                return {"error": "No transcript content found."}
+
+            results = []
+            failed = []
+            for pages, future in requests:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error extracting pages {pages}: {e}", exc_info=True)
+                    result = {"error": "Extraction failed"}
+                if not isinstance(result, dict) or 'error' in result:
+                    failed.append(pages)
+                results.append(result)
+
+        if failed:
+            logger.error(f"Extraction failed for page(s) {', '.join(failed)}.")
+            return {"error": f"Extraction failed for page(s) {', '.join(failed)}."}
+        logger.info(
+            f"Extracted {len(requests)} page group(s) with up to {max_workers} concurrent request(s); "
+            f"estimated {estimated_total} image token(s) in total."
+        )
+        return merge_transcript_pages(results)
+
     def extract_transcript_text(self, file_paths):
         """
         Extracts transcript data from multiple file paths and processes images accordingly.
@@ -214,56 +654,113 @@ class TranscriptVisionService:
             dict: Parsed transcript data or error message.
         """
         try:
-            if not isinstance(file_paths, list):
-                file_paths = [file_paths]
+            cache_key = None
+            if self.cache.enabled:
+                cache_key = self.cache.make_key(file_paths, self.extraction_version())
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Transcript extraction served from the extraction cache.")
+                    return cached
+
+            parsed_data = self.extract_text_layer(file_paths)
+            if parsed_data is None:
+                parsed_data = self.extract_concurrently(self.iter_page_images(file_paths))
+            if cache_key and isinstance(parsed_data, dict) and 'error' not in parsed_data:
+                try:
+                    self.cache.put(cache_key, parsed_data)
+                except Exception as e:
+                    logger.warning(f"Could not store the extraction in the cache: {e}")
+            return parsed_data
+        except Exception as e:
+            logger.error(f"Error extracting transcript text: {e}", exc_info=True)
+            return {"error": "Extraction failed"}
+
+    def page_cache_key(self, page_hash, version):
+        """Extraction cache key of one page, distinct from the whole-upload keys of make_key."""
+        return hashlib.sha256(f"page:{page_hash}|v={version}".encode("utf-8")).hexdigest()
+
+    def extract_transcript_pages(self, file_paths, known_pages=None):
+        """
+        Extract transcript data page by page, reusing pages that were extracted before.
+
+        Pages are recognised by page_hashes. A PDF whose text layer parses is read locally, as by
+        extract_transcript_text; its first page carries the whole file's transcript and the others
+        an empty one. Otherwise each page comes from known_pages, then the extraction cache, and
+        only then is it rendered and sent to the vision model.
+
+        Args:
+            file_paths (list or str): List of file paths or a single file path to process.
+            known_pages (dict, optional): Page hash -> parsed data of previously extracted pages.
 
-            all_images = []
+        Returns:
+            tuple: (list of (page hash, parsed page data) in page order, dict of page counts by
+            source: pages_parsed, pages_reused, pages_cached and pages_extracted). Parsed data is
+            an error dict for pages that failed.
+        """
+        if not isinstance(file_paths, list):
+            file_paths = [file_paths]
+        known_pages = known_pages or {}
+        version = self.extraction_version()
+        counts = {"pages_parsed": 0, "pages_reused": 0, "pages_cached": 0, "pages_extracted": 0}
+        pages = []
+        index = 0
+        with ThreadPoolExecutor(max_workers=max(VISION_CONCURRENCY, 1)) as pool:
             for file_path in file_paths:
                 self.validate_file_type(file_path)
-                images = (
-                    self.convert_pdf_to_images(file_path)
-                    if file_path.lower().endswith(".pdf")
-                    else [Image.open(file_path)]
-                )
-                logger.info(f"Loaded {len(images)} image(s) from file: {file_path}")
-                all_images.extend(images)
-
-            processed_images = []
-            for index, image in enumerate(all_images):
-                split_images = self.split_image_into_sections(image, sections=3)
-                for section_index, section in enumerate(split_images):
-                    preprocessed_image, _ = self.preprocess_image(section, image_index=f"{index}_{section_index}")
-                    processed_images.append(preprocessed_image)
-
-            raw_data = self.image_to_text(processed_images)
-
-            # Attempt to extract JSON from the response
-            if raw_data.strip().startswith("```json"):
-                # Extract JSON within code block
-                json_match = re.search(r'```json\s*(\{.*\})\s*```', raw_data, re.DOTALL)
-                if json_match:
-                    raw_data = json_match.group(1)
-                else:
-                    logger.error("JSON code block not properly formatted.")
-                    return {"error": "Failed to extract JSON from GPT response."}
-            else:
-                
-                json_match = re.search(r'(\{.*\})', raw_data, re.DOTALL)
-                if json_match:
-                    raw_data = json_match.group(1)
-                else:
-                    logger.error("No JSON found in GPT response.")
-                    return {"error": "Failed to extract JSON from GPT response."}
+                is_pdf = file_path.lower().endswith(".pdf")
+                text_pages = self.read_text_layer(file_path) if is_pdf else None
+                page_count, width, height = self.read_pdf_info(file_path) if is_pdf else (None, None, None)
+                page_hashes = self.page_hashes(file_path, page_count, text_pages)
 
-            try:
-                parsed_data = json.loads(raw_data)
-                logger.info("Parsed transcript data successfully.")
-                return parsed_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse GPT response into JSON: {e}")
-                logger.debug(f"Raw Data: {raw_data}")
-                return {"error": "Failed to parse GPT response into JSON format."}
+                transcript = self.parse_text_layer(file_path, text_pages) if text_pages else None
+                if transcript is not None:
+                    # Hashed apart from vision extractions, which hold a single page's rows.
+                    for page_number, page_hash in enumerate(page_hashes):
+                        layout_hash = hashlib.sha256(f"layout:{page_hash}".encode("utf-8")).hexdigest()
+                        pages.append((index, layout_hash, transcript if page_number == 0 else {}))
+                        index += 1
+                    counts["pages_parsed"] += len(page_hashes)
+                    continue
 
-        except Exception as e:
-            logger.error(f"Error extracting transcript text: {e}", exc_info=True)
-            return {"error": "Extraction failed"}
+                for page_number, page_hash in enumerate(page_hashes, start=1):
+                    cached = None
+                    if page_hash not in known_pages:
+                        cached = self.cache.get(self.page_cache_key(page_hash, version))
+                    if page_hash in known_pages:
+                        logger.info(f"Page {index} unchanged since the last upload; reusing its extraction.")
+                        pages.append((index, page_hash, known_pages[page_hash]))
+                        counts["pages_reused"] += 1
+                    elif cached is not None:
+                        logger.info(f"Page {index} served from the extraction cache.")
+                        pages.append((index, page_hash, cached))
+                        counts["pages_cached"] += 1
+                    else:
+                        report_progress("rendering")
+                        if is_pdf:
+                            dpi = plan_image_sizing(width, height).dpi
+                            image = self.convert_pdf_to_images(file_path, dpi, page_number, page_number)[0]
+                        else:
+                            image = Image.open(file_path)
+                        encoded_images, estimated_tokens, _ = self.prepare_images([image], index_offset=index)
+                        report_progress("extracting")
+                        pages.append(
+                            (index, page_hash, pool.submit(self.request_extraction, encoded_images, estimated_tokens))
+                        )
+                        counts["pages_extracted"] += 1
+                    index += 1
+
+            results = []
+            for index, page_hash, page_data in pages:
+                if isinstance(page_data, Future):
+                    try:
+                        page_data = page_data.result()
+                    except Exception as e:
+                        logger.error(f"Error extracting page {index}: {e}", exc_info=True)
+                        page_data = {"error": "Extraction failed"}
+                    if isinstance(page_data, dict) and 'error' not in page_data:
+                        try:
+                            self.cache.put(self.page_cache_key(page_hash, version), page_data)
+                        except Exception as e:
+                            logger.warning(f"Could not store page {index} in the extraction cache: {e}")
+                results.append((page_hash, page_data))
+        return results, counts
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+
+from services.openai_services import OpenAICallLimiter, OpenAIClient
+
+
+COMPLETION = {
+    "id": "chatcmpl-fake",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class FakeOpenAIServer:
+    """Local stand-in for the chat completions endpoint that plays back a script of responses."""
+
+    def __init__(self, script):
+        """
+        Args:
+            script (list): (status, headers) per request; requests past the end get a 200 completion.
+        """
+        self.script = list(script)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                server.requests.append((time.monotonic(), self.path))
+                status, headers = server.script.pop(0) if server.script else (200, {})
+                body = json.dumps(COMPLETION if status == 200 else {"error": {"message": f"status {status}"}})
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_client(server, max_retries=3, queue_timeout=5):
+    return OpenAIClient(
+        api_key="sk-test",
+        base_url=server.base_url,
+        limiter=OpenAICallLimiter(max_concurrency=2, timeout=queue_timeout),
+        max_retries=max_retries,
+        rpm_limit=0,
+        tpm_limit=0,
+        backoff_base=0.01,
+        backoff_max=0.05,
+    )
+
+
+def complete(client):
+    return client.chat_completion("chat", [{"role": "user", "content": "hi"}], 10, model="gpt-4o")
+
+
+class OpenAIClientRetryTest(unittest.TestCase):
+
+    def test_retries_429_after_retry_after(self):
+        with FakeOpenAIServer([(429, {"Retry-After": "1"})]) as server:
+            client = make_client(server)
+            response = complete(client)
+
+        self.assertEqual(response.choices[0].message.content, "ok")
+        self.assertEqual(len(server.requests), 2)
+        self.assertGreaterEqual(server.requests[1][0] - server.requests[0][0], 1.0)
+        self.assertEqual(client.stats()["retries"], 1)
+
+    def test_retry_after_ms_takes_precedence(self):
+        with FakeOpenAIServer([(429, {"retry-after-ms": "200", "Retry-After": "30"})]) as server:
+            complete(make_client(server))
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertLess(server.requests[1][0] - server.requests[0][0], 5)
+
+    def test_retry_after_longer_than_queue_timeout_fails_without_waiting(self):
+        with FakeOpenAIServer([(429, {"Retry-After": "120"})]) as server:
+            started = time.monotonic()
+            with self.assertRaises(openai.RateLimitError):
+                complete(make_client(server, queue_timeout=5))
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_server_errors_back_off_until_retries_run_out(self):
+        with FakeOpenAIServer([(503, {})] * 3) as server:
+            with self.assertRaises(openai.InternalServerError):
+                complete(make_client(server, max_retries=2))
+
+        self.assertEqual(len(server.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        with FakeOpenAIServer([(400, {})]) as server:
+            with self.assertRaises(openai.BadRequestError):
+                complete(make_client(server))
+
+        self.assertEqual(len(server.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,19 @@
 
-
-from config import MAJOR_TABLE_MAPPING
+import re
+from models.requirement_model import requirement_model
 
 def get_major_id_from_name(major_name):
-    for major_id, mapping in MAJOR_TABLE_MAPPING.items():
-        if mapping.get("main_category") == major_name:
-            return major_id
-        
-        for sub_category in mapping.get("sub_categories", {}).keys():
-            if sub_category == major_name:
-                return major_id
-    return None
+    return requirement_model.major_id_for_name(major_name)
 
 def normalize_course_code(course_code):
     
     return course_code.replace(" ", "").upper()
 
 def normalize_course_name(course_name):
-    return course_name.strip().title()
\ No newline at end of file
+    return course_name.strip().title()
+
+COURSE_CODE_PATTERN = re.compile(r'\b([A-Za-z]{4})\s*-?\s*(\d{3}[A-Za-z]?)\b')
+
+def extract_course_codes(text):
+    """Find every course code (e.g. 'CSCS 203', 'MATH101') in free text, normalized."""
+    return [f"{prefix}{number}".upper() for prefix, number in COURSE_CODE_PATTERN.findall(text or "")]
@@ -205,6 +205,8 @@ You are tasked with performing a detailed degree audit for a student.
         elective_courses_section = "\n".join([f"       - {course}" for course in required_courses.get('elective_courses', [])])
         supporting_courses_section = "\n".join([f"       - {course}" for course in required_courses.get('supporting_courses', [])])
         general_education_courses_section = "\n".join([f"       - {course}" for course in required_courses.get('general_education_courses', [])])
+        eligible_courses_section = "\n".join([f"       - {course}" for course in self.student_data_handler.get_eligible_next_courses()])
+        gpa_summary_section = self.student_data_handler.format_gpa_summary()
 
         prompt = f"""
 You are an academic advisor tasked with providing tailored advice to a student.
@@ -220,6 +222,9 @@ You are an academic advisor tasked with providing tailored advice to a student.
    **Student Transcript Data:**
 {gpt_input['formatted_transcript_data']}
 
+   **GPA Summary** (already computed from the transcript; use these figures instead of recalculating):
+{gpa_summary_section}
+
 2. **Identify Remaining Requirements**:
    - Cross-reference the student's completed courses with the required courses in all categories.
    - Determine which courses are still needed for degree completion.
@@ -243,7 +248,11 @@ You are an academic advisor tasked with providing tailored advice to a student.
      - **Major Requirements**:
 {major_requirements}
 
+   **Major Courses Eligible Next Semester** (not yet completed, all prerequisites already passed):
+{eligible_courses_section}
+
 3. **Provide Recommendations**:
+   - When recommending major courses for the next semester, only pick from the eligible list above.
    - Consider the student's strengths and weaknesses based on their academic history.
    - Offer advice on course load balancing between challenging and confidence-boosting subjects.
    - Recommend strategies for GPA improvement, such as retaking courses with low grades.